@@ -1,19 +1,88 @@
-import pyautogui
-import keyboard
 import time
+_SCRIPT_STARTED = time.perf_counter()
 import threading
 import ctypes
+import ctypes.wintypes
 import sys
 import os
+import shutil
 import logging
+import logging.handlers
+import queue
 import json
+import heapq
+import mmap
+import struct
+import sqlite3
+import argparse
+import atexit
+import importlib
+from array import array
+from collections import deque
 from datetime import datetime
 from colorama import init, Fore, Style, Back
-from dataclasses import dataclass, asdict
-from typing import Dict, Tuple, Optional
+from dataclasses import dataclass, asdict, field, replace
+from typing import Callable, Dict, List, Tuple, Optional
 
-# Initialize colorama for colored console output
-init(autoreset=True)
+class StartupReport:
+    """Milestones and deferred import costs measured from script start"""
+
+    def __init__(self, started: float):
+        self.started = started
+        self.milestones: Dict[str, float] = {}
+        self.imports: List[Tuple[str, float, float]] = []
+
+    def mark(self, name: str):
+        """Record the first time a milestone is reached"""
+        if name not in self.milestones:
+            self.milestones[name] = time.perf_counter() - self.started
+
+    def record_import(self, name: str, began: float, duration: float):
+        self.imports.append((name, began - self.started, duration))
+
+    def lines(self) -> List[str]:
+        """Report in the spirit of ``python -X importtime``"""
+        lines = [f"{'at (ms)':>10} | {'took (ms)':>10} | event"]
+        events = [(at, None, f"reached {name}") for name, at in self.milestones.items()]
+        events += [(at, took, f"import {name}") for name, at, took in self.imports]
+        for at, took, label in sorted(events, key=lambda event: event[0]):
+            took_str = f"{took * 1000:10.1f}" if took is not None else " " * 10
+            lines.append(f"{at * 1000:10.1f} | {took_str} | {label}")
+        return lines
+
+STARTUP = StartupReport(_SCRIPT_STARTED)
+STARTUP.mark("core imports")
+
+class LazyModule:
+    """Module proxy that imports on first attribute access
+
+    Keeps pyautogui, keyboard and asyncio off the import path until an
+    input, hotkey or control API feature first needs them, so headless modes such as --bench
+    never load them and startup does not pay for them up front.
+    """
+
+    def __init__(self, name: str):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", None)
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            began = time.perf_counter()
+            module = importlib.import_module(self._name)
+            STARTUP.record_import(self._name, began, time.perf_counter() - began)
+            object.__setattr__(self, "_module", module)
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+pyautogui = LazyModule("pyautogui")
+keyboard = LazyModule("keyboard")
+asyncio = LazyModule("asyncio")
 
 @dataclass
 class Config:
@@ -22,75 +91,3289 @@ class Config:
     start_stop_key: str = "f6"
     pause_key: str = "f7"
     emergency_stop_key: str = "f8"
+    hotkey_debounce: float = 0.25  # Ignore a second press of the same hotkey within this many seconds
     
     # Click settings
     click_interval: float = 0.01
     auto_stop_time: int = 120
+    auto_stop_active_only: bool = False  # Count only unpaused time towards auto_stop_time
+    missed_tick_policy: str = "skip"  # "skip" or "catch_up"
+    max_catch_up_ticks: int = 5
+    power_mode: str = "normal"  # "normal" or "low_power" (clicks in bursts, fewer wake-ups)
+    burst_size: int = 5  # Clicks per wake-up in low_power mode
+    input_backend: str = "pyautogui"  # "pyautogui", "native", "window", "null" or "recording"
     
-    # Coordinates
+    # Coordinates; in "relative" mode the click position is stored as a
+    # fraction of the game client area and resolved to pixels per session
+    coordinate_mode: str = "relative"  # "relative" or "absolute"
     click_x: int = 1350
     click_y: int = 750
+    click_rel_x: float = 0.7031
+    click_rel_y: float = 0.6944
+    game_window_title: str = "Honkai: Star Rail"
+    game_process_name: str = "StarRail.exe"  # Fallback when no window has the exact title
+    geometry_check_interval: float = 1.0
+    monitor_profiles: Dict[str, List[float]] = field(default_factory=dict)
+    # Optional ordered targets, each {"x", "y"} in pixels or {"rel_x", "rel_y"}
+    # as fractions of the game area, plus optional "delay" and "repeat"
+    click_sequence: List[Dict[str, float]] = field(default_factory=list)
+    # Optional game clients driven side by side from one process; each entry
+    # overrides settings above (e.g. "name", "game_window_title", "click_x",
+    # "click_interval", "click_sequence", "auto_stop_time")
+    instances: List[Dict[str, object]] = field(default_factory=list)
+    
+    # Vision gate: only click while the region matches the reference
+    vision_gate: bool = False
+    vision_x: int = 1250
+    vision_y: int = 700
+    vision_width: int = 200
+    vision_height: int = 100
+    vision_threshold: float = 0.08
+    vision_reference: str = "dialogue_skipper_reference.npy"
+    
+    # Dialogue classifier: match a screen region against labelled template
+    # screenshots and act per state with "click", "wait", "key:<name>" or
+    # "choice:<n>" (clicks choice_positions[n - 1], fractions of the game area)
+    classifier: bool = False
+    classifier_x: int = 0
+    classifier_y: int = 0
+    classifier_width: int = 1920
+    classifier_height: int = 1080
+    classifier_templates: Dict[str, List[str]] = field(default_factory=dict)
+    classifier_actions: Dict[str, str] = field(default_factory=lambda: {
+        "talking": "click", "choice": "choice:1", "cutscene": "key:esc", "loading": "wait"})
+    classifier_default_action: str = "click"  # For frames matching no template
+    classifier_threshold: float = 0.1
+    classifier_interval: float = 0.05
+    classifier_cooldown: float = 0.5  # Minimum gap between key and choice actions
+    classifier_cache: str = "dialogue_skipper_templates.npz"
+    choice_positions: List[List[float]] = field(default_factory=lambda: [[0.73, 0.55], [0.73, 0.63], [0.73, 0.71]])
+    
+    # Adaptive rate: ramp up while the screen around the click point keeps
+    # changing, drop to an idle rate (0 = stop clicking) when it does not
+    adaptive_rate: bool = False
+    adaptive_base_interval: float = 0.05
+    adaptive_idle_interval: float = 0.5
+    adaptive_idle_after: float = 2.0
+    adaptive_ramp: float = 1.5
+    adaptive_check_interval: float = 0.05
+    adaptive_region: int = 64
+    adaptive_threshold: float = 0.02
     
     # UI settings
     show_click_counter: bool = True
     show_elapsed_time: bool = True
+    status_fps: float = 4.0
+    
+    # Logging
+    log_file: str = "dialogue_skipper.log"  # Empty disables the log file
+    log_max_bytes: int = 1_000_000  # Size-based rotation; 0 disables
+    log_rotate_when: str = ""  # Time-based rotation instead, e.g. "midnight" or "H"
+    log_backup_count: int = 3
+    event_log: bool = False  # Structured JSONL session events
+    event_log_file: str = "dialogue_skipper_events.jsonl"
+    session_history: bool = True  # Persist each session's statistics
+    history_file: str = "dialogue_skipper_history.db"
+    
+    # Config file; edits are picked up by a running session when enabled
+    hot_reload: bool = True
+    config_poll_interval: float = 1.0
+    config_version: int = 2
+    
+    # Local control API for external tools (JSON lines over TCP or a Unix socket)
+    control_api: bool = False
+    control_host: str = "127.0.0.1"
+    control_port: int = 8765
+    control_socket: str = ""  # Unix socket path; used instead of TCP when set
     
     # Audio feedback (if available)
     audio_feedback: bool = False
 
-class DialogueSkipper:
-    def __init__(self):
-        self.config = self.load_config()
-        self.setup_logging()
-        self.stop_event = threading.Event()
-        self.pause_event = threading.Event()
-        self.click_thread: Optional[threading.Thread] = None
-        self.is_active = False
-        self.is_paused = False
-        self.click_count = 0
-        self.start_time = 0
-        self.status_lock = threading.Lock()
-        
-        # Set PyAutoGUI settings
-        pyautogui.FAILSAFE = True
-        pyautogui.PAUSE = self.config.click_interval
+MISSED_TICK_POLICIES = ("skip", "catch_up")
+POWER_MODES = ("normal", "low_power")
+
+class ClickScheduler:
+    """Tick scheduler working from absolute monotonic deadlines
+
+    Deadlines sit on a fixed grid (start + n * interval), so time spent inside
+    the click call is absorbed by the next sleep instead of adding drift.
+    Ticks that are missed entirely are either dropped ("skip") or fired
+    back-to-back up to ``max_catch_up`` at once ("catch_up"). ``sleep`` may
+    return early, e.g. ``SessionControl.wait_for_command`` when a command
+    arrives, in which case ``wait`` reports no ticks due.
+    """
+
+    def __init__(self, interval: float, policy: str = "skip", max_catch_up: int = 5,
+                 clock: Callable[[], float] = time.perf_counter,
+                 sleep: Callable[[float], object] = time.sleep):
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        if policy not in MISSED_TICK_POLICIES:
+            raise ValueError(f"Unknown missed tick policy: {policy}")
+        self.interval = interval
+        self.policy = policy
+        self.max_catch_up = max(0, max_catch_up)
+        self.clock = clock
+        self.sleep = sleep
+        self.start_time = 0.0
+        self.next_deadline = 0.0
+        self.ticks = 0
+        self.missed_ticks = 0
+        self.wakeups = 0
+
+    def start(self):
+        """Anchor the deadline grid at the current time"""
+        self.start_time = self.clock()
+        self.next_deadline = self.start_time
+        self.ticks = 0
+        self.missed_ticks = 0
+        self.wakeups = 0
+
+    def wait(self, interval: Optional[float] = None) -> int:
+        """Sleep until the next deadline and return how many ticks are due now
+
+        ``interval`` overrides the gap that follows this tick, which lets a
+        click plan with per-step delays share the same deadline grid.
+        Returns 0 when the sleep was cut short before the deadline.
+        """
+        if interval is None:
+            interval = self.interval
+        now = self.clock()
+        if now < self.next_deadline:
+            self.sleep(self.next_deadline - now)
+            self.wakeups += 1
+            now = self.clock()
+            if now < self.next_deadline:
+                return 0
+
+        late = int((now - self.next_deadline) / interval)
+        if late > 0 and self.policy == "catch_up":
+            due = 1 + min(late, self.max_catch_up)
+        else:
+            due = 1
+        self.missed_ticks += late + 1 - due
+        self.next_deadline += (late + 1) * interval
+        self.ticks += due
+        return due
+
+    @property
+    def target_rate(self) -> float:
+        return 1 / self.interval
+
+    def achieved_rate(self) -> float:
+        """Ticks per second since start()"""
+        elapsed = self.clock() - self.start_time
+        return self.ticks / elapsed if elapsed > 0 else 0.0
+
+class FailSafeError(Exception):
+    """Raised by an input backend when the mouse failsafe corner is hit"""
+
+class InputBackend:
+    """Base class for the layer that delivers clicks to the OS"""
+    name = "base"
+
+    def prepare(self, x: int, y: int):
+        """Called once per session before the first click"""
+
+    def click(self, x: int, y: int):
+        raise NotImplementedError
+
+    def click_burst(self, x: int, y: int, count: int):
+        """Click ``count`` times at one position; backends that can batch override this"""
+        for _ in range(count):
+            self.click(x, y)
+
+    def key(self, code: int):
+        """Press and release a key by scan code (used by macro replay)"""
+        keyboard.send(code)
+
+    def close(self):
+        """Release any resources held for the session"""
+
+class PyAutoGUIBackend(InputBackend):
+    """Original path: pyautogui.click with its move and failsafe check"""
+    name = "pyautogui"
+
+    def __init__(self):
+        # Pacing is owned by ClickScheduler, so no per-call pause on top of it
+        pyautogui.FAILSAFE = True
+        pyautogui.PAUSE = 0
+
+    def click(self, x: int, y: int):
+        try:
+            pyautogui.click(x, y)
+        except pyautogui.FailSafeException as e:
+            raise FailSafeError(str(e)) from e
+
+    def click_burst(self, x: int, y: int, count: int):
+        # One pass through pyautogui's argument handling, move and failsafe check
+        try:
+            pyautogui.click(x, y, clicks=count, interval=0)
+        except pyautogui.FailSafeException as e:
+            raise FailSafeError(str(e)) from e
+
+# Win32 SendInput structures (only instantiated on Windows)
+_INPUT_MOUSE = 0
+_INPUT_KEYBOARD = 1
+_MOUSEEVENTF_LEFTDOWN = 0x0002
+_MOUSEEVENTF_LEFTUP = 0x0004
+_KEYEVENTF_KEYUP = 0x0002
+_KEYEVENTF_SCANCODE = 0x0008
+
+class _MOUSEINPUT(ctypes.Structure):
+    _fields_ = [("dx", ctypes.wintypes.LONG), ("dy", ctypes.wintypes.LONG),
+                ("mouseData", ctypes.wintypes.DWORD), ("dwFlags", ctypes.wintypes.DWORD),
+                ("time", ctypes.wintypes.DWORD), ("dwExtraInfo", ctypes.c_void_p)]
+
+class _KEYBDINPUT(ctypes.Structure):
+    _fields_ = [("wVk", ctypes.wintypes.WORD), ("wScan", ctypes.wintypes.WORD),
+                ("dwFlags", ctypes.wintypes.DWORD), ("time", ctypes.wintypes.DWORD),
+                ("dwExtraInfo", ctypes.c_void_p)]
+
+class _INPUTUNION(ctypes.Union):
+    _fields_ = [("mi", _MOUSEINPUT), ("ki", _KEYBDINPUT)]
+
+class _INPUT(ctypes.Structure):
+    _fields_ = [("type", ctypes.wintypes.DWORD), ("u", _INPUTUNION)]
+
+class NativeBackend(InputBackend):
+    """Lean Win32 path: one SendInput call with a pre-built down/up pair
+
+    The cursor is only moved when it is not already on the target, and the
+    failsafe corners are checked with a single GetCursorPos per click.
+    Bursts reuse a pre-built array of down/up pairs per burst size and
+    deliver all of them in one SendInput call.
+    """
+    name = "native"
+
+    def __init__(self):
+        if os.name != 'nt':
+            raise RuntimeError("Native input backend is only available on Windows")
+        self.user32 = ctypes.windll.user32
+        self.events = (_INPUT * 2)()
+        self.events[0].type = self.events[1].type = _INPUT_MOUSE
+        self.events[0].u.mi.dwFlags = _MOUSEEVENTF_LEFTDOWN
+        self.events[1].u.mi.dwFlags = _MOUSEEVENTF_LEFTUP
+        self.keys = (_INPUT * 2)()
+        self.keys[0].type = self.keys[1].type = _INPUT_KEYBOARD
+        self.keys[0].u.ki.dwFlags = _KEYEVENTF_SCANCODE
+        self.keys[1].u.ki.dwFlags = _KEYEVENTF_SCANCODE | _KEYEVENTF_KEYUP
+        self.event_size = ctypes.sizeof(_INPUT)
+        self.cursor = ctypes.wintypes.POINT()
+        self.corners = ()
+        self.bursts: Dict[int, ctypes.Array] = {}
+
+    def burst_events(self, count: int) -> ctypes.Array:
+        events = self.bursts.get(count)
+        if events is None:
+            events = (_INPUT * (2 * count))()
+            for i in range(0, 2 * count, 2):
+                events[i].type = events[i + 1].type = _INPUT_MOUSE
+                events[i].u.mi.dwFlags = _MOUSEEVENTF_LEFTDOWN
+                events[i + 1].u.mi.dwFlags = _MOUSEEVENTF_LEFTUP
+            self.bursts[count] = events
+        return events
+
+    def prepare(self, x: int, y: int):
+        width = self.user32.GetSystemMetrics(0) - 1
+        height = self.user32.GetSystemMetrics(1) - 1
+        self.corners = ((0, 0), (width, 0), (0, height), (width, height))
+        self.user32.SetCursorPos(x, y)
+
+    def click(self, x: int, y: int):
+        cursor = self.cursor
+        self.user32.GetCursorPos(ctypes.byref(cursor))
+        if cursor.x != x or cursor.y != y:
+            if (cursor.x, cursor.y) in self.corners:
+                raise FailSafeError(f"Mouse moved to screen corner ({cursor.x}, {cursor.y})")
+            self.user32.SetCursorPos(x, y)
+        self.user32.SendInput(2, self.events, self.event_size)
+
+    def click_burst(self, x: int, y: int, count: int):
+        cursor = self.cursor
+        self.user32.GetCursorPos(ctypes.byref(cursor))
+        if cursor.x != x or cursor.y != y:
+            if (cursor.x, cursor.y) in self.corners:
+                raise FailSafeError(f"Mouse moved to screen corner ({cursor.x}, {cursor.y})")
+            self.user32.SetCursorPos(x, y)
+        self.user32.SendInput(2 * count, self.burst_events(count), self.event_size)
+
+    def key(self, code: int):
+        keys = self.keys
+        keys[0].u.ki.wScan = keys[1].u.ki.wScan = code
+        self.user32.SendInput(2, keys, self.event_size)
+
+class NullBackend(InputBackend):
+    """Discards every click; measures the engine with zero OS cost"""
+    name = "null"
+
+    def click(self, x: int, y: int):
+        pass
+
+    def click_burst(self, x: int, y: int, count: int):
+        pass
+
+    def key(self, code: int):
+        pass
+
+class RecordingBackend(InputBackend):
+    """Keeps clicks in memory so the engine can be run on a headless box"""
+    name = "recording"
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self.clock = clock
+        self.timestamps = array('d')
+        self.positions = array('i')
+        self.keys = array('H')
+
+    def click(self, x: int, y: int):
+        self.timestamps.append(self.clock())
+        self.positions.append(x)
+        self.positions.append(y)
+
+    def click_burst(self, x: int, y: int, count: int):
+        self.timestamps.extend((self.clock(),) * count)
+        self.positions.extend((x, y) * count)
+
+    def key(self, code: int):
+        self.keys.append(code)
+
+    @property
+    def click_count(self) -> int:
+        return len(self.timestamps)
+
+    def intervals(self) -> List[float]:
+        """Time between consecutive recorded clicks"""
+        ts = self.timestamps
+        return [ts[i] - ts[i - 1] for i in range(1, len(ts))]
+
+INPUT_BACKENDS: Dict[str, Callable[[], InputBackend]] = {
+    "pyautogui": PyAutoGUIBackend,
+    "native": NativeBackend,
+    "null": NullBackend,
+    "recording": RecordingBackend,
+}
+
+def create_input_backend(name: str) -> InputBackend:
+    """Instantiate the named input backend"""
+    try:
+        factory = INPUT_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown input backend: {name}") from None
+    return factory()
+
+class ThreadCounter:
+    """Monotonic counter with one cell per writing thread
+
+    Each thread increments its own single-element list, so the hot path
+    never takes a lock or races with another writer; ``value`` sums the
+    cells. Only the first increment from a new thread takes the lock.
+    """
+
+    def __init__(self):
+        self.cells: Dict[int, List[int]] = {}
+        self.lock = threading.Lock()
+
+    def cell(self) -> List[int]:
+        """Return the calling thread's cell for direct ``cell[0] += n`` use"""
+        ident = threading.get_ident()
+        cell = self.cells.get(ident)
+        if cell is None:
+            with self.lock:
+                cell = self.cells.setdefault(ident, [0])
+        return cell
+
+    def increment(self, n: int = 1):
+        self.cell()[0] += n
+
+    @property
+    def value(self) -> int:
+        return sum(cell[0] for cell in list(self.cells.values()))
+
+class LatencyHistogram:
+    """Fixed-memory log-linear histogram of durations (HDR-style)
+
+    Values are recorded in microseconds. Below 64us buckets are exact;
+    above that each power of two is split into 32 sub-buckets, keeping the
+    relative error under ~3% up to ~38 hours in about 1K counters.
+    """
+    SUB_BUCKET_BITS = 6
+    SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+    HALF = SUB_BUCKETS >> 1
+    MAX_SHIFT = 32
+
+    def __init__(self):
+        self.counts = array('Q', bytes(8 * (self.SUB_BUCKETS + self.MAX_SHIFT * self.HALF)))
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, seconds: float):
+        value = int(seconds * 1_000_000)
+        if value < 0:
+            value = 0
+        if value < self.SUB_BUCKETS:
+            index = value
+        else:
+            shift = min(value.bit_length() - self.SUB_BUCKET_BITS, self.MAX_SHIFT)
+            index = self.SUB_BUCKETS + (shift - 1) * self.HALF + min((value >> shift) - self.HALF, self.HALF - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def bucket_value(self, index: int) -> int:
+        """Midpoint of a bucket in microseconds"""
+        if index < self.SUB_BUCKETS:
+            return index
+        shift = (index - self.SUB_BUCKETS) // self.HALF + 1
+        low = (self.HALF + (index - self.SUB_BUCKETS) % self.HALF) << shift
+        return low + ((1 << shift) >> 1)
+
+    def percentile(self, pct: float) -> float:
+        """Value at the given percentile, in seconds"""
+        if not self.count:
+            return 0.0
+        target = max(1, int(self.count * pct / 100 + 0.5))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            if n:
+                seen += n
+                if seen >= target:
+                    return min(self.bucket_value(index), self.max) / 1_000_000
+        return self.max / 1_000_000
+
+    def summary(self) -> Dict[str, float]:
+        """p50/p95/p99/max and mean, in milliseconds"""
+        return {
+            "p50": self.percentile(50) * 1000,
+            "p95": self.percentile(95) * 1000,
+            "p99": self.percentile(99) * 1000,
+            "max": self.max / 1000,
+            "mean": self.total / self.count / 1000 if self.count else 0.0,
+        }
+
+def format_histogram(summary: Dict[str, float]) -> str:
+    return (f"p50 {summary['p50']:.3f}ms, p95 {summary['p95']:.3f}ms, "
+            f"p99 {summary['p99']:.3f}ms, max {summary['max']:.3f}ms")
+
+def power_usage(cpu_time: float, wakeups: int, duration: float) -> Dict[str, float]:
+    """Process CPU time and timer wake-ups of a session, absolute and per second"""
+    return {
+        "cpu_time": cpu_time,
+        "cpu_percent": cpu_time / duration * 100 if duration > 0 else 0.0,
+        "wakeups_per_sec": wakeups / duration if duration > 0 else 0.0,
+    }
+
+def format_power(stats: Dict[str, object]) -> str:
+    return (f"CPU {stats['cpu_time']:.2f}s ({stats['cpu_percent']:.1f}%), "
+            f"{stats['wakeups']} wake-ups ({stats['wakeups_per_sec']:.1f}/s)")
+
+class TickRing:
+    """The last ``capacity`` click ticks in one preallocated flat array
+
+    Each record is (deadline, wait start, wake-up, dispatch end, clicks
+    due, step). Recording overwrites the oldest entry in place, so a
+    session of any length keeps a fixed footprint.
+    """
+    FIELDS = 6
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.data = array('d', bytes(8 * self.FIELDS * capacity))
+        self.count = 0
+
+    def record(self, deadline: float, waited: float, woke: float, done: float, due: int, step: int):
+        i = self.count % self.capacity * self.FIELDS
+        data = self.data
+        data[i] = deadline
+        data[i + 1] = waited
+        data[i + 2] = woke
+        data[i + 3] = done
+        data[i + 4] = due
+        data[i + 5] = step
+        self.count += 1
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def records(self) -> List[Tuple[float, ...]]:
+        """Kept records, oldest first"""
+        first = self.count - len(self)
+        data, fields = self.data, self.FIELDS
+        return [tuple(data[n % self.capacity * fields:n % self.capacity * fields + fields])
+                for n in range(first, self.count)]
+
+class SpanRing:
+    """The last ``capacity`` (start, end) spans of one kind, from one thread"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.data = array('d', bytes(16 * capacity))
+        self.count = 0
+        self.thread = 0
+
+    def record(self, start: float, end: float):
+        i = self.count % self.capacity * 2
+        self.data[i] = start
+        self.data[i + 1] = end
+        self.count += 1
+        self.thread = threading.get_ident()
+
+    def spans(self) -> List[Tuple[float, float]]:
+        kept = min(self.count, self.capacity)
+        data = self.data
+        return [(data[n % self.capacity * 2], data[n % self.capacity * 2 + 1])
+                for n in range(self.count - kept, self.count)]
+
+class Profiler:
+    """Opt-in hot path instrumentation for diagnosing slow or missed clicks
+
+    The click loop adds one tick record per wake-up; sleep and click
+    dispatch spans are derived from those records. The status renderer
+    and hotkey hook record their own spans. The engine thread also runs
+    under cProfile for the length of each session. ``write`` dumps a
+    Chrome trace (chrome://tracing, Perfetto) and the cProfile stats.
+    Nothing is recorded unless a Profiler is attached, and the hot paths
+    only test for it.
+    """
+    SPANS = ("status render", "hotkey")
+
+    def __init__(self, path: str = "dialogue_skipper_profile", ticks: int = 20000):
+        self.path = path
+        self.ticks = TickRing(ticks)
+        self.spans = {name: SpanRing(max(1, ticks // 10)) for name in self.SPANS}
+        self.origin = time.perf_counter()
+        self.engine_thread = 0
+        self.cprofile = None
+
+    def begin(self):
+        """Start a session: clear the rings and profile the calling thread"""
+        import cProfile
+        
+        self.ticks.count = 0
+        for ring in self.spans.values():
+            ring.count = 0
+        self.origin = time.perf_counter()
+        self.engine_thread = threading.get_ident()
+        self.cprofile = cProfile.Profile()
+        self.cprofile.enable()
+
+    def end(self):
+        if self.cprofile:
+            self.cprofile.disable()
+
+    def chrome_trace(self) -> Dict[str, object]:
+        origin = self.origin
+        
+        def us(t: float) -> float:
+            return round((t - origin) * 1e6, 1)
+        
+        events = [{"name": "thread_name", "ph": "M", "pid": 1, "tid": self.engine_thread,
+                   "args": {"name": "click-engine"}}]
+        for deadline, waited, woke, done, due, step in self.ticks.records():
+            args = {"late_ms": round((woke - deadline) * 1000, 3), "due": int(due), "step": int(step)}
+            events.append({"name": "sleep", "ph": "X", "pid": 1, "tid": self.engine_thread,
+                           "ts": us(waited), "dur": round((woke - waited) * 1e6, 1)})
+            events.append({"name": "click dispatch", "ph": "X", "pid": 1, "tid": self.engine_thread,
+                           "ts": us(woke), "dur": round((done - woke) * 1e6, 1), "args": args})
+        for name, ring in self.spans.items():
+            for start, end in ring.spans():
+                events.append({"name": name, "ph": "X", "pid": 1, "tid": ring.thread,
+                               "ts": us(start), "dur": round((end - start) * 1e6, 1)})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def slowest_ticks(self, count: int = 5) -> List[Tuple[float, float]]:
+        """Ticks that woke furthest past their deadline, as (seconds in, lateness)"""
+        late = [(woke - self.origin, woke - deadline) for deadline, _, woke, _, _, _ in self.ticks.records()]
+        return sorted(late, key=lambda item: -item[1])[:count]
+
+    def write(self) -> Tuple[str, str]:
+        """Write <path>.trace.json and <path>.prof; returns both paths"""
+        trace_path, stats_path = f"{self.path}.trace.json", f"{self.path}.prof"
+        with open(trace_path, 'w') as f:
+            json.dump(self.chrome_trace(), f, separators=(",", ":"))
+        if self.cprofile:
+            self.cprofile.dump_stats(stats_path)
+        return trace_path, stats_path
+
+class SessionMetrics:
+    """Counters and latency histograms for one click session"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.clicks = ThreadCounter()
+        self.pauses = ThreadCounter()
+        self.gated_ticks = ThreadCounter()
+        self.click_latency = LatencyHistogram()
+        self.interval_jitter = LatencyHistogram()
+        self.gate_latency = LatencyHistogram()
+        self.classifier_latency = LatencyHistogram()
+
+    def snapshot(self, duration: float) -> Dict[str, object]:
+        clicks = self.clicks.value
+        return {
+            "clicks": clicks,
+            "duration": duration,
+            "achieved_rate": clicks / duration if duration > 0 else 0.0,
+            "target_rate": 1 / self.interval,
+            "pauses": self.pauses.value,
+            "gated_ticks": self.gated_ticks.value,
+            "click_latency_ms": self.click_latency.summary(),
+            "jitter_ms": self.interval_jitter.summary(),
+            "gate_latency_ms": self.gate_latency.summary(),
+            "classifier_latency_ms": self.classifier_latency.summary(),
+        }
+
+class StatusRenderer:
+    """Redraws the console status line from its own thread at a fixed FPS
+
+    The click thread never touches the console: it only updates plain
+    counters that ``build_line`` reads, and hands one-off messages to
+    ``post``. Frames whose content has not changed are skipped, and the
+    terminal width is re-queried at most every ``width_ttl`` seconds.
+    While ``is_idle`` says no session is running it only wakes for posts
+    and refreshes.
+    """
+
+    def __init__(self, build_line: Callable[[], str], fps: float = 4.0,
+                 out=None, width_ttl: float = 2.0, is_idle: Optional[Callable[[], bool]] = None):
+        self.build_line = build_line
+        self.is_idle = is_idle
+        self.on_frame: Optional[Callable[[float, float], None]] = None
+        self.frame_interval = 1 / fps if fps > 0 else 0.25
+        self.out = out or sys.stdout
+        self.width_ttl = width_ttl
+        self.messages: deque = deque()
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.last_line: Optional[str] = None
+        self.width = 120
+        self.width_checked = 0.0
+
+    def start(self):
+        """Start the renderer thread"""
+        if self.thread and self.thread.is_alive():
+            return
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self._run, name="status-renderer", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the renderer thread after drawing a final frame"""
+        self.stopped.set()
+        self.wake.set()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+        self.render_frame()
+
+    def post(self, message: str):
+        """Queue a message to be printed above the status line"""
+        self.messages.append(message)
+        self.wake.set()
+
+    def refresh(self):
+        """Ask for a redraw without waiting for the next frame"""
+        self.wake.set()
+
+    def terminal_width(self) -> int:
+        now = time.monotonic()
+        if now - self.width_checked >= self.width_ttl:
+            self.width = shutil.get_terminal_size((120, 24)).columns
+            self.width_checked = now
+        return self.width
+
+    def render_frame(self):
+        """Flush pending messages and redraw the status line if it changed"""
+        out = self.out
+        wrote = False
+        while self.messages:
+            out.write(f"\n{self.messages.popleft()}\n")
+            self.last_line = None
+            wrote = True
+
+        line = self.build_line()
+        if line != self.last_line:
+            padding = max(0, self.terminal_width() - len(line) - 20)
+            out.write(f"\r{line}{' ' * padding}")
+            self.last_line = line
+            wrote = True
+
+        if wrote:
+            out.flush()
+
+    def _run(self):
+        while not self.stopped.is_set():
+            # Nothing changes between sessions; sleep until a post or refresh
+            self.wake.wait(None if self.is_idle and self.is_idle() else self.frame_interval)
+            self.wake.clear()
+            try:
+                on_frame = self.on_frame
+                if on_frame is None:
+                    self.render_frame()
+                else:
+                    started = time.perf_counter()
+                    self.render_frame()
+                    on_frame(started, time.perf_counter())
+            except Exception as e:
+                logging.error(f"Status renderer error: {e}")
+
+EVENT_LOGGER = "dialogue_skipper.events"
+events = logging.getLogger(EVENT_LOGGER)
+
+def log_event(event: str, **fields):
+    """Emit a structured session event to the JSONL stream, if enabled"""
+    if events.isEnabledFor(logging.INFO):
+        events.info(event, extra={"fields": fields})
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, event name and its fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {"time": round(record.created, 6), "event": record.getMessage()}
+        entry.update(getattr(record, "fields", {}))
+        return json.dumps(entry, default=str)
+
+class _BatchFlushMixin:
+    """Defers stream flushes until the log writer finishes a batch"""
+
+    def flush(self):
+        pass
+
+    def flush_batch(self):
+        logging.StreamHandler.flush(self)
+
+class BatchRotatingFileHandler(_BatchFlushMixin, logging.handlers.RotatingFileHandler):
+    pass
+
+class BatchTimedRotatingFileHandler(_BatchFlushMixin, logging.handlers.TimedRotatingFileHandler):
+    pass
+
+class LogPipeline:
+    """Queue-based logging: callers enqueue, one writer thread does the I/O
+
+    Hot threads only pay for a QueueHandler put. The writer blocks on the
+    queue while idle, then drains everything that has arrived, hands it to
+    the file handlers and flushes once per batch.
+    """
+
+    def __init__(self, handlers: List[logging.Handler], batch_size: int = 512):
+        self.queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Write out everything queued so far and close the handlers"""
+        if self.thread and self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join(timeout=2.0)
+        for handler in self.handlers:
+            handler.close()
+
+    def _write(self, batch: List[logging.LogRecord]):
+        for record in batch:
+            for handler in self.handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+        for handler in self.handlers:
+            flush = getattr(handler, "flush_batch", handler.flush)
+            flush()
+
+    def _run(self):
+        get, get_nowait = self.queue.get, self.queue.get_nowait
+        while True:
+            record = get()
+            batch = []
+            while record is not None:
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    record = get_nowait()
+                except queue.Empty:
+                    record = False
+                    break
+            try:
+                self._write(batch)
+            except Exception:
+                pass  # never let a logging failure kill the writer
+            if record is None:
+                return
+
+def create_log_pipeline(config: Config) -> LogPipeline:
+    """Build the file (and optional JSONL event) handlers for the pipeline"""
+    def rotating_handler(filename: str) -> logging.Handler:
+        if config.log_rotate_when:
+            return BatchTimedRotatingFileHandler(filename, when=config.log_rotate_when,
+                                                 backupCount=config.log_backup_count, encoding='utf-8')
+        return BatchRotatingFileHandler(filename, maxBytes=config.log_max_bytes,
+                                        backupCount=config.log_backup_count, encoding='utf-8')
+
+    handlers = []
+    if config.log_file:
+        log_handler = rotating_handler(config.log_file)
+        log_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        log_handler.addFilter(lambda record: record.name != EVENT_LOGGER)
+        handlers.append(log_handler)
+    if config.event_log:
+        event_handler = rotating_handler(config.event_log_file)
+        event_handler.setFormatter(JsonLinesFormatter())
+        event_handler.addFilter(lambda record: record.name == EVENT_LOGGER)
+        handlers.append(event_handler)
+    return LogPipeline(handlers)
+
+LOG_PIPELINE: Optional[LogPipeline] = None
+
+class SessionHistory:
+    """Append-only SQLite store of finished sessions, indexed by start time"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            started_at REAL NOT NULL,
+            duration REAL NOT NULL,
+            clicks INTEGER NOT NULL,
+            achieved_rate REAL NOT NULL,
+            target_rate REAL NOT NULL,
+            jitter_p50 REAL NOT NULL,
+            jitter_p95 REAL NOT NULL,
+            jitter_p99 REAL NOT NULL,
+            pauses INTEGER NOT NULL,
+            missed_ticks INTEGER NOT NULL,
+            stop_reason TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS sessions_started_at ON sessions (started_at);
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def connect(self) -> sqlite3.Connection:
+        # Short-lived connections keep the store usable from any thread
+        conn = sqlite3.connect(self.path)
+        conn.executescript(self.SCHEMA)
+        return conn
+
+    def record(self, started_at: float, stats: Dict[str, object]):
+        """Append one finished session"""
+        jitter = stats["jitter_ms"]
+        row = (started_at, stats["duration"], stats["clicks"], stats["achieved_rate"], stats["target_rate"],
+               jitter["p50"], jitter["p95"], jitter["p99"], stats["pauses"], stats["missed_ticks"],
+               stats["stop_reason"])
+        conn = self.connect()
+        try:
+            with conn:
+                conn.execute("INSERT INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+        finally:
+            conn.close()
+
+    def summary(self, since: float = 0.0) -> Dict[str, object]:
+        """Aggregates over sessions started at or after ``since``"""
+        conn = self.connect()
+        try:
+            totals = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(clicks), 0), COALESCE(SUM(duration), 0), "
+                "MIN(started_at), MAX(started_at), AVG(jitter_p50), AVG(jitter_p99), MAX(jitter_p99), "
+                "COALESCE(SUM(pauses), 0), COALESCE(SUM(missed_ticks), 0) "
+                "FROM sessions WHERE started_at >= ?", (since,)).fetchone()
+            reasons = conn.execute(
+                "SELECT stop_reason, COUNT(*) FROM sessions WHERE started_at >= ? "
+                "GROUP BY stop_reason ORDER BY COUNT(*) DESC", (since,)).fetchall()
+            months = conn.execute(
+                "SELECT strftime('%Y-%m', started_at, 'unixepoch', 'localtime') AS month, "
+                "COUNT(*), SUM(clicks), SUM(duration) FROM sessions WHERE started_at >= ? "
+                "GROUP BY month ORDER BY month", (since,)).fetchall()
+        finally:
+            conn.close()
+        sessions, clicks, duration = totals[0], totals[1], totals[2]
+        return {
+            "sessions": sessions,
+            "clicks": clicks,
+            "duration": duration,
+            "first": totals[3],
+            "last": totals[4],
+            "mean_rate": clicks / duration if duration > 0 else 0.0,
+            "jitter_p50_ms": totals[5] or 0.0,
+            "jitter_p99_ms": totals[6] or 0.0,
+            "worst_jitter_p99_ms": totals[7] or 0.0,
+            "pauses": totals[8],
+            "missed_ticks": totals[9],
+            "stop_reasons": dict(reasons),
+            "months": [{"month": m, "sessions": n, "clicks": c, "duration": d} for m, n, c, d in months],
+        }
+
+class SessionState:
+    READY = "ready"
+    RUNNING = "running"
+    PAUSED = "paused"
+    STOPPING = "stopping"
+
+class EngineCommand:
+    START_STOP = "start_stop"
+    START = "start"
+    STOP = "stop"
+    TOGGLE_PAUSE = "toggle_pause"
+    PAUSE = "pause"
+    RESUME = "resume"
+    EMERGENCY_STOP = "emergency_stop"
+    RELOAD_CONFIG = "reload_config"
+    SHUTDOWN = "shutdown"
+
+# Control API commands that map straight onto engine commands
+API_COMMANDS = {
+    "start": EngineCommand.START,
+    "stop": EngineCommand.STOP,
+    "start_stop": EngineCommand.START_STOP,
+    "pause": EngineCommand.PAUSE,
+    "resume": EngineCommand.RESUME,
+    "toggle_pause": EngineCommand.TOGGLE_PAUSE,
+    "emergency_stop": EngineCommand.EMERGENCY_STOP,
+}
+
+class SessionControl:
+    """Session state machine plus the command inbox of the engine worker
+
+    Other threads only ``submit`` commands: an append and a notify under the
+    condition, which never blocks for long. The engine worker is the only
+    thread that applies them, so state changes cannot race. It blocks on
+    the condition while idle or paused, so neither costs any wake-ups, and
+    a submitted command wakes it immediately. Paused time is accumulated
+    so auto-stop can budget active time only.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self.cond = threading.Condition()
+        self.clock = clock
+        self.state = SessionState.READY
+        self.inbox: deque = deque()
+        self.finished_sessions = 0
+        self.pause_count = 0
+        self.paused_total = 0.0
+        self.pause_started = 0.0
+
+    def _transition(self, allowed: Tuple[str, ...], target: str) -> bool:
+        with self.cond:
+            if self.state not in allowed:
+                return False
+            if target == SessionState.PAUSED:
+                self.pause_started = self.clock()
+                self.pause_count += 1
+            elif self.state == SessionState.PAUSED:
+                self.paused_total += self.clock() - self.pause_started
+            self.state = target
+            self.cond.notify_all()
+            return True
+
+    def start(self) -> bool:
+        with self.cond:
+            if self.state != SessionState.READY:
+                return False
+            self.pause_count = 0
+            self.paused_total = 0.0
+        return self._transition((SessionState.READY,), SessionState.RUNNING)
+
+    def pause(self) -> bool:
+        return self._transition((SessionState.RUNNING,), SessionState.PAUSED)
+
+    def resume(self) -> bool:
+        return self._transition((SessionState.PAUSED,), SessionState.RUNNING)
+
+    def toggle_pause(self) -> Optional[str]:
+        """Pause or resume; returns the new state, or None if not active"""
+        if self.pause():
+            return SessionState.PAUSED
+        if self.resume():
+            return SessionState.RUNNING
+        return None
+
+    def stop(self) -> bool:
+        return self._transition((SessionState.RUNNING, SessionState.PAUSED), SessionState.STOPPING)
+
+    def finish(self):
+        """Return to READY once the click thread has exited; a no-op when already READY"""
+        with self.cond:
+            if self.state == SessionState.READY:
+                return
+            self.finished_sessions += 1
+            self._transition((SessionState.RUNNING, SessionState.PAUSED, SessionState.STOPPING),
+                             SessionState.READY)
+
+    def wait_for_finish(self, count: int, timeout: Optional[float] = None) -> bool:
+        """Block until ``count`` sessions have finished; False on timeout"""
+        with self.cond:
+            return self.cond.wait_for(lambda: self.finished_sessions >= count, timeout)
+
+    def submit(self, command: str):
+        """Queue a command for the engine worker and wake it"""
+        with self.cond:
+            self.inbox.append(command)
+            self.cond.notify_all()
+
+    def next_command(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Block until a command is queued; None on timeout"""
+        with self.cond:
+            if not self.inbox and not self.cond.wait_for(lambda: self.inbox, timeout):
+                return None
+            return self.inbox.popleft()
+
+    def wait_for_command(self, timeout: Optional[float] = None) -> bool:
+        """Block without polling until a command is queued; False on timeout"""
+        with self.cond:
+            return bool(self.inbox) or self.cond.wait_for(lambda: self.inbox, timeout)
+
+    def paused_time(self) -> float:
+        paused = self.paused_total
+        if self.state == SessionState.PAUSED:
+            paused += self.clock() - self.pause_started
+        return paused
+
+    @property
+    def is_active(self) -> bool:
+        return self.state in (SessionState.RUNNING, SessionState.PAUSED)
+
+    @property
+    def is_paused(self) -> bool:
+        return self.state == SessionState.PAUSED
+
+MODIFIER_BITS = {"ctrl": 1, "shift": 2, "alt": 4, "windows": 8}
+MODIFIER_ALIASES = {"control": "ctrl", "alt gr": "alt", "altgr": "alt", "option": "alt",
+                    "win": "windows", "cmd": "windows", "command": "windows", "super": "windows"}
+# Every key name a modifier can arrive under, so the hook resolves it in one lookup
+MODIFIER_KEYS = {
+    f"{side}{name}": bit
+    for base, bit in MODIFIER_BITS.items()
+    for name in [base] + [alias for alias, target in MODIFIER_ALIASES.items() if target == base]
+    for side in ("", "left ", "right ")
+}
+
+def parse_hotkey(text: str) -> Tuple[str, int]:
+    """Split a hotkey like "ctrl+shift+f6" into its key name and modifier mask"""
+    if not isinstance(text, str) or not text.strip():
+        raise ValueError(f"hotkey must be a non-empty string, got {text!r}")
+    parts = [part.strip().lower() for part in text.split("+")]
+    if any(not part for part in parts):
+        raise ValueError(f"malformed hotkey '{text}'")
+    *modifiers, key = parts
+    mask = 0
+    for modifier in modifiers:
+        name = MODIFIER_ALIASES.get(modifier, modifier)
+        if name not in MODIFIER_BITS:
+            raise ValueError(f"unknown modifier '{modifier}' in hotkey '{text}'")
+        mask |= MODIFIER_BITS[name]
+    if key in MODIFIER_KEYS:
+        raise ValueError(f"hotkey '{text}' has no key besides modifiers")
+    return key, mask
+
+class KeyEvent:
+    """Minimal key event with the fields the dispatcher reads from ``keyboard`` events"""
+    __slots__ = ("event_type", "name", "scan_code", "time")
+
+    def __init__(self, event_type: str, name: str, scan_code: int = 0, time: float = 0.0):
+        self.event_type = event_type
+        self.name = name
+        self.scan_code = scan_code
+        self.time = time
+
+class SyntheticKeySource:
+    """Stands in for the ``keyboard`` module's hook API, for headless testing"""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self.clock = clock
+        self.callbacks: List[Callable] = []
+
+    def hook(self, callback: Callable) -> Callable:
+        self.callbacks.append(callback)
+        return callback
+
+    def unhook(self, callback: Callable):
+        self.callbacks.remove(callback)
+
+    def emit(self, event_type: str, name: str):
+        event = KeyEvent(event_type, name, 0, self.clock())
+        for callback in self.callbacks:
+            callback(event)
+
+    def press(self, name: str):
+        self.emit("down", name)
+
+    def release(self, name: str):
+        self.emit("up", name)
+
+    def tap(self, hotkey: str, repeats: int = 0):
+        """Press and release a hotkey, with ``repeats`` auto-repeat downs while held"""
+        *modifiers, key = [part.strip() for part in hotkey.split("+")]
+        for modifier in modifiers:
+            self.press(modifier)
+        for _ in range(repeats + 1):
+            self.press(key)
+        self.release(key)
+        for modifier in reversed(modifiers):
+            self.release(modifier)
+
+class HotkeyDispatcher:
+    """Turns key events from one low-level hook into engine commands
+
+    Bindings live in a dict keyed by (key name, modifier mask), so each
+    event costs a lookup or two. Held modifiers are tracked from the same
+    events. A down event for a key that is already held is auto-repeat
+    and ignored, and a binding does not fire again within ``debounce``
+    seconds. A matching event only calls ``submit``; everything else
+    happens on the engine worker.
+    """
+    # A key held longer than this without any event is assumed released
+    REPEAT_WINDOW = 1.0
+
+    def __init__(self, submit: Callable[[str], None], debounce: float = 0.25,
+                 clock: Callable[[], float] = time.perf_counter):
+        self.submit = submit
+        self.debounce = debounce
+        self.clock = clock
+        self.bindings: Dict[Tuple[str, int], str] = {}
+        self.last_fired: Dict[str, float] = {}
+        self.held: Dict[str, float] = {}
+        self.modifiers = 0
+        self.source = None
+        self.hook = None
+
+    def bind(self, hotkey: str, command: str):
+        chord = parse_hotkey(hotkey)
+        if chord in self.bindings and self.bindings[chord] != command:
+            raise ValueError(f"hotkey '{hotkey}' is already bound to {self.bindings[chord]}")
+        self.bindings[chord] = command
+
+    def rebind(self, hotkeys: List[Tuple[str, str]]) -> List[str]:
+        """Replace every binding at once; returns problems for hotkeys left out"""
+        table: Dict[Tuple[str, int], str] = {}
+        problems = []
+        for hotkey, command in hotkeys:
+            try:
+                chord = parse_hotkey(hotkey)
+                if chord in table:
+                    raise ValueError(f"hotkey '{hotkey}' is already bound to {table[chord]}")
+                table[chord] = command
+            except ValueError as e:
+                problems.append(str(e))
+        # A single reference swap, so the hook thread sees the old table or the new one
+        self.bindings = table
+        return problems
+
+    def handle(self, event):
+        """Hook callback; runs on the keyboard hook thread"""
+        name = event.name
+        if not name:
+            return
+        name = name.lower()
+        bit = MODIFIER_KEYS.get(name)
+        if event.event_type == "up":
+            self.held.pop(name, None)
+            if bit:
+                self.modifiers &= ~bit
+            return
+        now = self.clock()
+        last = self.held.get(name)
+        self.held[name] = now
+        if last is not None and now - last < self.REPEAT_WINDOW:
+            return
+        if bit:
+            self.modifiers |= bit
+            return
+        command = self.bindings.get((name, self.modifiers))
+        if command is None:
+            return
+        if now - self.last_fired.get(command, -self.debounce) < self.debounce:
+            return
+        self.last_fired[command] = now
+        self.submit(command)
+
+    def install(self, source=None, on_event: Optional[Callable[[float, float], None]] = None):
+        """Hook the key source (the ``keyboard`` module by default)
+
+        ``on_event`` receives the start and end time of every handled
+        event; without it the hook calls ``handle`` directly.
+        """
+        self.source = source or keyboard
+        handler = self.handle
+        if on_event is not None:
+            handle, clock = self.handle, time.perf_counter
+            
+            def handler(event):
+                started = clock()
+                handle(event)
+                on_event(started, clock())
+        self.hook = self.source.hook(handler)
+
+    def uninstall(self):
+        if self.hook is not None:
+            self.source.unhook(self.hook)
+            self.hook = None
+
+def require_numpy():
+    """Import NumPy for the vision features, with a readable error if missing"""
+    try:
+        return importlib.import_module("numpy")
+    except ImportError:
+        raise RuntimeError("Vision features require numpy (pip install numpy)") from None
+
+def load_image(path: str):
+    """Load an image file as an RGB uint8 array (.npy needs only NumPy)"""
+    np = require_numpy()
+    if path.endswith(".npy"):
+        return np.load(path)
+    try:
+        from PIL import Image
+    except ImportError:
+        raise RuntimeError(f"Loading {path} requires Pillow (pip install pillow)") from None
+    with Image.open(path) as image:
+        return np.asarray(image.convert("RGB"))
+
+class _BITMAPINFOHEADER(ctypes.Structure):
+    _fields_ = [("biSize", ctypes.wintypes.DWORD), ("biWidth", ctypes.wintypes.LONG),
+                ("biHeight", ctypes.wintypes.LONG), ("biPlanes", ctypes.wintypes.WORD),
+                ("biBitCount", ctypes.wintypes.WORD), ("biCompression", ctypes.wintypes.DWORD),
+                ("biSizeImage", ctypes.wintypes.DWORD), ("biXPelsPerMeter", ctypes.wintypes.LONG),
+                ("biYPelsPerMeter", ctypes.wintypes.LONG), ("biClrUsed", ctypes.wintypes.DWORD),
+                ("biClrImportant", ctypes.wintypes.DWORD)]
+
+class ScreenRegionCapture:
+    """Region-only GDI screen grab into a buffer that is reused every frame
+
+    ``grab`` returns the same (height, width, 4) BGRA array each time, so
+    callers must not keep a frame across grabs.
+    """
+    SRCCOPY = 0x00CC0020
+
+    def __init__(self, x: int, y: int, width: int, height: int):
+        if os.name != 'nt':
+            raise RuntimeError("Screen capture is only available on Windows")
+        np = require_numpy()
+        self.x, self.y, self.width, self.height = x, y, width, height
+        self.user32 = ctypes.windll.user32
+        self.gdi32 = ctypes.windll.gdi32
+        for func in (self.user32.GetDC, self.gdi32.CreateCompatibleDC,
+                     self.gdi32.CreateCompatibleBitmap, self.gdi32.SelectObject):
+            func.restype = ctypes.c_void_p
+        self.screen_dc = ctypes.c_void_p(self.user32.GetDC(None))
+        self.mem_dc = ctypes.c_void_p(self.gdi32.CreateCompatibleDC(self.screen_dc))
+        self.bitmap = ctypes.c_void_p(self.gdi32.CreateCompatibleBitmap(self.screen_dc, width, height))
+        self.gdi32.SelectObject(self.mem_dc, self.bitmap)
+
+        self.info = _BITMAPINFOHEADER()
+        self.info.biSize = ctypes.sizeof(_BITMAPINFOHEADER)
+        self.info.biWidth = width
+        self.info.biHeight = -height  # top-down rows
+        self.info.biPlanes = 1
+        self.info.biBitCount = 32
+        self.buffer = (ctypes.c_ubyte * (width * height * 4))()
+        self.frame = np.frombuffer(self.buffer, dtype=np.uint8).reshape(height, width, 4)
+
+    def grab(self):
+        self.gdi32.BitBlt(self.mem_dc, 0, 0, self.width, self.height,
+                          self.screen_dc, self.x, self.y, self.SRCCOPY)
+        self.gdi32.GetDIBits(self.mem_dc, self.bitmap, 0, self.height,
+                             self.buffer, ctypes.byref(self.info), 0)
+        return self.frame
+
+    def close(self):
+        self.gdi32.DeleteObject(self.bitmap)
+        self.gdi32.DeleteDC(self.mem_dc)
+        self.user32.ReleaseDC(None, self.screen_dc)
+
+class FixtureFrameSource:
+    """Serves frames from image files or arrays in turn, for headless testing"""
+
+    def __init__(self, frames):
+        self.frames = [load_image(f) if isinstance(f, str) else f for f in frames]
+        self.index = 0
+
+    def grab(self):
+        frame = self.frames[self.index]
+        self.index = (self.index + 1) % len(self.frames)
+        return frame
+
+    def close(self):
+        pass
+
+class RegionSignature:
+    """Downscaled grayscale block-mean signature of a captured region
+
+    Each of the ``size`` x ``size`` blocks is averaged from at most 8x8
+    evenly strided samples, so the cost stays flat as the region grows.
+    Scratch arrays are allocated once for the region size.
+    """
+    MAX_SAMPLES = 8
+
+    def __init__(self, width: int, height: int, size: int = 16):
+        np = self.np = require_numpy()
+        blocks_y, self.row_step, self.rows, samples_y = self._axis(height, size)
+        blocks_x, self.col_step, self.cols, samples_x = self._axis(width, size)
+        self.gray = np.empty((blocks_y * samples_y, blocks_x * samples_x), dtype=np.float32)
+        self.blocks = self.gray.reshape(blocks_y, samples_y, blocks_x, samples_x)
+        self.out = np.empty((blocks_y, blocks_x), dtype=np.float32)
+
+    @classmethod
+    def _axis(cls, length: int, size: int) -> Tuple[int, int, int, int]:
+        """Block count, sample stride, covered length and samples per block"""
+        blocks = max(1, min(size, length))
+        block = max(1, length // blocks)
+        step = max(1, block // cls.MAX_SAMPLES)
+        block -= block % step
+        return blocks, step, blocks * block, block // step
+
+    def compute(self, frame):
+        """Signature in 0..1 units; returns the shared output array"""
+        np = self.np
+        gray = self.gray
+        pixels = frame[:self.rows:self.row_step, :self.cols:self.col_step]
+        if pixels.ndim == 2:
+            np.multiply(pixels, 3, out=gray, dtype=np.float32, casting="unsafe")
+        else:
+            np.add(pixels[..., 0], pixels[..., 1], out=gray, dtype=np.float32)
+            np.add(gray, pixels[..., 2], out=gray)
+        np.mean(self.blocks, axis=(1, 3), out=self.out)
+        self.out *= 1 / 765
+        return self.out
+
+class VisionGate:
+    """Lets clicks through only while a screen region matches a reference"""
+
+    def __init__(self, source, reference, width: int, height: int, threshold: float = 0.08):
+        self.source = source
+        self.signature = RegionSignature(width, height)
+        self.reference = reference
+        self.threshold = threshold
+        self.diff = self.signature.np.empty_like(reference)
+
+    @classmethod
+    def reference_from_frame(cls, frame, width: int, height: int):
+        """Signature to store as the reference for the given frame"""
+        return RegionSignature(width, height).compute(frame).copy()
+
+    def difference(self) -> float:
+        """Mean absolute difference between the current frame and the reference"""
+        np = self.signature.np
+        current = self.signature.compute(self.source.grab())
+        np.subtract(current, self.reference, out=self.diff)
+        np.abs(self.diff, out=self.diff)
+        return float(self.diff.mean())
+
+    def matches(self) -> bool:
+        return self.difference() <= self.threshold
+
+    def close(self):
+        self.source.close()
+
+class GateCheck:
+    """Per-tick vision gate check that times itself and counts held-back ticks"""
+
+    def __init__(self, gate: VisionGate, metrics: SessionMetrics, clock: Callable[[], float] = time.perf_counter):
+        self.gate = gate
+        self.matches = gate.matches
+        self.record = metrics.gate_latency.record
+        self.gated = metrics.gated_ticks.cell()
+        self.clock = clock
+
+    def open_at(self, tick: float) -> Optional[float]:
+        """Time the gate was seen open, or None if it holds the tick back"""
+        is_open = self.matches()
+        opened = self.clock()
+        self.record(opened - tick)
+        if not is_open:
+            self.gated[0] += 1
+            return None
+        return opened
+
+    def close(self):
+        self.gate.close()
+
+CLASSIFIER_ACTIONS = ("click", "wait", "key", "choice")
+
+def parse_action(action: str) -> Tuple[str, str]:
+    """Split a classifier action like "key:space" into kind and argument"""
+    if not isinstance(action, str):
+        raise ValueError(f"action must be a string, got {action!r}")
+    kind, _, arg = action.partition(":")
+    if kind not in CLASSIFIER_ACTIONS:
+        raise ValueError(f"unknown action '{action}', expected one of {', '.join(CLASSIFIER_ACTIONS)}")
+    if kind == "key" and not arg:
+        raise ValueError(f"action '{action}' needs a key name, e.g. key:space")
+    if kind == "choice" and not (arg.isdigit() and int(arg) >= 1):
+        raise ValueError(f"action '{action}' needs a choice number from 1, e.g. choice:1")
+    return kind, arg
+
+def crop_region(image, x: int, y: int, width: int, height: int):
+    """Region of a full screenshot, or the image itself if it is already region-sized"""
+    if image.shape[:2] == (height, width):
+        return image
+    region = image[y:y + height, x:x + width]
+    if region.shape[:2] != (height, width):
+        raise ValueError(f"screenshot of {image.shape[1]}x{image.shape[0]} does not contain the "
+                         f"{width}x{height} region at ({x}, {y})")
+    return region
+
+class TemplateIndex:
+    """Labelled template signatures stacked into one matrix for vectorized matching
+
+    Built once from screenshots and cached on disk; the cache is keyed on
+    the template files' paths, sizes and modification times and the
+    region, so it is rebuilt only when one of them changes.
+    """
+
+    def __init__(self, labels: List[str], signatures):
+        self.labels = labels
+        self.signatures = signatures
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    @classmethod
+    def build(cls, templates: Dict[str, List[str]], region: Tuple[int, int, int, int]) -> "TemplateIndex":
+        np = require_numpy()
+        x, y, width, height = region
+        signature = RegionSignature(width, height)
+        labels, rows = [], []
+        for label, paths in templates.items():
+            for path in paths:
+                image = crop_region(load_image(path), x, y, width, height)
+                rows.append(signature.compute(image).ravel().copy())
+                labels.append(label)
+        if not rows:
+            raise ValueError("no classifier templates configured")
+        return cls(labels, np.stack(rows))
+
+    @staticmethod
+    def cache_key(templates: Dict[str, List[str]], region: Tuple[int, int, int, int]) -> str:
+        files = []
+        for label, paths in sorted(templates.items()):
+            for path in paths:
+                st = os.stat(path)
+                files.append([label, os.path.abspath(path), st.st_size, st.st_mtime_ns])
+        return json.dumps({"region": list(region), "files": files})
+
+    @classmethod
+    def load_or_build(cls, templates: Dict[str, List[str]], region: Tuple[int, int, int, int],
+                      cache_path: str) -> "TemplateIndex":
+        """Load the cached index if it is current, otherwise build and cache it"""
+        np = require_numpy()
+        key = cls.cache_key(templates, region)
+        try:
+            with np.load(cache_path) as data:
+                if str(data["key"]) == key:
+                    return cls([str(label) for label in data["labels"]], data["signatures"])
+        except (OSError, KeyError, ValueError):
+            pass
+        index = cls.build(templates, region)
+        try:
+            with open(cache_path, 'wb') as f:
+                np.savez(f, key=np.array(key), labels=np.array(index.labels), signatures=index.signatures)
+        except OSError as e:
+            logging.warning(f"Could not cache classifier templates: {e}")
+        logging.info(f"Built classifier index from {len(index)} templates")
+        return index
+
+class DialogueClassifier:
+    """Labels the current screen region by its nearest template signature
+
+    One frame costs a capture, a strided signature and a single
+    subtract/abs/mean over the template matrix into preallocated scratch
+    arrays. Frames further than ``threshold`` from every template are
+    reported as ``UNKNOWN``.
+    """
+    UNKNOWN = "unknown"
+
+    def __init__(self, source, index: TemplateIndex, width: int, height: int, threshold: float = 0.1):
+        self.source = source
+        self.index = index
+        self.threshold = threshold
+        self.signature = RegionSignature(width, height)
+        np = self.signature.np
+        self.scratch = np.empty_like(index.signatures)
+        self.distances = np.empty(len(index), dtype=index.signatures.dtype)
+
+    def match(self, frame) -> Tuple[str, float]:
+        np = self.signature.np
+        current = self.signature.compute(frame).ravel()
+        np.subtract(self.index.signatures, current, out=self.scratch)
+        np.abs(self.scratch, out=self.scratch)
+        np.mean(self.scratch, axis=1, out=self.distances)
+        best = int(self.distances.argmin())
+        distance = float(self.distances[best])
+        return (self.index.labels[best] if distance <= self.threshold else self.UNKNOWN), distance
+
+    def classify(self) -> Tuple[str, float]:
+        return self.match(self.source.grab())
+
+    def close(self):
+        self.source.close()
+
+class ActionPicker:
+    """Classifies the screen every ``interval`` seconds and picks each tick's action
+
+    ``pick`` returns ``("click", None)`` to click the plan, ``("wait", None)``
+    to hold the tick back, and key or choice actions at most once per
+    ``cooldown``, ``("cooldown", None)`` in between. ``on_state`` is
+    called whenever the classified state changes.
+    """
+
+    def __init__(self, classifier: DialogueClassifier, actions: Dict[str, Tuple[str, object]],
+                 interval: float, cooldown: float, metrics: SessionMetrics,
+                 on_state: Callable[[str], None] = lambda state: None, state: str = "",
+                 state_counts: Optional[Dict[str, int]] = None, clock: Callable[[], float] = time.perf_counter):
+        self.classifier = classifier
+        self.actions = actions
+        self.interval = interval
+        self.cooldown = cooldown
+        self.record = metrics.classifier_latency.record
+        self.on_state = on_state
+        self.state = state
+        self.state_counts = {} if state_counts is None else state_counts
+        self.clock = clock
+        self.kind, self.value = "click", None
+        self.next_classify = 0.0
+        self.next_action = 0.0
+
+    def retarget(self, actions: Dict[str, Tuple[str, object]]):
+        """Swap in actions resolved for a new game area and classify again on the next tick"""
+        self.actions = actions
+        self.next_classify = 0.0
+
+    def pick(self, tick: float) -> Tuple[str, object]:
+        if tick >= self.next_classify:
+            self.next_classify = tick + self.interval
+            state, _ = self.classifier.classify()
+            self.record(self.clock() - tick)
+            self.state_counts[state] = self.state_counts.get(state, 0) + 1
+            if state != self.state:
+                self.state = state
+                self.on_state(state)
+            self.kind, self.value = self.actions.get(state) or self.actions[DialogueClassifier.UNKNOWN]
+        if self.kind == "click" or self.kind == "wait":
+            return self.kind, self.value
+        # Keys and choices fire once per cooldown, not at the click rate
+        if tick < self.next_action:
+            return "cooldown", None
+        self.next_action = tick + self.cooldown
+        return self.kind, self.value
+
+    def close(self):
+        self.classifier.close()
+
+class RegionChangeProbe:
+    """Reports whether a screen region changed since the last reported change
+
+    Uses a coarse 8x8 signature so a probe costs a fraction of a
+    millisecond. Comparing against the last changed frame rather than the
+    previous one lets slow fades add up to a change.
+    """
+
+    def __init__(self, source, width: int, height: int, threshold: float = 0.02):
+        self.source = source
+        self.signature = RegionSignature(width, height, size=8)
+        self.threshold = threshold
+        self.baseline = None
+        self.diff = None
+
+    def __call__(self) -> bool:
+        np = self.signature.np
+        current = self.signature.compute(self.source.grab())
+        if self.baseline is None:
+            self.baseline = current.copy()
+            self.diff = np.empty_like(current)
+            return False
+        np.subtract(current, self.baseline, out=self.diff)
+        np.abs(self.diff, out=self.diff)
+        if self.diff.mean() <= self.threshold:
+            return False
+        np.copyto(self.baseline, current)
+        return True
+
+    def close(self):
+        self.source.close()
+
+class RateController:
+    """Feedback controller adapting the click interval to on-screen progress
+
+    Starts at ``base_interval``; every probe that sees a change divides the
+    interval by ``ramp`` down to ``min_interval``, every probe that does not
+    multiplies it back up towards ``base_interval``. After ``idle_after``
+    seconds without change it switches to ``idle_interval`` (0 stops
+    clicking) while still probing every ``check_interval``, and returns to
+    the last active interval on the first change.
+    """
+
+    def __init__(self, probe: Callable[[], bool], min_interval: float, base_interval: float,
+                 idle_interval: float, idle_after: float, ramp: float = 1.5,
+                 check_interval: float = 0.05):
+        self.probe = probe
+        self.min_interval = min_interval
+        self.base_interval = max(base_interval, min_interval)
+        self.idle_interval = idle_interval
+        self.idle_after = idle_after
+        self.ramp = max(1.0, ramp)
+        self.check_interval = check_interval
+        self.interval = self.base_interval
+        self.active_interval = self.base_interval
+        self.idle = False
+        self.last_change = 0.0
+        self.next_check = 0.0
+        self.idle_started = 0.0
+        self.next_idle_click = 0.0
+        self.idle_time = 0.0
+        self.idle_periods = 0
+        self.changes = 0
+
+    def start(self, now: float):
+        self.probe()  # prime the baseline
+        self.last_change = now
+        self.next_check = now + self.check_interval
+
+    def update(self, now: float) -> bool:
+        """Probe if one is due; returns True when the interval or idle state changed"""
+        if now < self.next_check:
+            return False
+        self.next_check = now + self.check_interval
+        if self.probe():
+            self.changes += 1
+            self.last_change = now
+            if self.idle:
+                self.idle = False
+                self.idle_time += now - self.idle_started
+                self.interval = self.active_interval
+                return True
+            interval = max(self.min_interval, self.interval / self.ramp)
+        elif self.idle:
+            return False
+        elif now - self.last_change >= self.idle_after:
+            self.idle = True
+            self.idle_started = now
+            self.idle_periods += 1
+            self.active_interval = self.interval
+            return True
+        else:
+            interval = min(self.base_interval, self.interval * self.ramp)
+        changed = interval != self.interval
+        self.interval = interval
+        return changed
+
+    def allows_click(self, now: float) -> bool:
+        """Whether a tick at ``now`` clicks; idle ticks only probe, bar one per idle interval"""
+        if not self.idle:
+            return True
+        if not self.idle_interval or now < self.next_idle_click:
+            return False
+        self.next_idle_click = now + self.idle_interval
+        return True
+
+    def gap_scale(self, plan_interval: float) -> float:
+        """Factor to stretch the plan's delays by; idle ticks only probe"""
+        return (self.check_interval if self.idle else self.interval) / plan_interval
+
+    def finish(self, now: float):
+        if self.idle:
+            self.idle_time += now - self.idle_started
+            self.idle_started = now
+
+COORDINATE_MODES = ("relative", "absolute")
+
+# Known-good click positions as (label, width, height, x, y)
+RESOLUTION_PRESETS = (
+    ("1280x720 (HD)", 1280, 720, 960, 540),
+    ("1366x768", 1366, 768, 1024, 576),
+    ("1600x900 (HD+)", 1600, 900, 1200, 675),
+    ("1920x1080 (Full HD)", 1920, 1080, 1350, 750),
+    ("2560x1440 (QHD)", 2560, 1440, 1920, 1080),
+    ("3840x2160 (4K UHD)", 3840, 2160, 2700, 1500),
+)
+
+@dataclass(frozen=True)
+class ClientArea:
+    """Screen rectangle of the game's client area"""
+    left: int
+    top: int
+    width: int
+    height: int
+
+    @property
+    def profile_key(self) -> str:
+        return f"{self.width}x{self.height}"
+
+    def to_pixels(self, rel_x: float, rel_y: float) -> Tuple[int, int]:
+        return (self.left + int(round(rel_x * self.width)),
+                self.top + int(round(rel_y * self.height)))
+
+    def to_fractions(self, x: int, y: int) -> Tuple[float, float]:
+        return ((x - self.left) / self.width, (y - self.top) / self.height)
+
+def detect_client_area(window_title: str) -> ClientArea:
+    """Client area of the game window, or the primary screen if it is not found"""
+    if os.name == 'nt':
+        user32 = ctypes.windll.user32
+        try:
+            user32.SetProcessDPIAware()
+        except Exception:
+            pass
+        hwnd = user32.FindWindowW(None, window_title) if window_title else 0
+        if hwnd:
+            rect = ctypes.wintypes.RECT()
+            origin = ctypes.wintypes.POINT(0, 0)
+            if (user32.GetClientRect(hwnd, ctypes.byref(rect))
+                    and user32.ClientToScreen(hwnd, ctypes.byref(origin))
+                    and rect.right > 0 and rect.bottom > 0):
+                return ClientArea(origin.x, origin.y, rect.right, rect.bottom)
+        return ClientArea(0, 0, user32.GetSystemMetrics(0), user32.GetSystemMetrics(1))
+    width, height = pyautogui.size()
+    return ClientArea(0, 0, width, height)
+
+class WindowManager:
+    """Platform layer for the window backend: find a window and post clicks to it"""
+
+    def find_window(self, title: str, process_name: str = "") -> Optional[int]:
+        """Handle of the window with this title (or owned by this process), or None"""
+        raise NotImplementedError
+
+    def is_window(self, handle: int) -> bool:
+        raise NotImplementedError
+
+    def client_area(self, handle: int) -> Optional[ClientArea]:
+        """Screen rectangle of the window's client area"""
+        raise NotImplementedError
+
+    def post_click(self, handle: int, x: int, y: int):
+        """Deliver a left click at client coordinates without moving the cursor"""
+        raise NotImplementedError
+
+    def post_clicks(self, handle: int, x: int, y: int, count: int):
+        """Deliver ``count`` left clicks at one position"""
+        for _ in range(count):
+            self.post_click(handle, x, y)
+
+    def post_key(self, handle: int, code: int):
+        """Deliver a key press and release by scan code"""
+        raise NotImplementedError
+
+    def watch(self, handle: int, on_change: Callable[[], None]):
+        """Call ``on_change`` whenever the window moves, resizes or is destroyed"""
+
+    def unwatch(self, handle: int):
+        """Stop reporting changes for one window"""
+
+    def close(self):
+        """Stop watching and release resources"""
+
+class Win32WindowManager(WindowManager):
+    """Finds windows with FindWindowW/EnumWindows, clicks with PostMessageW
+
+    Move and resize notifications come from WinEvent hooks filtered to the
+    watched windows' processes, all serviced by one message loop thread.
+    """
+    WM_LBUTTONDOWN = 0x0201
+    WM_LBUTTONUP = 0x0202
+    WM_KEYDOWN = 0x0100
+    WM_KEYUP = 0x0101
+    WM_QUIT = 0x0012
+    MK_LBUTTON = 0x0001
+    EVENT_OBJECT_DESTROY = 0x8001
+    EVENT_OBJECT_LOCATIONCHANGE = 0x800B
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+
+    def __init__(self):
+        if os.name != 'nt':
+            raise RuntimeError("Window targeting is only available on Windows")
+        user32 = self.user32 = ctypes.windll.user32
+        self.kernel32 = ctypes.windll.kernel32
+        try:
+            user32.SetProcessDPIAware()
+        except Exception:
+            pass
+        wt = ctypes.wintypes
+        user32.PostMessageW.argtypes = (wt.HWND, wt.UINT, wt.WPARAM, wt.LPARAM)
+        user32.FindWindowW.restype = wt.HWND
+        self.watched: Dict[int, Callable[[], None]] = {}
+        self.watcher: Optional[threading.Thread] = None
+        self.watcher_thread_id = 0
+
+    def find_window(self, title: str, process_name: str = "") -> Optional[int]:
+        hwnd = self.user32.FindWindowW(None, title) if title else None
+        if hwnd or not process_name:
+            return hwnd or None
+        found = []
+        wt = ctypes.wintypes
+        
+        @ctypes.WINFUNCTYPE(wt.BOOL, wt.HWND, wt.LPARAM)
+        def visit(hwnd, _):
+            if self.user32.IsWindowVisible(hwnd) and self.process_name(hwnd).lower() == process_name.lower():
+                found.append(hwnd)
+                return False
+            return True
+        
+        self.user32.EnumWindows(visit, 0)
+        return found[0] if found else None
+
+    def process_name(self, hwnd: int) -> str:
+        pid = ctypes.wintypes.DWORD()
+        self.user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+        process = self.kernel32.OpenProcess(self.PROCESS_QUERY_LIMITED_INFORMATION, False, pid.value)
+        if not process:
+            return ""
+        try:
+            buffer = ctypes.create_unicode_buffer(260)
+            size = ctypes.wintypes.DWORD(len(buffer))
+            if not self.kernel32.QueryFullProcessImageNameW(process, 0, buffer, ctypes.byref(size)):
+                return ""
+            return os.path.basename(buffer.value)
+        finally:
+            self.kernel32.CloseHandle(process)
+
+    def is_window(self, handle: int) -> bool:
+        return bool(self.user32.IsWindow(handle))
+
+    def client_area(self, handle: int) -> Optional[ClientArea]:
+        rect = ctypes.wintypes.RECT()
+        origin = ctypes.wintypes.POINT(0, 0)
+        if (self.user32.GetClientRect(handle, ctypes.byref(rect))
+                and self.user32.ClientToScreen(handle, ctypes.byref(origin))
+                and rect.right > 0 and rect.bottom > 0):
+            return ClientArea(origin.x, origin.y, rect.right, rect.bottom)
+        return None
+
+    def post_click(self, handle: int, x: int, y: int):
+        position = (y & 0xFFFF) << 16 | (x & 0xFFFF)
+        post = self.user32.PostMessageW
+        if not (post(handle, self.WM_LBUTTONDOWN, self.MK_LBUTTON, position)
+                and post(handle, self.WM_LBUTTONUP, 0, position)):
+            raise RuntimeError("Could not post click to the game window")
+
+    def post_clicks(self, handle: int, x: int, y: int, count: int):
+        # Messages cannot be batched, but the packed position and lookups are shared
+        position = (y & 0xFFFF) << 16 | (x & 0xFFFF)
+        post = self.user32.PostMessageW
+        down, up, flags = self.WM_LBUTTONDOWN, self.WM_LBUTTONUP, self.MK_LBUTTON
+        for _ in range(count):
+            if not (post(handle, down, flags, position) and post(handle, up, 0, position)):
+                raise RuntimeError("Could not post click to the game window")
+
+    def post_key(self, handle: int, code: int):
+        vk = self.user32.MapVirtualKeyW(code, 1)  # MAPVK_VSC_TO_VK
+        down = 1 | (code & 0xFF) << 16
+        post = self.user32.PostMessageW
+        if not (post(handle, self.WM_KEYDOWN, vk, down)
+                and post(handle, self.WM_KEYUP, vk, down | 0xC0000000)):
+            raise RuntimeError("Could not post key to the game window")
+
+    def watch(self, handle: int, on_change: Callable[[], None]):
+        self.watched[handle] = on_change
+        self.restart_watcher()
+
+    def unwatch(self, handle: int):
+        if self.watched.pop(handle, None) is not None:
+            self.restart_watcher()
+
+    def restart_watcher(self):
+        """Hooks belong to the thread that set them, so re-hook on a fresh loop"""
+        self.stop_watcher()
+        if not self.watched:
+            return
+        ready = threading.Event()
+        self.watcher = threading.Thread(target=self._watch, args=(ready,), name="window-events", daemon=True)
+        self.watcher.start()
+        ready.wait(1.0)
+
+    def _watch(self, ready: threading.Event):
+        wt = ctypes.wintypes
+        self.watcher_thread_id = self.kernel32.GetCurrentThreadId()
+        user32 = self.user32
+        event_proc = ctypes.WINFUNCTYPE(None, wt.HANDLE, wt.DWORD, wt.HWND, wt.LONG, wt.LONG, wt.DWORD, wt.DWORD)
+        # HWINEVENTHOOK is pointer-sized; the default int return would truncate it on 64-bit
+        user32.SetWinEventHook.argtypes = (wt.DWORD, wt.DWORD, wt.HMODULE, event_proc, wt.DWORD, wt.DWORD, wt.DWORD)
+        user32.SetWinEventHook.restype = ctypes.c_void_p
+        user32.UnhookWinEvent.argtypes = (ctypes.c_void_p,)
+        watched = self.watched
+        pids = set()
+        for handle in watched:
+            pid = wt.DWORD()
+            user32.GetWindowThreadProcessId(handle, ctypes.byref(pid))
+            pids.add(pid.value)
+        
+        @event_proc
+        def on_event(hook, event, hwnd, id_object, id_child, thread, timestamp):
+            if id_object == 0 and event in (self.EVENT_OBJECT_DESTROY, self.EVENT_OBJECT_LOCATIONCHANGE):
+                on_change = watched.get(hwnd)
+                if on_change:
+                    on_change()
+        
+        hooks = [user32.SetWinEventHook(self.EVENT_OBJECT_DESTROY, self.EVENT_OBJECT_LOCATIONCHANGE,
+                                        None, on_event, pid, 0, 0) for pid in pids]
+        ready.set()
+        msg = wt.MSG()
+        while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+            user32.DispatchMessageW(ctypes.byref(msg))
+        for hook in hooks:
+            if hook:
+                user32.UnhookWinEvent(hook)
+
+    def stop_watcher(self):
+        if self.watcher and self.watcher.is_alive():
+            self.user32.PostThreadMessageW(self.watcher_thread_id, self.WM_QUIT, 0, 0)
+            self.watcher.join(timeout=1.0)
+        self.watcher = None
+
+    def close(self):
+        self.watched = {}
+        self.stop_watcher()
+
+class FakeWindowManager(WindowManager):
+    """In-memory windows for exercising window targeting off Windows
+
+    ``move``, ``minimize`` and ``destroy`` fire the watch callback like the
+    real hooks, and posted clicks are kept as (handle, x, y) in client
+    coordinates. A minimized window has no client area; ``move`` restores it.
+    """
+
+    def __init__(self):
+        self.windows: Dict[int, Tuple[str, str, Optional[ClientArea]]] = {}
+        self.watchers: Dict[int, Callable[[], None]] = {}
+        self.clicks: List[Tuple[int, int, int]] = []
+        self.keys: List[Tuple[int, int]] = []
+        self.lookups = 0
+        self.next_handle = 0x1000
+
+    def open(self, title: str, area: ClientArea, process_name: str = "") -> int:
+        self.next_handle += 4
+        self.windows[self.next_handle] = (title, process_name, area)
+        return self.next_handle
+
+    def move(self, handle: int, area: ClientArea):
+        title, process_name, _ = self.windows[handle]
+        self.windows[handle] = (title, process_name, area)
+        self._notify(handle)
+
+    def minimize(self, handle: int):
+        title, process_name, _ = self.windows[handle]
+        self.windows[handle] = (title, process_name, None)
+        self._notify(handle)
+
+    def destroy(self, handle: int):
+        del self.windows[handle]
+        self._notify(handle)
+
+    def _notify(self, handle: int):
+        callback = self.watchers.get(handle)
+        if callback:
+            callback()
+
+    def find_window(self, title: str, process_name: str = "") -> Optional[int]:
+        self.lookups += 1
+        for handle, (window_title, _, _) in self.windows.items():
+            if window_title == title:
+                return handle
+        for handle, (_, window_process, _) in self.windows.items():
+            if process_name and window_process.lower() == process_name.lower():
+                return handle
+        return None
+
+    def is_window(self, handle: int) -> bool:
+        return handle in self.windows
+
+    def client_area(self, handle: int) -> Optional[ClientArea]:
+        window = self.windows.get(handle)
+        return window[2] if window else None
+
+    def post_click(self, handle: int, x: int, y: int):
+        if handle not in self.windows:
+            raise RuntimeError("Could not post click to the game window")
+        self.clicks.append((handle, x, y))
+
+    def post_key(self, handle: int, code: int):
+        if handle not in self.windows:
+            raise RuntimeError("Could not post key to the game window")
+        self.keys.append((handle, code))
+
+    def watch(self, handle: int, on_change: Callable[[], None]):
+        self.watchers[handle] = on_change
+
+    def unwatch(self, handle: int):
+        self.watchers.pop(handle, None)
+
+    def close(self):
+        self.watchers = {}
+
+def create_window_manager() -> WindowManager:
+    return Win32WindowManager()
+
+class WindowTarget:
+    """The game window's handle and client area, cached between changes
+
+    The window is looked up once; the handle and rectangle are only
+    resolved again after the platform layer reports a move, resize or
+    destroy, or when the window was not found yet.
+    """
+
+    def __init__(self, manager: WindowManager, title: str, process_name: str = ""):
+        self.manager = manager
+        self.title = title
+        self.process_name = process_name
+        self.handle: Optional[int] = None
+        self.area: Optional[ClientArea] = None
+        self.dirty = True
+
+    def invalidate(self):
+        self.dirty = True
+
+    def resolve(self) -> Optional[ClientArea]:
+        """Client area of the game window, or None if it is not open"""
+        if not self.dirty:
+            return self.area
+        manager = self.manager
+        if self.handle is None or not manager.is_window(self.handle):
+            if self.handle is not None:
+                # The window was closed; it may come back under a new handle
+                manager.unwatch(self.handle)
+            self.handle = manager.find_window(self.title, self.process_name)
+            if self.handle is None:
+                self.area = None
+                return None
+            manager.watch(self.handle, self.invalidate)
+        self.dirty = False
+        self.area = manager.client_area(self.handle)
+        if self.area is None:
+            self.dirty = True
+        return self.area
+
+    def close(self):
+        if self.handle is not None:
+            self.manager.unwatch(self.handle)
+
+class WindowBackend(InputBackend):
+    """Posts clicks straight to the game window instead of moving the cursor
+
+    Click positions arrive in screen coordinates and are translated by the
+    client origin the click plan was compiled against (taken in
+    ``prepare``), so they stay right if the window moves before the plan
+    is rebuilt. The mouse stays free for other windows and the
+    screen-corner failsafe does not apply.
+    """
+    name = "window"
+
+    def __init__(self, target: Optional[WindowTarget] = None, config: Optional[Config] = None):
+        if target is None:
+            config = config or Config()
+            target = WindowTarget(create_window_manager(), config.game_window_title, config.game_process_name)
+        self.target = target
+        self.post_click = self.target.manager.post_click
+        self.left = self.top = 0
+
+    def locate(self) -> ClientArea:
+        area = self.target.resolve()
+        if area is None:
+            raise RuntimeError(f"Game window '{self.target.title}' not found")
+        return area
+
+    def prepare(self, x: int, y: int):
+        area = self.locate()
+        self.left, self.top = area.left, area.top
+
+    def click(self, x: int, y: int):
+        target = self.target
+        if target.dirty:
+            self.locate()
+        self.post_click(target.handle, x - self.left, y - self.top)
+
+    def click_burst(self, x: int, y: int, count: int):
+        target = self.target
+        if target.dirty:
+            self.locate()
+        target.manager.post_clicks(target.handle, x - self.left, y - self.top, count)
+
+    def key(self, code: int):
+        target = self.target
+        if target.dirty:
+            self.locate()
+        self.target.manager.post_key(target.handle, code)
+
+# Registered here because it needs ClientArea
+INPUT_BACKENDS[WindowBackend.name] = WindowBackend
+
+class ClickPlan:
+    """Compiled click timeline: flat, preallocated (x, y, delay) arrays
+
+    The click engine walks these by index, so playback does no per-click
+    dict or object lookups. ``delays[i]`` is the gap after step ``i``.
+    """
+
+    def __init__(self, steps: List[Tuple[int, int, float]]):
+        if not steps:
+            raise ValueError("A click plan needs at least one step")
+        self.xs = array('i', (step[0] for step in steps))
+        self.ys = array('i', (step[1] for step in steps))
+        self.delays = array('d', (step[2] for step in steps))
+
+    @classmethod
+    def single(cls, x: int, y: int, interval: float) -> "ClickPlan":
+        return cls([(x, y, interval)])
+
+    def __len__(self) -> int:
+        return len(self.xs)
+
+    @property
+    def cycle_time(self) -> float:
+        return sum(self.delays)
+
+    @property
+    def mean_delay(self) -> float:
+        return self.cycle_time / len(self)
+
+    def run_lengths(self) -> array:
+        """Consecutive steps from each step that click the same position
+
+        Lets the engine hand a run of due clicks to the backend as one
+        burst. A plan with a single position never ends its run.
+        """
+        steps = len(self)
+        positions = list(zip(self.xs, self.ys))
+        if len(set(positions)) == 1:
+            return array('i', [1 << 30] * steps)
+        runs = array('i', [1] * steps)
+        for i in range(steps - 2, -1, -1):
+            if positions[i] == positions[i + 1]:
+                runs[i] = runs[i + 1] + 1
+        return runs
+
+    def burst_delays(self, size: int) -> array:
+        """Gap after a burst of ``size`` clicks starting at each step"""
+        delays, steps = self.delays, len(self)
+        if size <= 1:
+            return delays
+        return array('d', (sum(delays[(i + j) % steps] for j in range(size)) for i in range(steps)))
+
+    def same_targets(self, other: "ClickPlan") -> bool:
+        return self.xs == other.xs and self.ys == other.ys and self.delays == other.delays
+
+    def timeline(self) -> List[str]:
+        """Human-readable listing of one cycle"""
+        lines = []
+        at = 0.0
+        for i in range(len(self)):
+            lines.append(f"{i + 1:>4}  t+{at * 1000:9.1f}ms  click ({self.xs[i]}, {self.ys[i]})  then wait {self.delays[i] * 1000:.1f}ms")
+            at += self.delays[i]
+        return lines
+
+class ClickCursor:
+    """Position within a ClickPlan that fires the clicks due at each tick
+
+    ``burst`` clicks share one sleep in low power mode; ``gaps[step]`` is
+    the wait after the burst starting at ``step``. Runs of due clicks on
+    one position go to the backend as a single burst.
+    """
+
+    def __init__(self, plan: ClickPlan, burst: int = 1):
+        self.burst = burst
+        self.step = 0
+        self.load(plan)
+
+    def load(self, plan: ClickPlan):
+        """Switch to a new plan, keeping the position within the cycle"""
+        self.plan = plan
+        self.xs, self.ys, self.delays = plan.xs, plan.ys, plan.delays
+        self.steps = len(plan)
+        self.gaps = plan.burst_delays(self.burst)
+        self.runs = plan.run_lengths()
+        self.step %= self.steps
+
+    @property
+    def position(self) -> Tuple[int, int]:
+        return self.xs[self.step], self.ys[self.step]
+
+    def burst_clicks(self, due: int, scale: float, left: float) -> int:
+        """Clicks of a due burst that fall less than ``left`` seconds after its first"""
+        delays, step, steps = self.delays, self.step, self.steps
+        fired = 1
+        offset = delays[step] * scale
+        while fired < due and offset < left:
+            offset += delays[(step + fired) % steps] * scale
+            fired += 1
+        return fired
+
+    def fire(self, backend: InputBackend, due: int):
+        """Click the next ``due`` steps of the plan"""
+        xs, ys, step = self.xs, self.ys, self.step
+        if due == 1:
+            backend.click(xs[step], ys[step])
+            step += 1
+            self.step = 0 if step == self.steps else step
+            return
+        runs, steps = self.runs, self.steps
+        while due:
+            n = runs[step]
+            if n > due:
+                n = due
+            if n == 1:
+                backend.click(xs[step], ys[step])
+            else:
+                backend.click_burst(xs[step], ys[step], n)
+            due -= n
+            step = (step + n) % steps
+        self.step = step
+
+def validate_sequence(steps) -> List[str]:
+    """Return a list of problems with a click_sequence config value"""
+    if not isinstance(steps, list):
+        return ["click_sequence must be a list of steps"]
+    errors = []
+    for number, step in enumerate(steps, 1):
+        if not isinstance(step, dict):
+            errors.append(f"step {number}: must be an object")
+            continue
+        if "rel_x" in step or "rel_y" in step:
+            for key in ("rel_x", "rel_y"):
+                value = step.get(key)
+                if not isinstance(value, (int, float)) or not 0 <= value <= 1:
+                    errors.append(f"step {number}: {key} must be a number between 0 and 1")
+        else:
+            for key in ("x", "y"):
+                if not isinstance(step.get(key), int):
+                    errors.append(f"step {number}: {key} must be an integer (or use rel_x/rel_y)")
+        delay = step.get("delay")
+        if delay is not None and (not isinstance(delay, (int, float)) or not 0.001 <= delay <= 10):
+            errors.append(f"step {number}: delay must be between 0.001 and 10 seconds")
+        repeat = step.get("repeat", 1)
+        if not isinstance(repeat, int) or not 1 <= repeat <= 10000:
+            errors.append(f"step {number}: repeat must be an integer between 1 and 10000")
+        unknown = set(step) - {"x", "y", "rel_x", "rel_y", "delay", "repeat"}
+        if unknown:
+            errors.append(f"step {number}: unknown keys {', '.join(sorted(unknown))}")
+    return errors
+
+def compile_sequence(steps, area: Optional[ClientArea], default_delay: float) -> ClickPlan:
+    """Validate a click_sequence and expand it into a flat ClickPlan"""
+    errors = validate_sequence(steps)
+    if errors:
+        raise ValueError("; ".join(errors))
+    compiled = []
+    for number, step in enumerate(steps, 1):
+        if "rel_x" in step:
+            if area is None:
+                raise ValueError(f"step {number}: relative coordinates need the game area")
+            x, y = area.to_pixels(step["rel_x"], step["rel_y"])
+        else:
+            x, y = step["x"], step["y"]
+        delay = float(step.get("delay", default_delay))
+        compiled.extend([(x, y, delay)] * step.get("repeat", 1))
+    return ClickPlan(compiled)
+
+def plan_for_config(config: "Config", area: Optional[ClientArea]) -> ClickPlan:
+    """Click plan for a config on its own, without a DialogueSkipper's caches"""
+    if config.click_sequence:
+        return compile_sequence(config.click_sequence, area, config.click_interval)
+    if config.coordinate_mode == "absolute" or area is None:
+        return ClickPlan.single(config.click_x, config.click_y, config.click_interval)
+    rel_x, rel_y = config.monitor_profiles.get(area.profile_key) or (config.click_rel_x, config.click_rel_y)
+    return ClickPlan.single(*area.to_pixels(rel_x, rel_y), config.click_interval)
+
+class GeometryWatch:
+    """Rechecks the game area every ``interval`` seconds for a plan that depends on it"""
+
+    def __init__(self, current_area: Callable[[], Optional[ClientArea]],
+                 build_plan: Callable[[ClientArea], ClickPlan], interval: float, now: float):
+        self.current_area = current_area
+        self.build_plan = build_plan
+        self.interval = interval
+        self.next_check = now + interval
+
+    def check(self, now: float, plan: ClickPlan) -> Optional[Tuple[ClickPlan, ClientArea]]:
+        """The recompiled plan and its area if the area changed since ``plan`` was built"""
+        if now < self.next_check:
+            return None
+        self.next_check = now + self.interval
+        area = self.current_area()
+        if not area:
+            return None
+        new_plan = self.build_plan(area)
+        return None if new_plan.same_targets(plan) else (new_plan, area)
+
+class ClickSession:
+    """Per-session state of click_loop: the plan cursor and the per-tick features
+
+    A config reload swaps features in and out at a tick boundary; the
+    loop itself only dispatches to them.
+    """
+
+    def __init__(self, fixed: Optional[Tuple[int, int]], cursor: ClickCursor, scheduler: ClickScheduler,
+                 metrics: SessionMetrics, backend: InputBackend):
+        self.fixed = fixed  # explicit (x, y) from the caller, or None to follow the config
+        self.cursor = cursor
+        self.scheduler = scheduler
+        self.metrics = metrics
+        self.backend = backend
+        self.geometry: Optional[GeometryWatch] = None
+        self.gate: Optional[GateCheck] = None
+        self.actions: Optional[ActionPicker] = None
+        self.controller: Optional[RateController] = None
+        self.state_counts: Dict[str, int] = {}
+        self.rate_changed = False
+
+    def close(self, now: float):
+        if self.gate:
+            self.gate.close()
+        if self.actions:
+            self.actions.close()
+        if self.controller:
+            self.controller.finish(now)
+            self.controller.probe.close()
+
+class InstanceSession:
+    """One game client's click plan and counters inside a MultiClickEngine"""
+
+    def __init__(self, name: str, plan: ClickPlan, backend: InputBackend, auto_stop_time: float):
+        self.name = name
+        self.xs, self.ys, self.delays = plan.xs, plan.ys, plan.delays
+        self.steps = len(plan)
+        self.step = 0
+        self.target_rate = 1 / plan.mean_delay
+        self.backend = backend
+        self.auto_stop_time = auto_stop_time
+        self.stop_at = 0.0
+        self.clicks = 0
+        self.missed_ticks = 0
+        self.done = False
+        self.error = ""
+
+class MultiClickEngine:
+    """Interleaves many click sessions on one thread with a deadline heap
+
+    Every session keeps its own absolute deadline grid, as ClickScheduler
+    does for one. The heap holds one (deadline, index) entry per running
+    session, so each tick costs O(log n) and the thread sleeps once until
+    the earliest deadline, however many targets there are. ``wait`` is
+    called for every sleep and may return True to hand control back early
+    (a command arrived); ``run`` then returns and can be called again.
+    """
+
+    def __init__(self, sessions: List[InstanceSession], policy: str = "skip", max_catch_up: int = 5,
+                 clock: Callable[[], float] = time.perf_counter,
+                 wait: Callable[[float], bool] = lambda timeout: bool(time.sleep(timeout))):
+        if policy not in MISSED_TICK_POLICIES:
+            raise ValueError(f"Unknown missed tick policy: {policy}")
+        self.sessions = sessions
+        self.policy = policy
+        self.max_catch_up = max(0, max_catch_up)
+        self.clock = clock
+        self.wait = wait
+        self.heap: List[Tuple[float, int]] = []
+        self.lateness = LatencyHistogram()
+        self.wakeups = 0
+        self.start_time = 0.0
+
+    def start(self):
+        now = self.start_time = self.clock()
+        for index, session in enumerate(self.sessions):
+            session.stop_at = now + session.auto_stop_time
+            session.backend.prepare(session.xs[0], session.ys[0])
+        self.heap = [(now, index) for index in range(len(self.sessions))]
+        heapq.heapify(self.heap)
+
+    def shift(self, seconds: float, stop_times: bool = True):
+        """Move every pending deadline later, e.g. by the length of a pause"""
+        # Adding the same amount to every key keeps the heap ordered
+        self.heap = [(deadline + seconds, index) for deadline, index in self.heap]
+        if stop_times:
+            for session in self.sessions:
+                session.stop_at += seconds
+
+    def expire(self, now: float) -> bool:
+        """End the sessions whose auto-stop time has passed, e.g. while paused; True if any still run"""
+        sessions = self.sessions
+        for _, index in self.heap:
+            if sessions[index].stop_at <= now:
+                sessions[index].done = True
+        self.heap = [entry for entry in self.heap if not sessions[entry[1]].done]
+        heapq.heapify(self.heap)
+        return self.running
+
+    @property
+    def next_stop(self) -> float:
+        """Earliest auto-stop time among the running sessions"""
+        return min(self.sessions[index].stop_at for _, index in self.heap)
+
+    @property
+    def running(self) -> bool:
+        return bool(self.heap)
+
+    @property
+    def clicks(self) -> int:
+        return sum(session.clicks for session in self.sessions)
+
+    def run(self) -> bool:
+        """Click until every session is done (True) or ``wait`` interrupts (False)"""
+        heap, sessions, clock = self.heap, self.sessions, self.clock
+        catch_up = self.policy == "catch_up"
+        max_catch_up = self.max_catch_up
+        record_lateness = self.lateness.record
+        while heap:
+            deadline, index = heap[0]
+            now = clock()
+            if now < deadline:
+                self.wakeups += 1
+                if self.wait(deadline - now):
+                    return False
+                continue
+            session = sessions[index]
+            if deadline >= session.stop_at:
+                heapq.heappop(heap)
+                session.done = True
+                continue
+            step = session.step
+            gap = session.delays[step]
+            late = int((now - deadline) / gap)
+            due = 1 + min(late, max_catch_up) if late > 0 and catch_up else 1
+            session.missed_ticks += late + 1 - due
+            record_lateness(now - deadline)
+            xs, ys, steps, click = session.xs, session.ys, session.steps, session.backend.click
+            try:
+                for _ in range(due):
+                    click(xs[step], ys[step])
+                    step += 1
+                    if step == steps:
+                        step = 0
+            except FailSafeError:
+                raise
+            except Exception as e:
+                heapq.heappop(heap)
+                session.error = str(e)
+                session.done = True
+                logging.error(f"Instance {session.name} stopped: {e}")
+                continue
+            session.clicks += due
+            session.step = step
+            heapq.heapreplace(heap, (deadline + (late + 1) * gap, index))
+        return True
+
+# Macro traces: a fixed header followed by one column per field, so replay
+# can index straight into the memory map. Columns are ordered by item size
+# to keep every one of them aligned.
+TRACE_MAGIC = b"DSKT"
+TRACE_VERSION = 1
+TRACE_HEADER = struct.Struct("<4sHHdIiiiid4x")  # magic, version, flags, created, count, area, duration
+TRACE_COLUMNS = (("times", 'd'), ("xs", 'i'), ("ys", 'i'), ("codes", 'H'), ("kinds", 'B'))
+TRACE_CLICK = 1
+TRACE_KEY = 2
+
+class TraceRecorder:
+    """Collects clicks and key presses into column arrays
+
+    The mouse and keyboard hooks call in from their own threads, so
+    appends are serialized; timestamps come from ``perf_counter``.
+    """
+
+    def __init__(self, area: Optional[ClientArea] = None,
+                 clock: Callable[[], float] = time.perf_counter):
+        self.area = area
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.started = 0.0
+        self.created = 0.0
+        self.columns = {name: array(code) for name, code in TRACE_COLUMNS}
+
+    def start(self):
+        self.started = self.clock()
+        self.created = time.time()
+
+    def __len__(self) -> int:
+        return len(self.columns["times"])
+
+    def click(self, x: int, y: int):
+        self._add(TRACE_CLICK, 0, x, y)
+
+    def key(self, code: int):
+        self._add(TRACE_KEY, code, 0, 0)
+
+    def _add(self, kind: int, code: int, x: int, y: int):
+        offset = self.clock() - self.started
+        columns = self.columns
+        with self.lock:
+            columns["times"].append(offset)
+            columns["xs"].append(x)
+            columns["ys"].append(y)
+            columns["codes"].append(code)
+            columns["kinds"].append(kind)
+
+    def save(self, path: str):
+        """Write the trace as header plus raw little-endian columns"""
+        with self.lock:
+            columns = {name: array(column.typecode, column) for name, column in self.columns.items()}
+        count = len(columns["times"])
+        area = self.area or ClientArea(0, 0, 0, 0)
+        duration = columns["times"][-1] if count else 0.0
+        with open(path, 'wb') as f:
+            f.write(TRACE_HEADER.pack(TRACE_MAGIC, TRACE_VERSION, 0, self.created, count,
+                                      area.left, area.top, area.width, area.height, duration))
+            for name, _ in TRACE_COLUMNS:
+                column = columns[name]
+                if sys.byteorder != "little":
+                    column.byteswap()
+                column.tofile(f)
+
+class Trace:
+    """Memory-mapped macro trace; columns are zero-copy views into the map
+
+    Events are read by index straight from the mapped file, so a
+    multi-hour trace never becomes a list of Python objects.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (magic, version, _, self.created, self.count, left, top, width, height,
+             self.duration) = TRACE_HEADER.unpack_from(self.map)
+        except struct.error:
+            self.map.close()
+            raise ValueError(f"{path} is not a macro trace") from None
+        if magic != TRACE_MAGIC or version != TRACE_VERSION:
+            self.map.close()
+            raise ValueError(f"{path} is not a version {TRACE_VERSION} macro trace")
+        self.area = ClientArea(left, top, width, height) if width and height else None
+        # Checked up front: once a column view exists the map cannot be closed
+        sizes = [array(code).itemsize * self.count for _, code in TRACE_COLUMNS]
+        if TRACE_HEADER.size + sum(sizes) > len(self.map):
+            self.map.close()
+            raise ValueError(f"{path} is truncated")
+        view = memoryview(self.map)
+        offset = TRACE_HEADER.size
+        for (name, code), size in zip(TRACE_COLUMNS, sizes):
+            column = view[offset:offset + size]
+            if sys.byteorder == "little":
+                column = column.cast(code)
+            else:
+                column = array(code, column.tobytes())
+                column.byteswap()
+            setattr(self, name, column)
+            offset += size
+        self.view = view
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self):
+        for name, _ in TRACE_COLUMNS:
+            column = getattr(self, name)
+            if isinstance(column, memoryview):
+                column.release()
+        self.view.release()
+        self.map.close()
+
+class Win32MouseHook:
+    """Low-level mouse hook reporting left-button presses at screen coordinates"""
+    WH_MOUSE_LL = 14
+    WM_LBUTTONDOWN = 0x0201
+    WM_QUIT = 0x0012
+
+    def __init__(self, on_click: Callable[[int, int], None]):
+        if os.name != 'nt':
+            raise RuntimeError("Mouse recording is only available on Windows")
+        self.on_click = on_click
+        self.user32 = ctypes.windll.user32
+        self.kernel32 = ctypes.windll.kernel32
+        self.thread: Optional[threading.Thread] = None
+        self.thread_id = 0
+
+    def start(self):
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(ready,), name="mouse-hook", daemon=True)
+        self.thread.start()
+        ready.wait(1.0)
+
+    def _run(self, ready: threading.Event):
+        wt = ctypes.wintypes
+        self.thread_id = self.kernel32.GetCurrentThreadId()
+        user32 = self.user32
+        user32.CallNextHookEx.argtypes = (ctypes.c_void_p, ctypes.c_int, wt.WPARAM, wt.LPARAM)
+        user32.CallNextHookEx.restype = ctypes.c_ssize_t
+        user32.SetWindowsHookExW.restype = ctypes.c_void_p
+        
+        @ctypes.WINFUNCTYPE(ctypes.c_ssize_t, ctypes.c_int, wt.WPARAM, wt.LPARAM)
+        def on_event(code, message, info):
+            if code >= 0 and message == self.WM_LBUTTONDOWN:
+                point = ctypes.cast(info, ctypes.POINTER(wt.POINT)).contents  # MSLLHOOKSTRUCT.pt
+                self.on_click(point.x, point.y)
+            return user32.CallNextHookEx(None, code, message, info)
+        
+        hook = user32.SetWindowsHookExW(self.WH_MOUSE_LL, on_event, self.kernel32.GetModuleHandleW(None), 0)
+        ready.set()
+        msg = wt.MSG()
+        while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+            user32.DispatchMessageW(ctypes.byref(msg))
+        if hook:
+            user32.UnhookWindowsHookEx(ctypes.c_void_p(hook))
+
+    def stop(self):
+        if self.thread and self.thread.is_alive():
+            self.user32.PostThreadMessageW(self.thread_id, self.WM_QUIT, 0, 0)
+            self.thread.join(timeout=1.0)
+
+CONFIG_FILE = 'dialogue_skipper_config.json'
+CONFIG_VERSION = 2
+CONFIG_CHOICES: Dict[str, Tuple[str, ...]] = {
+    "missed_tick_policy": MISSED_TICK_POLICIES,
+    "power_mode": POWER_MODES,
+    "coordinate_mode": COORDINATE_MODES,
+    "input_backend": tuple(INPUT_BACKENDS),
+}
+CONFIG_POSITIVE = ("click_interval", "auto_stop_time", "geometry_check_interval", "status_fps",
+                   "classifier_width", "classifier_height", "classifier_interval",
+                   "config_poll_interval", "vision_width", "vision_height", "adaptive_base_interval",
+                   "adaptive_idle_after", "adaptive_ramp", "adaptive_check_interval", "adaptive_region",
+                   "control_port", "burst_size")
+CONFIG_NON_NEGATIVE = ("hotkey_debounce", "max_catch_up_ticks", "adaptive_idle_interval", "classifier_cooldown",
+                       "classifier_threshold", "vision_threshold", "adaptive_threshold", "log_max_bytes",
+                       "log_backup_count")
+# Inclusive bounds for settings where merely positive is not enough
+CONFIG_RANGES: Dict[str, Tuple[float, float]] = {
+    "click_interval": (0.001, 10.0),
+    "click_rel_x": (0.0, 1.0),
+    "click_rel_y": (0.0, 1.0),
+}
+# Settings a running session cannot pick up; they apply on the next start
+RESTART_REQUIRED = ("status_fps",
+                    "log_file", "log_max_bytes", "log_rotate_when", "log_backup_count",
+                    "event_log", "event_log_file",
+                    "control_api", "control_host", "control_port", "control_socket")
+# Settings rebound as soon as they are reloaded, even mid-session
+HOTKEY_SETTINGS = ("start_stop_key", "pause_key", "emergency_stop_key", "hotkey_debounce")
+
+def migrate_config(raw: Dict[str, object]) -> Dict[str, object]:
+    """Upgrade a config dict written by an older version in place"""
+    version = raw.get("config_version", 1)
+    if version < 2:
+        # Files written before relative coordinates existed hold
+        # hand-picked pixels; keep using them as-is
+        raw.setdefault("coordinate_mode", "absolute")
+    raw["config_version"] = CONFIG_VERSION
+    return raw
+
+def is_fraction_pair(value) -> bool:
+    """True for an [x, y] pair of fractions of the game area"""
+    return (isinstance(value, list) and len(value) == 2
+            and all(isinstance(v, (int, float)) and not isinstance(v, bool) and 0 <= v <= 1 for v in value))
+
+def validate_nested(key: str, value) -> List[str]:
+    """Problems with the elements of a list or dict setting"""
+    if key == "click_sequence":
+        return validate_sequence(value)
+    if key == "monitor_profiles":
+        return [f"monitor_profiles: '{name}' must be [rel_x, rel_y] fractions between 0 and 1, got {pair!r}"
+                for name, pair in value.items() if not is_fraction_pair(pair)]
+    if key == "choice_positions":
+        return [f"choice_positions: choice {number} must be [rel_x, rel_y] fractions between 0 and 1, got {pair!r}"
+                for number, pair in enumerate(value, 1) if not is_fraction_pair(pair)]
+    if key == "classifier_templates":
+        return [f"classifier_templates: '{label}' must be a list of image paths, got {paths!r}"
+                for label, paths in value.items()
+                if not (isinstance(paths, list) and all(isinstance(path, str) and path for path in paths))]
+    if key == "classifier_actions":
+        problems = []
+        for state, action in value.items():
+            try:
+                parse_action(action)
+            except ValueError as e:
+                problems.append(f"classifier_actions: {state}: {e}")
+        return problems
+    if key == "instances":
+        problems = []
+        for number, spec in enumerate(value, 1):
+            if not isinstance(spec, dict):
+                problems.append(f"instances: instance {number} must be an object of settings")
+                continue
+            settings = {name: setting for name, setting in spec.items() if name != "name"}
+            if "instances" in settings:
+                problems.append(f"instances: instance {number} cannot have instances of its own")
+                del settings["instances"]
+            _, nested = validate_config(settings)
+            problems.extend(f"instances: instance {number}: {problem}" for problem in nested)
+        return problems
+    return []
+
+def validate_config(raw: Dict[str, object]) -> Tuple[Config, List[str]]:
+    """Build a Config from a raw dict, keeping defaults for anything invalid
+
+    Unknown keys and values of the wrong type or out of range are reported
+    instead of failing the whole file.
+    """
+    if not isinstance(raw, dict):
+        raise ValueError("config file must contain a JSON object")
+    raw = migrate_config(dict(raw))
+    defaults = asdict(Config())
+    values: Dict[str, object] = {}
+    problems: List[str] = []
+    for key, value in raw.items():
+        if key not in defaults:
+            problems.append(f"unknown setting '{key}' ignored")
+            continue
+        expected = type(defaults[key])
+        if expected is float and isinstance(value, int) and not isinstance(value, bool):
+            value = float(value)
+        elif expected is int and isinstance(value, float) and value.is_integer():
+            value = int(value)
+        if not isinstance(value, expected) or (expected is not bool and isinstance(value, bool)):
+            problems.append(f"{key} must be {expected.__name__}, got {value!r}")
+            continue
+        if key in CONFIG_CHOICES and value not in CONFIG_CHOICES[key]:
+            problems.append(f"{key} must be one of {', '.join(CONFIG_CHOICES[key])}, got {value!r}")
+            continue
+        if key in CONFIG_POSITIVE and value <= 0:
+            problems.append(f"{key} must be positive, got {value!r}")
+            continue
+        if key in CONFIG_NON_NEGATIVE and value < 0:
+            problems.append(f"{key} must not be negative, got {value!r}")
+            continue
+        if key in CONFIG_RANGES and not CONFIG_RANGES[key][0] <= value <= CONFIG_RANGES[key][1]:
+            low, high = CONFIG_RANGES[key]
+            problems.append(f"{key} must be between {low:g} and {high:g}, got {value!r}")
+            continue
+        nested = validate_nested(key, value)
+        if nested:
+            problems.extend(nested)
+            continue
+        try:
+            if key == "classifier_default_action":
+                parse_action(value)
+            elif key in ("start_stop_key", "pause_key", "emergency_stop_key"):
+                parse_hotkey(value)
+        except ValueError as e:
+            problems.append(f"{key}: {e}")
+            continue
+        values[key] = value
+    return Config(**values), problems
+
+def read_config(path: str = CONFIG_FILE) -> Tuple[Config, List[str]]:
+    """Read and validate a config file"""
+    with open(path, 'r') as f:
+        return validate_config(json.load(f))
+
+def read_saved_config(path: str = CONFIG_FILE) -> Config:
+    """Saved config for read-only modes; defaults if the file is missing or unreadable"""
+    try:
+        return read_config(path)[0]
+    except (OSError, ValueError):
+        return Config()
+
+def config_changes(old: Config, new: Config) -> List[str]:
+    """Names of the settings that differ between two configs"""
+    old_values, new_values = asdict(old), asdict(new)
+    return [key for key in new_values if old_values[key] != new_values[key]]
+
+class ConfigWatcher:
+    """Polls the config file's modification time and reports validated edits
+
+    The poll is a single ``os.stat`` per interval on its own thread, so the
+    click loop never touches the file. Files that fail to parse are logged
+    and skipped; the running config stays in place until a good save.
+    """
+
+    def __init__(self, path: str, on_change: Callable[[Config], None], interval: float = 1.0):
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self.signature = self.file_signature()
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def mark_written(self):
+        """Ignore a save made by this process"""
+        self.signature = self.file_signature()
+
+    def check(self) -> bool:
+        """Poll once; returns True if a changed config was handed over"""
+        signature = self.file_signature()
+        if signature is None or signature == self.signature:
+            return False
+        self.signature = signature
+        try:
+            config, problems = read_config(self.path)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Config reload skipped, could not read {self.path}: {e}")
+            return False
+        for problem in problems:
+            logging.warning(f"Config: {problem}")
+        self.on_change(config)
+        return True
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.check()
+
+def encode_message(message: Dict[str, object]) -> bytes:
+    return (json.dumps(message, separators=(",", ":"), default=str) + "\n").encode()
+
+class ControlServer:
+    """Local control API: JSON lines over TCP or a Unix socket
+
+    Runs an asyncio loop on its own thread. Each line from a client is a
+    request like ``{"id": 1, "cmd": "pause"}`` and gets one reply with the
+    same id from ``handle``, which only queues engine commands. After
+    ``{"cmd": "subscribe", "rate": 10}`` the server pushes ``snapshot()``
+    to that client at the requested rate until it unsubscribes or leaves;
+    a client that stops reading only stalls its own feed.
+    """
+    MAX_RATE = 60.0
+
+    def __init__(self, handle: Callable[[Dict[str, object]], Dict[str, object]],
+                 snapshot: Callable[[], Dict[str, object]],
+                 host: str = "127.0.0.1", port: int = 8765, path: str = ""):
+        self.handle = handle
+        self.snapshot = snapshot
+        self.host = host
+        self.port = port
+        self.path = path
+        self.address = None
+        self.loop = None
+        self.server = None
+        self.thread: Optional[threading.Thread] = None
+        self.ready = threading.Event()
+        self.error: Optional[OSError] = None
+        self.clients = 0
+
+    def start(self):
+        """Start serving; raises OSError if the address cannot be bound"""
+        self.thread = threading.Thread(target=self._run, name="control-api", daemon=True)
+        self.thread.start()
+        self.ready.wait()
+        if self.error:
+            raise self.error
+
+    def stop(self):
+        if self.loop and self.thread and self.thread.is_alive():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=2.0)
+
+    def _run(self):
+        loop = self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            if self.path:
+                started = asyncio.start_unix_server(self.serve_client, path=self.path)
+            else:
+                started = asyncio.start_server(self.serve_client, self.host, self.port)
+            self.server = loop.run_until_complete(started)
+        except OSError as e:
+            self.error = e
+            loop.close()
+            self.ready.set()
+            return
+        self.address = self.server.sockets[0].getsockname()
+        self.ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            self.server.close()
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(self.server.wait_closed())
+            loop.close()
+            if self.path:
+                try:
+                    os.remove(self.path)
+                except OSError:
+                    pass
+
+    async def send(self, writer, lock, message: Dict[str, object]):
+        # Replies and pushed stats share the stream; the lock keeps drains serialized
+        async with lock:
+            writer.write(encode_message(message))
+            await writer.drain()
+
+    async def push_stats(self, writer, lock, period: float):
+        loop = asyncio.get_running_loop()
+        next_push = loop.time()
+        while True:
+            await self.send(writer, lock, {"event": "stats", **self.snapshot()})
+            next_push += period
+            now = loop.time()
+            if next_push < now:
+                next_push = now
+            await asyncio.sleep(next_push - now)
+
+    async def serve_client(self, reader, writer):
+        lock = asyncio.Lock()
+        feed = None
+        self.clients += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("request must be a JSON object")
+                except ValueError as e:
+                    await self.send(writer, lock, {"ok": False, "error": f"bad request: {e}"})
+                    continue
+                cmd = request.get("cmd")
+                if cmd == "subscribe":
+                    rate = request.get("rate", 4)
+                    if isinstance(rate, bool) or not isinstance(rate, (int, float)) or not 0 < rate <= self.MAX_RATE:
+                        reply = {"ok": False, "error": f"rate must be between 0 and {self.MAX_RATE:g} per second"}
+                    else:
+                        if feed:
+                            feed.cancel()
+                        feed = asyncio.ensure_future(self.push_stats(writer, lock, 1 / rate))
+                        reply = {"ok": True, "rate": rate}
+                elif cmd == "unsubscribe":
+                    if feed:
+                        feed.cancel()
+                        feed = None
+                    reply = {"ok": True}
+                else:
+                    try:
+                        reply = self.handle(request)
+                    except Exception as e:
+                        logging.error(f"Control API request {request!r} failed: {e}")
+                        reply = {"ok": False, "error": str(e)}
+                if "id" in request:
+                    reply["id"] = request["id"]
+                await self.send(writer, lock, reply)
+        except (ConnectionError, ValueError):
+            # Dropped connection, or a line over the stream limit
+            pass
+        finally:
+            self.clients -= 1
+            if feed:
+                feed.cancel()
+            writer.close()
+
+class DialogueSkipper:
+    def __init__(self, config: Optional[Config] = None):
+        self.config_watcher: Optional[ConfigWatcher] = None
+        self.hotkeys: Optional[HotkeyDispatcher] = None
+        self.control_server: Optional[ControlServer] = None
+        self.profiler: Optional[Profiler] = None
+        # Command-line and API values for this run, and the values they replaced,
+        # which save_config writes back so the overrides never reach the file
+        self.cli_overrides: Dict[str, object] = {}
+        self.saved_values: Dict[str, object] = {}
+        # Logging depends on the config, so load problems wait until it is set up
+        self.config_problems: List[str] = []
+        self.config = config or self.load_config()
+        self.setup_logging()
+        for problem in self.config_problems:
+            logging.warning(problem)
+        if config is None and not os.path.exists(CONFIG_FILE):
+            # First run: write the defaults so there is a file to edit
+            self.save_config(self.config)
+        self.control = SessionControl()
+        self.worker: Optional[threading.Thread] = None
+        self.engine_running = False
+        self.metrics = SessionMetrics(self.config.click_interval)
+        self.start_time = 0
+        self.backend: Optional[InputBackend] = None
+        self.renderer = StatusRenderer(self.build_status_line, fps=self.config.status_fps,
+                                       is_idle=lambda: not self.control.is_active)
+        self.last_session: Dict[str, object] = {}
+        self.stop_reason = ""
+        self.frame_source = None
+        self.window_manager: Optional[WindowManager] = None
+        self.window_target: Optional[WindowTarget] = None
+        self.geometry_provider: Callable[[], ClientArea] = self.detect_area
+        self.position_cache: Dict[ClientArea, Tuple[int, int]] = {}
+        self.click_position: Tuple[int, int] = (self.config.click_x, self.config.click_y)
+        self.reference_cache: Dict[Tuple[str, float], object] = {}
+        self.rate_controller: Optional[RateController] = None
+        self.dialogue_state = ""
+        self.multi_engine: Optional[MultiClickEngine] = None
+        self.replay_request: Optional[Tuple[Trace, float, int]] = None
+        self.pending_config: Optional[Config] = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.control.is_active
+
+    @property
+    def is_paused(self) -> bool:
+        return self.control.is_paused
+
+    @property
+    def click_count(self) -> int:
+        engine = self.multi_engine
+        return engine.clicks if engine else self.metrics.clicks.value
+
+    def get_window_target(self) -> WindowTarget:
+        """Shared game window target, recreated if the configured window changes"""
+        cfg = self.config
+        target = self.window_target
+        if target is None or (target.title, target.process_name) != (cfg.game_window_title, cfg.game_process_name):
+            if target:
+                target.close()
+            if self.window_manager is None:
+                self.window_manager = create_window_manager()
+            manager = self.window_manager
+            target = self.window_target = WindowTarget(manager, cfg.game_window_title, cfg.game_process_name)
+        return target
+
+    def detect_area(self) -> ClientArea:
+        """Game client area; the window backend reuses its cached window target"""
+        if self.config.input_backend == WindowBackend.name:
+            area = self.get_window_target().resolve()
+            if area is None:
+                raise RuntimeError(f"Game window '{self.config.game_window_title}' not found")
+            return area
+        return detect_client_area(self.config.game_window_title)
+
+    def create_backend(self) -> InputBackend:
+        """Create the configured input backend, falling back to PyAutoGUI"""
+        try:
+            if self.config.input_backend == WindowBackend.name:
+                return WindowBackend(self.get_window_target())
+            return create_input_backend(self.config.input_backend)
+        except (ValueError, RuntimeError) as e:
+            logging.warning(f"Input backend '{self.config.input_backend}' unavailable, using pyautogui: {e}")
+            return PyAutoGUIBackend()
+
+    def load_vision_reference(self):
+        """Load the reference signature, cached until the file changes"""
+        path = self.config.vision_reference
+        key = (path, os.path.getmtime(path))
+        reference = self.reference_cache.get(key)
+        if reference is None:
+            reference = require_numpy().load(path)
+            self.reference_cache = {key: reference}
+        return reference
+
+    def create_vision_gate(self) -> Optional[VisionGate]:
+        """Build the vision gate for a session, or None to click ungated"""
+        if not self.config.vision_gate:
+            return None
+        cfg = self.config
+        try:
+            reference = self.load_vision_reference()
+            source = self.frame_source or ScreenRegionCapture(
+                cfg.vision_x, cfg.vision_y, cfg.vision_width, cfg.vision_height)
+            return VisionGate(source, reference, cfg.vision_width, cfg.vision_height, cfg.vision_threshold)
+        except (RuntimeError, OSError, ValueError) as e:
+            logging.warning(f"Vision gate unavailable, clicking ungated: {e}")
+            self.renderer.post(f"{Fore.YELLOW}⚠️  Vision gate unavailable, clicking ungated: {e}")
+            return None
+
+    def create_classifier(self) -> Optional[DialogueClassifier]:
+        """Build the dialogue classifier for a session, or None to click in every state"""
+        if not self.config.classifier:
+            return None
+        cfg = self.config
+        region = (cfg.classifier_x, cfg.classifier_y, cfg.classifier_width, cfg.classifier_height)
+        try:
+            index = TemplateIndex.load_or_build(cfg.classifier_templates, region, cfg.classifier_cache)
+            source = self.frame_source or ScreenRegionCapture(*region)
+            return DialogueClassifier(source, index, cfg.classifier_width, cfg.classifier_height,
+                                      cfg.classifier_threshold)
+        except (RuntimeError, OSError, ValueError) as e:
+            logging.warning(f"Dialogue classifier unavailable, clicking in every state: {e}")
+            self.renderer.post(f"{Fore.YELLOW}⚠️  Dialogue classifier unavailable, clicking in every state: {e}")
+            return None
+
+    def resolve_actions(self, area: Optional[ClientArea]) -> Dict[str, Tuple[str, object]]:
+        """Classifier action per state, with key scan codes and choice pixels resolved"""
+        cfg = self.config
+        area = area or ClientArea(0, 0, 1920, 1080)
+        table = {}
+        for state, action in {DialogueClassifier.UNKNOWN: cfg.classifier_default_action,
+                              **cfg.classifier_actions}.items():
+            kind, arg = parse_action(action)
+            value = None
+            try:
+                if kind == "key":
+                    value = int(arg) if arg.isdigit() else keyboard.key_to_scan_codes(arg)[0]
+                elif kind == "choice":
+                    rel_x, rel_y = cfg.choice_positions[int(arg) - 1]
+                    value = area.to_pixels(rel_x, rel_y)
+            except Exception as e:
+                logging.warning(f"Classifier action '{action}' for {state} unusable, waiting instead: {e}")
+                kind = "wait"
+            table[state] = (kind, value)
+        return table
+
+    def create_rate_controller(self, x: int, y: int, min_interval: float) -> Optional[RateController]:
+        """Build the adaptive rate controller probing around (x, y), or None for a fixed rate"""
+        if not self.config.adaptive_rate:
+            return None
+        cfg = self.config
+        size = cfg.adaptive_region
+        try:
+            source = self.frame_source or ScreenRegionCapture(x - size // 2, y - size // 2, size, size)
+            probe = RegionChangeProbe(source, size, size, cfg.adaptive_threshold)
+        except (RuntimeError, OSError, ValueError) as e:
+            logging.warning(f"Adaptive rate unavailable, clicking at a fixed rate: {e}")
+            self.renderer.post(f"{Fore.YELLOW}⚠️  Adaptive rate unavailable, clicking at a fixed rate: {e}")
+            return None
+        return RateController(probe, min_interval, cfg.adaptive_base_interval, cfg.adaptive_idle_interval,
+                              cfg.adaptive_idle_after, cfg.adaptive_ramp, cfg.adaptive_check_interval)
+
+    def capture_vision_reference(self, delay: int = 3) -> bool:
+        """Grab the vision region now and store it as the dialogue reference"""
+        cfg = self.config
+        try:
+            np = require_numpy()
+            for remaining in range(delay, 0, -1):
+                print(f"{Fore.YELLOW}Capturing in {remaining}s - switch to the game with dialogue on screen...")
+                time.sleep(1)
+            source = self.frame_source or ScreenRegionCapture(
+                cfg.vision_x, cfg.vision_y, cfg.vision_width, cfg.vision_height)
+            try:
+                reference = VisionGate.reference_from_frame(source.grab(), cfg.vision_width, cfg.vision_height)
+            finally:
+                source.close()
+            np.save(cfg.vision_reference, reference)
+        except (RuntimeError, OSError) as e:
+            logging.error(f"Could not capture vision reference: {e}")
+            print(f"{Fore.RED}Error: Could not capture reference: {e}")
+            return False
+        logging.info(f"Captured vision reference for region ({cfg.vision_x}, {cfg.vision_y}, "
+                     f"{cfg.vision_width}x{cfg.vision_height}) to {cfg.vision_reference}")
+        print(f"{Fore.GREEN}✓ Reference saved to {cfg.vision_reference}")
+        return True
+
+    def click_fractions(self, area: ClientArea) -> Tuple[float, float]:
+        """Normalized click position for this client area's profile"""
+        profile = self.config.monitor_profiles.get(area.profile_key)
+        if profile:
+            return profile[0], profile[1]
+        return self.config.click_rel_x, self.config.click_rel_y
+
+    def current_area(self) -> Optional[ClientArea]:
+        """Detected game client area, or None if it cannot be determined"""
+        try:
+            return self.geometry_provider()
+        except Exception as e:
+            logging.warning(f"Could not detect client area: {e}")
+            return None
+
+    def resolve_click_position(self, area: Optional[ClientArea] = None) -> Tuple[int, int]:
+        """Pixel click position for the current geometry, cached per client area"""
+        if self.config.coordinate_mode == "absolute":
+            return self.config.click_x, self.config.click_y
+        if area is None:
+            area = self.current_area()
+            if area is None:
+                return self.config.click_x, self.config.click_y
+        position = self.position_cache.get(area)
+        if position is None:
+            position = area.to_pixels(*self.click_fractions(area))
+            self.position_cache[area] = position
+            logging.info(f"Resolved click position {position} for client area {area}")
+        return position
+
+    def build_click_plan(self, area: Optional[ClientArea] = None) -> ClickPlan:
+        """Compile the configured sequence, or the single click position"""
+        sequence = self.config.click_sequence
+        if sequence:
+            if area is None and any("rel_x" in step for step in sequence if isinstance(step, dict)):
+                area = self.current_area()
+            return compile_sequence(sequence, area, self.config.click_interval)
+        return ClickPlan.single(*self.resolve_click_position(area), self.config.click_interval)
+
+    def dry_run(self):
+        """Print the compiled click timeline without clicking"""
+        area = self.current_area()
+        try:
+            plan = self.build_click_plan(area)
+        except ValueError as e:
+            print(f"{Fore.RED}Invalid click sequence: {e}")
+            return False
+        where = f"{area.width}x{area.height} at ({area.left}, {area.top})" if area else "unknown"
+        print(f"{Fore.CYAN}═══ Compiled Click Plan ═══")
+        print(f"{Fore.CYAN}Game area: {Fore.YELLOW}{where}")
+        print(f"{Fore.CYAN}Steps per cycle: {Fore.YELLOW}{len(plan)} {Fore.CYAN}Cycle time: {Fore.YELLOW}{plan.cycle_time * 1000:.1f}ms "
+              f"{Fore.CYAN}Rate: {Fore.YELLOW}{1 / plan.mean_delay:.1f} clicks/second\n")
+        for line in plan.timeline():
+            print(line)
+        return True
+
+    def set_click_fractions(self, rel_x: float, rel_y: float, area: ClientArea):
+        """Store a normalized click position as the profile for this client area"""
+        self.config.coordinate_mode = "relative"
+        self.config.click_rel_x, self.config.click_rel_y = rel_x, rel_y
+        self.config.monitor_profiles[area.profile_key] = [round(rel_x, 5), round(rel_y, 5)]
+        self.position_cache.clear()
+        self.config.click_x, self.config.click_y = self.resolve_click_position(area)
 
     def clear_console(self):
-        """Clear the console screen"""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        """Clear the console screen with ANSI escapes instead of spawning cls/clear"""
+        sys.stdout.write("\033[2J\033[H")
+        sys.stdout.flush()
 
     def setup_logging(self):
-        """Configure logging to file only"""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            filename='dialogue_skipper.log',
-            filemode='a'
-        )
+        """Route logging through the background writer to file only"""
+        global LOG_PIPELINE
+        if LOG_PIPELINE is not None:
+            return
+        root = logging.getLogger()
+        if not (self.config.log_file or self.config.event_log):
+            # Logging is off; keep records from falling through to the console
+            if not root.handlers:
+                root.addHandler(logging.NullHandler())
+            return
+        LOG_PIPELINE = create_log_pipeline(self.config)
+        LOG_PIPELINE.start()
+        atexit.register(LOG_PIPELINE.stop)
+        
+        root.handlers = [logging.handlers.QueueHandler(LOG_PIPELINE.queue)]
+        root.setLevel(logging.INFO)
+        events.setLevel(logging.INFO if self.config.event_log else logging.WARNING)
 
     def load_config(self) -> Config:
-        """Load configuration from file or create default"""
-        config_file = 'dialogue_skipper_config.json'
+        """Load configuration from file, or defaults if there is none yet"""
+        config_file = CONFIG_FILE
         
         if os.path.exists(config_file):
             try:
-                with open(config_file, 'r') as f:
-                    config_dict = json.load(f)
-                    config = Config(**config_dict)
-                    return config
+                config, problems = read_config(config_file)
+                self.config_problems.extend(f"Config: {problem}" for problem in problems)
+                return config
             except Exception as e:
-                logging.warning(f"Could not load config file: {e}")
-        
-        # Create default config and save it
-        config = Config()
-        self.save_config(config)
-        return config
+                # Keep the user's file untouched so it can be fixed by hand
+                self.config_problems.append(f"Could not load config file: {e}")
+                return Config()
+
+        return Config()
 
     def save_config(self, config: Config):
-        """Save configuration to file"""
+        """Save configuration to file, leaving out command-line overrides"""
+        data = asdict(config)
+        for key, value in list(self.cli_overrides.items()):
+            if data[key] == value:
+                data[key] = self.saved_values[key]
+            else:
+                # Changed from the menu since; that value is saved and wins from now on
+                del self.cli_overrides[key]
+                del self.saved_values[key]
         try:
-            with open('dialogue_skipper_config.json', 'w') as f:
-                json.dump(asdict(config), f, indent=4)
+            with open(CONFIG_FILE, 'w') as f:
+                json.dump(data, f, indent=4)
+            if self.config_watcher:
+                self.config_watcher.mark_written()
         except Exception as e:
             logging.error(f"Could not save config file: {e}")
             print(f"{Fore.RED}Warning: Could not save configuration file.")
@@ -124,72 +3407,69 @@ class DialogueSkipper:
         self.clear_console()
         self.print_banner()
         
-        resolutions = {
-            "1": {"res": "1280x720 (HD)", "x": 960, "y": 540},
-            "2": {"res": "1366x768", "x": 1024, "y": 576},
-            "3": {"res": "1600x900 (HD+)", "x": 1200, "y": 675},
-            "4": {"res": "1920x1080 (Full HD)", "x": 1350, "y": 750},
-            "5": {"res": "2560x1440 (QHD)", "x": 1920, "y": 1080},
-            "6": {"res": "3840x2160 (4K UHD)", "x": 2700, "y": 1500},
-            "7": {"res": "Custom Coordinates", "x": None, "y": None},
-            "8": {"res": "Current Configuration", "x": self.config.click_x, "y": self.config.click_y}
-        }
+        try:
+            area = self.geometry_provider()
+        except Exception as e:
+            logging.warning(f"Could not detect client area: {e}")
+            area = ClientArea(0, 0, 1920, 1080)
+        custom_choice = str(len(RESOLUTION_PRESETS) + 1)
+        current_choice = str(len(RESOLUTION_PRESETS) + 2)
+        current_x, current_y = self.resolve_click_position(area)
         
         print(f"\n{Fore.CYAN}═══ Select Click Position ═══")
-        for key, value in resolutions.items():
-            if key == "8":
-                print(f"{Fore.YELLOW}{key}: {value['res']} {Fore.GREEN}({value['x']}, {value['y']})")
-            elif key == "7":
-                print(f"{Fore.YELLOW}{key}: {value['res']}")
-            else:
-                print(f"{Fore.YELLOW}{key}: {value['res']} {Fore.CYAN}→ ({value['x']}, {value['y']})")
+        print(f"{Fore.MAGENTA}Detected game area: {area.width}x{area.height} at ({area.left}, {area.top})\n")
+        for number, (label, width, height, x, y) in enumerate(RESOLUTION_PRESETS, 1):
+            print(f"{Fore.YELLOW}{number}: {label} {Fore.CYAN}→ ({x / width:.1%}, {y / height:.1%})")
+        print(f"{Fore.YELLOW}{custom_choice}: Custom Coordinates")
+        print(f"{Fore.YELLOW}{current_choice}: Current Configuration {Fore.GREEN}({current_x}, {current_y})")
         
         while True:
-            choice = input(f"\n{Fore.CYAN}Enter choice (1-8): {Style.RESET_ALL}")
-            if choice in resolutions:
+            choice = input(f"\n{Fore.CYAN}Enter choice (1-{current_choice}): {Style.RESET_ALL}")
+            if choice.isdigit() and 1 <= int(choice) <= int(current_choice):
                 break
-            print(f"{Fore.RED}Invalid choice. Please select 1-8.")
+            print(f"{Fore.RED}Invalid choice. Please select 1-{current_choice}.")
         
-        if choice == "7":
+        if choice == custom_choice:
             try:
                 print(f"\n{Fore.CYAN}Custom Coordinates Setup:")
                 x = int(input(f"Enter X coordinate: {Style.RESET_ALL}"))
                 y = int(input(f"Enter Y coordinate: {Style.RESET_ALL}"))
                 
                 # Validate coordinates
-                screen_width, screen_height = pyautogui.size()
-                if not (0 <= x <= screen_width and 0 <= y <= screen_height):
-                    print(f"{Fore.YELLOW}Warning: Coordinates may be outside screen bounds ({screen_width}x{screen_height})")
+                if not (area.left <= x <= area.left + area.width and area.top <= y <= area.top + area.height):
+                    print(f"{Fore.YELLOW}Warning: Coordinates may be outside the game area ({area.width}x{area.height})")
                     if input(f"Continue anyway? (y/n): ").lower() != 'y':
-                        return self.config.click_x, self.config.click_y
+                        return self.resolve_click_position(area)
                 
                 # Save to config for future use
-                self.config.click_x = x
-                self.config.click_y = y
+                if input(f"Keep these exact pixels when the resolution changes? (y/n): ").strip().lower() == 'y':
+                    self.config.coordinate_mode = "absolute"
+                    self.config.click_x = x
+                    self.config.click_y = y
+                else:
+                    self.set_click_fractions(*area.to_fractions(x, y), area)
                 self.save_config(self.config)
                 
                 print(f"{Fore.GREEN}✓ Custom coordinates saved: ({x}, {y})")
-                logging.info(f"Selected custom resolution with coordinates ({x}, {y})")
+                logging.info(f"Selected custom resolution with coordinates ({x}, {y}) in {self.config.coordinate_mode} mode")
                 input(f"\n{Fore.CYAN}Press Enter to continue...")
                 return x, y
             except ValueError as e:
                 logging.error(f"Invalid coordinate input: {e}")
                 print(f"{Fore.RED}Error: Invalid coordinates. Using current config.")
                 input(f"{Fore.YELLOW}Press Enter to continue...")
-                return self.config.click_x, self.config.click_y
+                return self.resolve_click_position(area)
+        elif choice == current_choice:
+            print(f"\n{Fore.GREEN}✓ Using current position: ({current_x}, {current_y})")
+            input(f"\n{Fore.CYAN}Press Enter to continue...")
+            return current_x, current_y
         else:
-            x, y = resolutions[choice]["x"], resolutions[choice]["y"]
-            
-            # Update config if not using current
-            if choice != "8":
-                self.config.click_x = x
-                self.config.click_y = y
-                self.save_config(self.config)
-                print(f"\n{Fore.GREEN}✓ Position saved: {resolutions[choice]['res']} → ({x}, {y})")
-            else:
-                print(f"\n{Fore.GREEN}✓ Using current position: ({x}, {y})")
-            
-            logging.info(f"Selected resolution {resolutions[choice]['res']} with coordinates ({x}, {y})")
+            label, width, height, preset_x, preset_y = RESOLUTION_PRESETS[int(choice) - 1]
+            self.set_click_fractions(preset_x / width, preset_y / height, area)
+            self.save_config(self.config)
+            x, y = self.config.click_x, self.config.click_y
+            print(f"\n{Fore.GREEN}✓ Position saved: {label} layout → ({x}, {y}) on {area.profile_key}")
+            logging.info(f"Selected resolution {label} with coordinates ({x}, {y})")
             input(f"\n{Fore.CYAN}Press Enter to continue...")
             return x, y
 
@@ -208,17 +3488,21 @@ class DialogueSkipper:
         
         if input(f"\n{Fore.CYAN}Modify hotkeys? (y/n): ").lower() == 'y':
             print(f"\n{Fore.CYAN}Hotkey Configuration:")
+            print(f"{Fore.CYAN}Combine modifiers with +, e.g. ctrl+shift+f6")
             try:
                 new_start = input(f"Start/Stop key (current: {self.config.start_stop_key}): ").strip()
                 if new_start:
+                    parse_hotkey(new_start)
                     self.config.start_stop_key = new_start.lower()
                 
                 new_pause = input(f"Pause/Resume key (current: {self.config.pause_key}): ").strip()
                 if new_pause:
+                    parse_hotkey(new_pause)
                     self.config.pause_key = new_pause.lower()
                 
                 new_emergency = input(f"Emergency Stop key (current: {self.config.emergency_stop_key}): ").strip()
                 if new_emergency:
+                    parse_hotkey(new_emergency)
                     self.config.emergency_stop_key = new_emergency.lower()
                 
                 print(f"{Fore.GREEN}✓ Hotkeys updated successfully!")
@@ -251,6 +3535,132 @@ class DialogueSkipper:
                     else:
                         print(f"{Fore.YELLOW}Warning: Auto-stop should be between 1 and 7200 seconds")
                 
+                active_only = input(f"Count only active (unpaused) time toward auto-stop? (y/n, current: {'y' if self.config.auto_stop_active_only else 'n'}): ").strip().lower()
+                if active_only in ['y', 'n']:
+                    self.config.auto_stop_active_only = active_only == 'y'
+                    print(f"{Fore.GREEN}✓ Auto-stop counts: {'active time only' if self.config.auto_stop_active_only else 'paused time too'}")
+                
+                policy = input(f"Missed tick policy - skip/catch_up (current: {self.config.missed_tick_policy}): ").strip().lower()
+                if policy:
+                    if policy in MISSED_TICK_POLICIES:
+                        self.config.missed_tick_policy = policy
+                        print(f"{Fore.GREEN}✓ Missed ticks: {policy}")
+                    else:
+                        print(f"{Fore.YELLOW}Warning: Policy should be one of {', '.join(MISSED_TICK_POLICIES)}")
+                
+                backend = input(f"Input backend - {'/'.join(INPUT_BACKENDS)} (current: {self.config.input_backend}): ").strip().lower()
+                if backend:
+                    if backend in INPUT_BACKENDS:
+                        self.config.input_backend = backend
+                        self.backend = None
+                        print(f"{Fore.GREEN}✓ Input backend: {backend}")
+                    else:
+                        print(f"{Fore.YELLOW}Warning: Backend should be one of {', '.join(INPUT_BACKENDS)}")
+                
+            except ValueError as e:
+                print(f"{Fore.RED}Invalid input: {e}")
+        
+        # Vision gate settings
+        print(f"\n{Fore.YELLOW}👁️ Vision Gate:")
+        print(f"   Enabled: {Fore.GREEN if self.config.vision_gate else Fore.RED}{'ON' if self.config.vision_gate else 'OFF'}")
+        print(f"   Region: {Fore.GREEN}({self.config.vision_x}, {self.config.vision_y}) {self.config.vision_width}x{self.config.vision_height}")
+        print(f"   Threshold: {Fore.GREEN}{self.config.vision_threshold}")
+        
+        if input(f"\n{Fore.CYAN}Modify vision gate? (y/n): ").lower() == 'y':
+            print(f"\n{Fore.CYAN}Vision Gate Configuration:")
+            try:
+                enabled = input(f"Only click while dialogue is detected? (y/n): ").strip().lower()
+                if enabled in ['y', 'n']:
+                    self.config.vision_gate = enabled == 'y'
+                
+                region = input(f"Region as x,y,width,height (current: {self.config.vision_x},{self.config.vision_y},"
+                               f"{self.config.vision_width},{self.config.vision_height}): ").strip()
+                if region:
+                    x, y, width, height = (int(v) for v in region.split(","))
+                    if width > 0 and height > 0:
+                        self.config.vision_x, self.config.vision_y = x, y
+                        self.config.vision_width, self.config.vision_height = width, height
+                    else:
+                        print(f"{Fore.YELLOW}Warning: Region width and height must be positive")
+                
+                threshold = input(f"Match threshold 0-1 (current: {self.config.vision_threshold}): ").strip()
+                if threshold:
+                    new_threshold = float(threshold)
+                    if 0 < new_threshold <= 1:
+                        self.config.vision_threshold = new_threshold
+                    else:
+                        print(f"{Fore.YELLOW}Warning: Threshold should be between 0 and 1")
+                
+                if input(f"Capture dialogue reference now? (y/n): ").strip().lower() == 'y':
+                    self.capture_vision_reference()
+                
+                print(f"{Fore.GREEN}✓ Vision gate: {'ON' if self.config.vision_gate else 'OFF'}")
+            except ValueError as e:
+                print(f"{Fore.RED}Invalid input: {e}")
+        
+        # Adaptive rate settings
+        print(f"\n{Fore.YELLOW}📉 Adaptive Rate:")
+        print(f"   Enabled: {Fore.GREEN if self.config.adaptive_rate else Fore.RED}{'ON' if self.config.adaptive_rate else 'OFF'}")
+        print(f"   Start Interval: {Fore.GREEN}{self.config.adaptive_base_interval}s {Fore.CYAN}(ramps up to {self.config.click_interval}s)")
+        print(f"   Idle: {Fore.GREEN}{self.config.adaptive_idle_interval}s interval {Fore.CYAN}after {self.config.adaptive_idle_after}s without change")
+        
+        if input(f"\n{Fore.CYAN}Modify adaptive rate? (y/n): ").lower() == 'y':
+            print(f"\n{Fore.CYAN}Adaptive Rate Configuration:")
+            try:
+                enabled = input(f"Slow down when the screen stops changing? (y/n): ").strip().lower()
+                if enabled in ['y', 'n']:
+                    self.config.adaptive_rate = enabled == 'y'
+                
+                base = input(f"Start interval in seconds (current: {self.config.adaptive_base_interval}): ").strip()
+                if base:
+                    new_base = float(base)
+                    if 0.001 <= new_base <= 10:
+                        self.config.adaptive_base_interval = new_base
+                    else:
+                        print(f"{Fore.YELLOW}Warning: Interval should be between 0.001 and 10 seconds")
+                
+                idle = input(f"Idle interval in seconds, 0 to stop clicking (current: {self.config.adaptive_idle_interval}): ").strip()
+                if idle:
+                    new_idle = float(idle)
+                    if 0 <= new_idle <= 60:
+                        self.config.adaptive_idle_interval = new_idle
+                    else:
+                        print(f"{Fore.YELLOW}Warning: Idle interval should be between 0 and 60 seconds")
+                
+                idle_after = input(f"Go idle after seconds without change (current: {self.config.adaptive_idle_after}): ").strip()
+                if idle_after:
+                    new_idle_after = float(idle_after)
+                    if new_idle_after > 0:
+                        self.config.adaptive_idle_after = new_idle_after
+                    else:
+                        print(f"{Fore.YELLOW}Warning: Idle delay must be positive")
+                
+                print(f"{Fore.GREEN}✓ Adaptive rate: {'ON' if self.config.adaptive_rate else 'OFF'}")
+            except ValueError as e:
+                print(f"{Fore.RED}Invalid input: {e}")
+        
+        # Power settings
+        low_power = self.config.power_mode == "low_power"
+        print(f"\n{Fore.YELLOW}🔋 Power:")
+        print(f"   Low Power Mode: {Fore.GREEN if low_power else Fore.RED}{'ON' if low_power else 'OFF'}"
+              f" {Fore.CYAN}(bursts of {self.config.burst_size} clicks)")
+        
+        if input(f"\n{Fore.CYAN}Modify power settings? (y/n): ").lower() == 'y':
+            print(f"\n{Fore.CYAN}Power Configuration:")
+            try:
+                enabled = input(f"Click in bursts to save CPU and battery? (y/n): ").strip().lower()
+                if enabled in ['y', 'n']:
+                    self.config.power_mode = "low_power" if enabled == 'y' else "normal"
+                
+                size = input(f"Clicks per burst (current: {self.config.burst_size}): ").strip()
+                if size:
+                    new_size = int(size)
+                    if 2 <= new_size <= 50:
+                        self.config.burst_size = new_size
+                    else:
+                        print(f"{Fore.YELLOW}Warning: Burst size should be between 2 and 50")
+                
+                print(f"{Fore.GREEN}✓ Power mode: {self.config.power_mode}")
             except ValueError as e:
                 print(f"{Fore.RED}Invalid input: {e}")
         
@@ -276,197 +3686,1102 @@ class DialogueSkipper:
         print(f"\n{Fore.GREEN}✓ All settings saved successfully!")
         input(f"\n{Fore.CYAN}Press Enter to continue...")
 
-    def update_status_display(self):
-        """Update the status display with current information and improved formatting"""
-        with self.status_lock:
-            status_parts = []
-            
-            # Main status with colored indicators
-            if self.is_active:
-                if self.is_paused:
-                    status_parts.append(f"{Fore.YELLOW}⏸️  PAUSED")
-                else:
-                    status_parts.append(f"{Fore.GREEN}▶️  ACTIVE")
+    def build_status_line(self) -> str:
+        """Build the status line from a snapshot of the session counters"""
+        is_active = self.is_active
+        click_count = self.click_count
+        start_time = self.start_time
+        status_parts = []
+        
+        # Main status with colored indicators
+        if is_active:
+            if self.is_paused:
+                status_parts.append(f"{Fore.YELLOW}⏸️  PAUSED")
             else:
-                status_parts.append(f"{Fore.MAGENTA}⏹️  READY")
-            
-            # Click counter with rate
-            if self.config.show_click_counter and self.is_active:
-                elapsed = time.time() - self.start_time if self.start_time > 0 else 1
-                rate = self.click_count / elapsed if elapsed > 0 else 0
-                status_parts.append(f"{Fore.CYAN}Clicks: {self.click_count} ({rate:.1f}/s)")
-            
-            # Enhanced time display
-            if self.config.show_elapsed_time and self.is_active and self.start_time > 0:
-                elapsed = time.time() - self.start_time
-                remaining = max(0, self.config.auto_stop_time - elapsed)
-                
-                # Format time nicely
-                elapsed_str = f"{elapsed:.1f}s" if elapsed < 60 else f"{int(elapsed//60)}m{int(elapsed%60):02d}s"
-                total_str = f"{self.config.auto_stop_time}s" if self.config.auto_stop_time < 60 else f"{int(self.config.auto_stop_time//60)}m{int(self.config.auto_stop_time%60):02d}s"
-                
-                status_parts.append(f"{Fore.BLUE}Time: {elapsed_str}/{total_str}")
-                
-                if remaining < 30:
-                    remaining_str = f"{remaining:.1f}s" if remaining < 60 else f"{int(remaining//60)}m{int(remaining%60):02d}s"
-                    status_parts.append(f"{Fore.RED}⏰ {remaining_str} left")
+                status_parts.append(f"{Fore.GREEN}▶️  ACTIVE")
+        else:
+            status_parts.append(f"{Fore.MAGENTA}⏹️  READY")
+        
+        # Click counter with rate
+        if self.config.show_click_counter and is_active:
+            elapsed = time.perf_counter() - start_time if start_time > 0 else 1
+            rate = click_count / elapsed if elapsed > 0 else 0
+            status_parts.append(f"{Fore.CYAN}Clicks: {click_count} ({rate:.1f}/s)")
+        
+        # Enhanced time display
+        if self.config.show_elapsed_time and is_active and start_time > 0:
+            elapsed = time.perf_counter() - start_time
+            remaining = max(0, self.config.auto_stop_time - elapsed)
             
-            # Current coordinates
-            status_parts.append(f"{Fore.MAGENTA}@({self.config.click_x},{self.config.click_y})")
+            # Format time nicely
+            elapsed_str = f"{elapsed:.1f}s" if elapsed < 60 else f"{int(elapsed//60)}m{int(elapsed%60):02d}s"
+            total_str = f"{self.config.auto_stop_time}s" if self.config.auto_stop_time < 60 else f"{int(self.config.auto_stop_time//60)}m{int(self.config.auto_stop_time%60):02d}s"
             
-            # Create a clean status line
-            status_line = " │ ".join(status_parts)
-            terminal_width = os.get_terminal_size().columns if hasattr(os, 'get_terminal_size') else 120
-            padding = max(0, terminal_width - len(status_line) - 20)
+            status_parts.append(f"{Fore.BLUE}Time: {elapsed_str}/{total_str}")
             
-            sys.stdout.write(f"\r{status_line}{' ' * padding}")
-            sys.stdout.flush()
+            if remaining < 30:
+                remaining_str = f"{remaining:.1f}s" if remaining < 60 else f"{int(remaining//60)}m{int(remaining%60):02d}s"
+                status_parts.append(f"{Fore.RED}⏰ {remaining_str} left")
+        
+        # Per-instance clicks when driving several clients
+        engine = self.multi_engine
+        if engine and is_active:
+            sessions = engine.sessions
+            running = sum(not session.done for session in sessions)
+            shown = " ".join(f"{session.name}:{session.clicks}" for session in sessions[:6])
+            more = f" +{len(sessions) - 6} more" if len(sessions) > 6 else ""
+            status_parts.append(f"{Fore.MAGENTA}{running}/{len(sessions)} running: {shown}{more}")
+            return " │ ".join(status_parts)
+        
+        # Dialogue state from the classifier
+        if self.dialogue_state and is_active:
+            status_parts.append(f"{Fore.YELLOW}💬 {self.dialogue_state}")
+        
+        # Adaptive rate state
+        controller = self.rate_controller
+        if controller and is_active:
+            if controller.idle:
+                status_parts.append(f"{Fore.YELLOW}💤 IDLE")
+            else:
+                status_parts.append(f"{Fore.GREEN}⚡ {1/controller.interval:.0f}/s")
+        
+        # Current coordinates
+        if self.config.click_sequence:
+            status_parts.append(f"{Fore.MAGENTA}@{len(self.config.click_sequence)}-step sequence")
+        else:
+            status_parts.append(f"{Fore.MAGENTA}@({self.click_position[0]},{self.click_position[1]})")
+        
+        return " │ ".join(status_parts)
+
+    def update_status_display(self):
+        """Request an immediate redraw from the status renderer"""
+        self.renderer.refresh()
+
+    def create_gate_check(self, metrics: SessionMetrics) -> Optional[GateCheck]:
+        gate = self.create_vision_gate()
+        return GateCheck(gate, metrics) if gate else None
+
+    def create_action_picker(self, metrics: SessionMetrics, state_counts: Dict[str, int]) -> Optional[ActionPicker]:
+        """Classifier-driven per-tick actions, or None when the classifier is off"""
+        classifier = self.create_classifier()
+        if not classifier:
+            return None
+
+        def on_state(state: str):
+            self.dialogue_state = state
+            log_event("dialogue_state", state=state)
+
+        return ActionPicker(classifier, self.resolve_actions(self.current_area()), self.config.classifier_interval,
+                            self.config.classifier_cooldown, metrics, on_state, self.dialogue_state, state_counts)
+
+    def create_geometry_watch(self, now: float) -> Optional[GeometryWatch]:
+        """Game area watch when the configured plan depends on it, else None"""
+        cfg = self.config
+        if cfg.coordinate_mode != "relative" and not cfg.click_sequence:
+            return None
+        return GeometryWatch(self.current_area, self.build_click_plan, cfg.geometry_check_interval, now)
+
+    def open_click_session(self, x: Optional[int] = None, y: Optional[int] = None) -> Optional[ClickSession]:
+        """Compile the click plan and set up the backend and per-tick features
+
+        Returns None, with the problem reported, if clicking cannot start.
+        """
+        config = self.config
+        fixed = (x, y) if x is not None and y is not None else None
+        if fixed:
+            plan = ClickPlan.single(x, y, config.click_interval)
+        else:
+            try:
+                plan = self.build_click_plan()
+            except ValueError as e:
+                logging.error(f"Invalid click sequence: {e}")
+                self.renderer.post(f"{Fore.RED}Invalid click sequence: {e}")
+                return None
+        # Low power mode sleeps once per burst and fires the burst's clicks back to back
+        cursor = ClickCursor(plan, config.burst_size if config.power_mode == "low_power" else 1)
+        self.click_position = cursor.position
+        interval = plan.mean_delay
+        # Sleeping on the command inbox lets pause and stop cut a long gap short
+        scheduler = ClickScheduler(
+            interval,
+            policy=config.missed_tick_policy,
+            max_catch_up=config.max_catch_up_ticks,
+            sleep=self.control.wait_for_command
+        )
+        metrics = self.metrics = SessionMetrics(interval)
+        
+        if self.backend is None:
+            try:
+                self.backend = self.create_backend()
+            except Exception as e:
+                logging.error(f"Could not create input backend: {e}")
+                self.renderer.post(f"{Fore.RED}Error: Could not start clicking: {e}")
+                return None
+        try:
+            self.backend.prepare(*cursor.position)
+        except (RuntimeError, OSError) as e:
+            logging.error(f"Could not prepare input backend: {e}")
+            self.renderer.post(f"{Fore.RED}Error: Could not start clicking: {e}")
+            return None
+        session = ClickSession(fixed, cursor, scheduler, metrics, self.backend)
+        session.gate = self.create_gate_check(metrics)
+        self.dialogue_state = ""
+        session.actions = self.create_action_picker(metrics, session.state_counts)
+        session.controller = self.rate_controller = self.create_rate_controller(*cursor.position, interval)
+        return session
+
+    def reload_click_session(self, session: ClickSession, previous: Config) -> bool:
+        """Apply a reloaded config to a running session at a tick boundary
 
-    def click_loop(self, x: int, y: int):
-        """Main clicking loop with pause support and enhanced feedback"""
-        self.click_count = 0
-        self.start_time = time.time()
+        Nothing is swapped in until the new backend is prepared, so a failed
+        reload restores ``previous`` and leaves the session running on the
+        old settings; returns False in that case.
+        """
+        config = self.config
+        changed = set(config_changes(previous, config))
+        cursor = session.cursor
+        backend = new_backend = session.backend
+        post = self.renderer.post
+        try:
+            if session.fixed:
+                plan = ClickPlan.single(*session.fixed, config.click_interval)
+            else:
+                try:
+                    plan = self.build_click_plan()
+                except ValueError as e:
+                    logging.error(f"Invalid click sequence, keeping the current one: {e}")
+                    post(f"{Fore.RED}Invalid click sequence: {e}")
+                    plan = cursor.plan
+            if "input_backend" in changed:
+                new_backend = self.create_backend()
+            step = cursor.step % len(plan)
+            new_backend.prepare(plan.xs[step], plan.ys[step])
+        except Exception as e:
+            logging.error(f"Could not apply reloaded config, keeping the current one: {e}")
+            post(f"{Fore.RED}Config reload failed, keeping the current settings: {e}")
+            if new_backend is not backend:
+                new_backend.close()
+            self.config = previous
+            self.backend = backend
+            return False
+        if new_backend is not backend:
+            backend.close()
+            session.backend = self.backend = new_backend
+        cursor.burst = config.burst_size if config.power_mode == "low_power" else 1
+        cursor.load(plan)
+        self.click_position = cursor.position
+        scheduler = session.scheduler
+        session.rate_changed = session.rate_changed or plan.mean_delay != scheduler.interval
+        scheduler.interval = session.metrics.interval = plan.mean_delay
+        scheduler.policy = config.missed_tick_policy
+        scheduler.max_catch_up = max(0, config.max_catch_up_ticks)
+        now = time.perf_counter()
+        if not session.fixed:
+            geometry = self.create_geometry_watch(now)
+            if geometry and session.geometry:
+                geometry.next_check = session.geometry.next_check
+            session.geometry = geometry
+        if changed & {"vision_gate", "vision_x", "vision_y", "vision_width", "vision_height",
+                      "vision_threshold", "vision_reference"}:
+            if session.gate:
+                session.gate.close()
+            session.gate = self.create_gate_check(session.metrics)
+        if any(key.startswith("classifier") or key == "choice_positions" for key in changed):
+            if session.actions:
+                session.actions.close()
+            session.actions = self.create_action_picker(session.metrics, session.state_counts)
+        controller = session.controller
+        if controller and any(key.startswith("adaptive_") for key in changed):
+            controller.finish(now)
+            controller.probe.close()
+            controller = None
+        if controller:
+            controller.min_interval = plan.mean_delay
+        elif config.adaptive_rate:
+            controller = self.create_rate_controller(*cursor.position, plan.mean_delay)
+            if controller:
+                controller.start(now)
+        session.controller = self.rate_controller = controller
+        return True
+
+    def click_loop(self, x: Optional[int] = None, y: Optional[int] = None):
+        """Main clicking loop with pause support and enhanced feedback
+
+        Without explicit coordinates the configured click plan (sequence or
+        single position) is compiled from the current game geometry and
+        recompiled if the geometry changes. Settings are copied into locals;
+        a reloaded config is picked up at the next tick boundary. Each tick
+        only dispatches to the session's features: geometry watch, adaptive
+        rate, vision gate and classifier actions.
+        """
+        config = self.config
+        self.multi_engine = None
+        session = self.open_click_session(x, y)
+        if session is None:
+            self.control.finish()
+            return
+        cursor, scheduler, metrics = session.cursor, session.scheduler, session.metrics
+        backend, gate, actions, controller = session.backend, session.gate, session.actions, session.controller
+        interval = scheduler.interval
+        clicks = metrics.clicks.cell()
+        gated = metrics.gated_ticks.cell()
+        record_latency = metrics.click_latency.record
+        record_jitter = metrics.interval_jitter.record
+        clock = time.perf_counter
+        scale = controller.gap_scale(interval) if controller else 1.0
+        profile = self.profiler
+        cpu_started = time.process_time()
+        scheduler.start()
+        self.start_time = scheduler.start_time
+        if controller:
+            controller.start(self.start_time)
+        geometry = session.geometry = None if session.fixed else self.create_geometry_watch(self.start_time)
+        self.stop_reason = "hotkey"
+        STARTUP.mark("click session start")
+        x0, y0 = cursor.position
+        log_event("start", interval=interval, steps=cursor.steps, backend=backend.name,
+                  x=x0, y=y0, gate=gate is not None)
+        last_tick = 0.0
+        last_gap = interval
+        first_click = True
         
-        print(f"\n{Fore.GREEN}🚀 Clicking started at ({x}, {y})")
-        print(f"{Fore.CYAN}Press {self.config.pause_key.upper()} to pause, {self.config.emergency_stop_key.upper()} for emergency stop\n")
+        post = self.renderer.post
+        target = f"({x0}, {y0})" if cursor.steps == 1 else f"{cursor.steps}-step sequence"
+        post(f"{Fore.GREEN}🚀 Clicking started at {target} {Fore.CYAN}[{backend.name}]\n"
+             f"{Fore.CYAN}Press {config.pause_key.upper()} to pause, {config.emergency_stop_key.upper()} for emergency stop")
         
-        last_update = 0
+        control = self.control
+        active_only = config.auto_stop_active_only
+        auto_stop_time = config.auto_stop_time
         
-        while not self.stop_event.is_set():
-            current_time = time.time()
-            
-            # Check if we should auto-stop
-            if current_time - self.start_time >= self.config.auto_stop_time:
-                print(f"\n{Fore.YELLOW}⏰ Auto-stop timer reached ({self.config.auto_stop_time}s)")
-                break
+        inbox = control.inbox
+        
+        while True:
+            # Apply queued hotkey commands and config reloads at the tick boundary
+            if inbox:
+                self.apply_commands()
+                if self.config is not config:
+                    previous, config = config, self.config
+                    if not self.reload_click_session(session, previous):
+                        config = previous
+                        continue
+                    backend, gate, actions, controller = session.backend, session.gate, session.actions, session.controller
+                    geometry = session.geometry
+                    active_only = config.auto_stop_active_only
+                    auto_stop_time = config.auto_stop_time
+                    scale = controller.gap_scale(scheduler.interval) if controller else 1.0
             
-            # Handle pause
-            if self.pause_event.is_set():
-                time.sleep(0.1)
-                if current_time - last_update > 1:  # Update display every second while paused
-                    self.update_status_display()
-                    last_update = current_time
+            # Handle pause and stop; blocks on the command inbox while paused
+            if control.state != SessionState.RUNNING:
+                if control.state != SessionState.PAUSED:
+                    break
+                if active_only:
+                    control.wait_for_command()
+                else:
+                    # Paused time counts towards auto-stop, so the wait ends at the limit
+                    remaining = auto_stop_time - (clock() - self.start_time)
+                    if remaining <= 0 or not control.wait_for_command(remaining):
+                        post(f"{Fore.YELLOW}⏰ Auto-stop timer reached ({auto_stop_time}s)")
+                        self.stop_reason = "auto_stop"
+                        break
+                # Re-anchor so the pause is not treated as a run of missed ticks
+                scheduler.next_deadline = clock()
+                last_tick = 0.0
                 continue
             
+            # Check if we should auto-stop; a tick due at or after the limit
+            # is not fired, the remainder of the budget is waited out instead
+            budget_used = scheduler.next_deadline - self.start_time
+            if active_only:
+                budget_used -= control.paused_time()
+            if budget_used + 1e-9 >= auto_stop_time:
+                remaining = auto_stop_time - (budget_used - (scheduler.next_deadline - clock()))
+                if control.wait_for_command(max(0.0, remaining)):
+                    continue
+                post(f"{Fore.YELLOW}⏰ Auto-stop timer reached ({auto_stop_time}s)")
+                self.stop_reason = "auto_stop"
+                break
+            
             try:
-                pyautogui.click(x, y)
-                self.click_count += 1
-                
-                # Update display more frequently for better UX
-                if current_time - last_update > 0.5:  # Update every 0.5 seconds
-                    self.update_status_display()
-                    last_update = current_time
+                gap = cursor.gaps[cursor.step] * scale
+                burst_start = deadline = scheduler.next_deadline
+                if profile is not None:
+                    waited = clock()
+                due = scheduler.wait(gap) * cursor.burst
+                if due > 1 and cursor.burst > 1:
+                    # The whole burst fires at its first click's deadline; drop the
+                    # clicks normal mode would only reach at or after auto-stop
+                    left = auto_stop_time - (burst_start - self.start_time) - 1e-9
+                    if active_only:
+                        left += control.paused_time()
+                    due = cursor.burst_clicks(due, scale, left)
+                if not due or control.state != SessionState.RUNNING:
+                    continue
+                tick = woke = clock()
+                if last_tick:
+                    record_jitter(abs(tick - last_tick - last_gap))
+                last_tick = tick
+                last_gap = gap
+                if geometry is not None and tick >= geometry.next_check:
+                    moved = geometry.check(tick, cursor.plan)
+                    if moved:
+                        plan, area = moved
+                        cursor.load(plan)
+                        self.click_position = cursor.position
+                        backend.prepare(*cursor.position)
+                        post(f"{Fore.CYAN}Game area changed, clicking at {cursor.position}")
+                        if actions is not None:
+                            actions.retarget(self.resolve_actions(area))
+                if controller is not None:
+                    if tick >= controller.next_check and controller.update(tick):
+                        scale = controller.gap_scale(scheduler.interval)
+                    if not controller.allows_click(tick):
+                        continue
+                if gate is not None:
+                    opened = gate.open_at(tick)
+                    if opened is None:
+                        continue
+                    tick = opened
+                if actions is not None:
+                    kind, value = actions.pick(tick)
+                    if kind != "click":
+                        if kind == "wait":
+                            gated[0] += 1
+                        elif kind == "key":
+                            backend.key(value)
+                        elif kind == "choice":
+                            backend.click(*value)
+                            clicks[0] += 1
+                        continue
+                cursor.fire(backend, due)
+                clicks[0] += due
+                done = clock()
+                record_latency((done - tick) / due)
+                if profile is not None:
+                    profile.ticks.record(deadline, waited, woke, done, due, (cursor.step - due) % cursor.steps)
+                if first_click:
+                    first_click = False
+                    STARTUP.mark("first click")
                 
-                time.sleep(self.config.click_interval)
-                
-            except pyautogui.FailSafeException:
-                print(f"\n{Fore.YELLOW}🛑 Mouse failsafe activated - moved to screen corner")
+            except FailSafeError:
+                post(f"{Fore.YELLOW}🛑 Mouse failsafe activated - moved to screen corner")
                 logging.info("FailSafe triggered - mouse moved to corner")
+                self.stop_reason = "failsafe"
                 break
             except Exception as e:
                 logging.error(f"Error in click loop: {e}")
-                print(f"\n{Fore.RED}Error in clicking: {e}")
+                post(f"{Fore.RED}Error in clicking: {e}")
+                self.stop_reason = "error"
                 break
         
+        session.close(clock())
+        burst = cursor.burst
+        state_counts = session.state_counts
+        
         # Calculate final statistics
-        total_time = time.time() - self.start_time
-        avg_rate = self.click_count / total_time if total_time > 0 else 0
+        total_time = clock() - self.start_time
+        stats = metrics.snapshot(total_time)
+        stats["paused_time"] = control.paused_time()
+        stats["missed_ticks"] = scheduler.missed_ticks
+        stats["wakeups"] = scheduler.wakeups
+        stats.update(power_usage(time.process_time() - cpu_started, scheduler.wakeups, total_time))
+        stats["burst_size"] = burst
+        stats["stop_reason"] = self.stop_reason
+        if actions:
+            stats["dialogue_states"] = state_counts
+        if controller:
+            active_time = total_time - stats["paused_time"]
+            stats["adaptive"] = {
+                "idle_time": controller.idle_time,
+                "idle_periods": controller.idle_periods,
+                "changes": controller.changes,
+                "fixed_rate_clicks": int(active_time / scheduler.interval),
+            }
+        self.last_session = stats
+        if self.config.session_history:
+            try:
+                SessionHistory(self.config.history_file).record(time.time() - total_time, stats)
+            except sqlite3.Error as e:
+                logging.error(f"Could not save session history: {e}")
+        log_event("stop", reason=self.stop_reason, duration=round(total_time, 3), clicks=stats["clicks"],
+                  achieved_rate=round(stats["achieved_rate"], 3), target_rate=round(scheduler.target_rate, 3),
+                  paused_time=round(stats["paused_time"], 3), pauses=stats["pauses"],
+                  missed_ticks=scheduler.missed_ticks, gated_ticks=stats["gated_ticks"],
+                  jitter_ms=stats["jitter_ms"], click_latency_ms=stats["click_latency_ms"],
+                  cpu_time=round(stats["cpu_time"], 4), wakeups=scheduler.wakeups)
+        avg_rate = stats["achieved_rate"]
+        latency = format_histogram(stats["click_latency_ms"])
+        jitter = format_histogram(stats["jitter_ms"])
+        # A mid-session rate change makes the average incomparable to the final target
+        behind = controller is None and actions is None and not session.rate_changed and avg_rate < scheduler.target_rate * 0.95
         
         # Reset state
-        self.is_active = False
-        self.is_paused = False
-        self.stop_event.set()
-        self.pause_event.clear()
+        control.finish()
         
         # Show completion summary
-        print(f"\n{Fore.GREEN}✅ Session Complete!")
-        print(f"{Fore.CYAN}Total Clicks: {Fore.YELLOW}{self.click_count}")
-        print(f"{Fore.CYAN}Duration: {Fore.YELLOW}{total_time:.1f}s")
-        print(f"{Fore.CYAN}Average Rate: {Fore.YELLOW}{avg_rate:.1f} clicks/second")
+        summary = [
+            f"{Fore.GREEN}✅ Session Complete!",
+            f"{Fore.CYAN}Total Clicks: {Fore.YELLOW}{stats['clicks']}",
+            f"{Fore.CYAN}Duration: {Fore.YELLOW}{total_time:.1f}s" + (f" {Fore.CYAN}({stats['paused_time']:.1f}s paused)" if stats['paused_time'] else ""),
+            f"{Fore.CYAN}Average Rate: {Fore.YELLOW}{avg_rate:.1f} clicks/second {Fore.CYAN}(target {scheduler.target_rate:.1f})",
+            f"{Fore.CYAN}Click Latency: {Fore.YELLOW}{latency}",
+            f"{Fore.CYAN}Interval Jitter: {Fore.YELLOW}{jitter}",
+            f"{Fore.CYAN}Power: {Fore.YELLOW}{format_power(stats)}" + (f" {Fore.CYAN}(low power, bursts of {burst})" if burst > 1 else ""),
+        ]
+        if gate:
+            summary.append(f"{Fore.CYAN}Vision Gate: {Fore.YELLOW}{stats['gated_ticks']} ticks held back "
+                           f"{Fore.CYAN}(check {format_histogram(stats['gate_latency_ms'])})")
+        if actions:
+            seen = ", ".join(f"{state} {count}" for state, count in sorted(state_counts.items(), key=lambda item: -item[1]))
+            summary.append(f"{Fore.CYAN}Dialogue States: {Fore.YELLOW}{seen or 'none'} "
+                           f"{Fore.CYAN}(classify {format_histogram(stats['classifier_latency_ms'])})")
+        if controller:
+            adaptive = stats["adaptive"]
+            summary.append(f"{Fore.CYAN}Adaptive Rate: {Fore.YELLOW}{stats['clicks']} of ~{adaptive['fixed_rate_clicks']} fixed-rate clicks "
+                           f"{Fore.CYAN}({adaptive['idle_time']:.1f}s idle over {adaptive['idle_periods']} periods)")
+        if scheduler.missed_ticks:
+            summary.append(f"{Fore.CYAN}Missed Ticks: {Fore.YELLOW}{scheduler.missed_ticks} {Fore.CYAN}({self.config.missed_tick_policy})")
+        if behind:
+            summary.append(f"{Fore.RED}⚠️  Engine fell behind the target rate")
+        post("\n".join(summary))
         
-        logging.info(f"Click session completed - Clicks: {self.click_count}, Duration: {total_time:.1f}s, Rate: {avg_rate:.1f}/s")
+        logging.info(f"Click session completed - Clicks: {stats['clicks']}, Duration: {total_time:.1f}s, "
+                     f"Rate: {avg_rate:.1f}/s, Target: {scheduler.target_rate:.1f}/s, Missed ticks: {scheduler.missed_ticks}, "
+                     f"Pauses: {stats['pauses']}")
+        logging.info(f"Click latency - {latency}")
+        logging.info(f"Interval jitter - {jitter}")
+        logging.info(f"Power - {format_power(stats)}, Burst size: {burst}")
+        if gate:
+            logging.info(f"Vision gate - Held back: {stats['gated_ticks']} ticks, "
+                         f"Check: {format_histogram(stats['gate_latency_ms'])}")
+        if actions:
+            logging.info(f"Dialogue states - {state_counts}, Classify: {format_histogram(stats['classifier_latency_ms'])}")
+        if controller:
+            logging.info(f"Adaptive rate - Clicks: {stats['clicks']} of ~{stats['adaptive']['fixed_rate_clicks']} at a fixed rate, "
+                         f"Idle: {controller.idle_time:.1f}s over {controller.idle_periods} periods, Changes seen: {controller.changes}")
+        if behind:
+            logging.warning(f"Engine fell behind target rate: {avg_rate:.1f}/s of {scheduler.target_rate:.1f}/s")
         self.update_status_display()
 
-    def setup_hotkeys(self):
-        """Setup all hotkeys with error handling"""
-        def on_start_stop(e):
-            if not self.is_active:
-                # Start clicking
-                self.stop_event.clear()
-                self.pause_event.clear()
-                self.is_active = True
-                self.is_paused = False
-                
-                self.click_thread = threading.Thread(
-                    target=self.click_loop, 
-                    args=(self.config.click_x, self.config.click_y),
-                    daemon=True
-                )
-                self.click_thread.start()
-                
-                logging.info("Script started")
-                self.update_status_display()
+    def record_macro(self, path: str) -> int:
+        """Record left clicks and key presses into a trace until the emergency stop key"""
+        recorder = TraceRecorder(self.current_area())
+        stop_key = self.config.emergency_stop_key.lower()
+        done = threading.Event()
+        pressed = set()
+        
+        def on_key(event):
+            if (event.name or "").lower() == stop_key:
+                done.set()
+            elif event.event_type == keyboard.KEY_DOWN:
+                # Held keys repeat their down event; record the first only
+                if event.scan_code not in pressed:
+                    pressed.add(event.scan_code)
+                    recorder.key(event.scan_code)
             else:
-                # Stop clicking
-                self.stop_event.set()
-                self.is_active = False
-                self.is_paused = False
-                
-                if self.click_thread:
-                    self.click_thread.join(timeout=1.0)
-                
-                logging.info("Script stopped by hotkey")
-                self.update_status_display()
-
-        def on_pause(e):
-            if self.is_active:
-                self.is_paused = not self.is_paused
-                if self.is_paused:
-                    self.pause_event.set()
-                    print(f"\n{Fore.YELLOW}⏸️  Paused")
-                    logging.info("Script paused")
+                pressed.discard(event.scan_code)
+        
+        try:
+            mouse = Win32MouseHook(recorder.click)
+        except RuntimeError as e:
+            print(f"{Fore.RED}❌ {e}")
+            return 1
+        print(f"{Fore.GREEN}⏺️  Recording clicks and key presses {Fore.CYAN}"
+              f"(press {stop_key.upper()} or CTRL+C to finish)")
+        recorder.start()
+        mouse.start()
+        hook = keyboard.hook(on_key)
+        try:
+            while not done.wait(0.5):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            keyboard.unhook(hook)
+            mouse.stop()
+        
+        recorder.save(path)
+        size = os.path.getsize(path)
+        duration = recorder.columns["times"][-1] if len(recorder) else 0.0
+        print(f"{Fore.GREEN}✓ Saved {len(recorder)} events ({duration:.1f}s) to {path} {Fore.CYAN}({size:,} bytes)")
+        logging.info(f"Macro recorded - Events: {len(recorder)}, Duration: {duration:.1f}s, File: {path}")
+        return 0
+
+    def replay_loop(self, trace: Trace, speed: float = 1.0, loops: int = 1):
+        """Replay a macro trace on the engine worker against absolute deadlines
+
+        Events are read by index from the trace's mapped columns. Deadlines
+        are recomputed from the recorded offsets, so lateness never
+        accumulates; positions are mapped onto the current game area when it
+        differs from the one recorded.
+        """
+        control = self.control
+        post = self.renderer.post
+        clock = time.perf_counter
+        times, xs, ys, codes, kinds = trace.times, trace.xs, trace.ys, trace.codes, trace.kinds
+        count = len(trace)
+        if not count:
+            post(f"{Fore.RED}Macro trace {trace.path} has no events")
+            control.finish()
+            return
+        
+        self.multi_engine = None
+        if self.backend is None:
+            try:
+                self.backend = self.create_backend()
+            except Exception as e:
+                logging.error(f"Could not create input backend: {e}")
+                post(f"{Fore.RED}Error: Could not start replay: {e}")
+                control.finish()
+                return
+        backend = self.backend
+        click, key = backend.click, backend.key
+        
+        scale_x = scale_y = 1.0
+        offset_x = offset_y = 0.0
+        recorded = trace.area
+        area = self.current_area() if recorded else None
+        if area and area != recorded:
+            scale_x, scale_y = area.width / recorded.width, area.height / recorded.height
+            offset_x, offset_y = area.left - recorded.left * scale_x, area.top - recorded.top * scale_y
+        try:
+            backend.prepare(int(offset_x + xs[0] * scale_x), int(offset_y + ys[0] * scale_y))
+        except (RuntimeError, OSError) as e:
+            logging.error(f"Could not prepare input backend: {e}")
+            post(f"{Fore.RED}Error: Could not start replay: {e}")
+            control.finish()
+            return
+        
+        # The recording's lead-in is skipped; loops follow each other after
+        # one average gap so the rhythm carries over
+        first = times[0]
+        span = times[count - 1] - first
+        period = span + (span / (count - 1) if count > 1 else self.config.click_interval)
+        inv_speed = 1 / speed
+        
+        metrics = self.metrics = SessionMetrics(period / count)
+        clicks = metrics.clicks.cell()
+        lateness = metrics.interval_jitter
+        record_lateness = lateness.record
+        keys = 0
+        loop = 0
+        index = 0
+        self.start_time = base = clock()
+        self.stop_reason = "hotkey"
+        inbox = control.inbox
+        log_event("start", replay=trace.path, events=count, speed=speed, loops=loops, backend=backend.name)
+        post(f"{Fore.GREEN}▶️  Replaying {count} events ({span:.1f}s) from {trace.path} "
+             f"{Fore.CYAN}at {speed:g}x, {'looping' if not loops else f'{loops} loop(s)'} [{backend.name}]")
+        
+        while True:
+            if inbox:
+                self.apply_commands()
+            if control.state != SessionState.RUNNING:
+                if control.state != SessionState.PAUSED:
+                    break
+                paused_at = clock()
+                control.wait_for_command()
+                base += clock() - paused_at
+                continue
+            
+            deadline = base + (times[index] - first) * inv_speed
+            now = clock()
+            if now < deadline:
+                # Sleep on the command inbox so hotkeys cut long gaps short
+                control.wait_for_command(deadline - now)
+                continue
+            record_lateness(now - deadline)
+            try:
+                if kinds[index] == TRACE_CLICK:
+                    click(int(offset_x + xs[index] * scale_x), int(offset_y + ys[index] * scale_y))
+                    clicks[0] += 1
                 else:
-                    self.pause_event.clear()
-                    print(f"\n{Fore.GREEN}▶️  Resumed")
-                    logging.info("Script resumed")
-                self.update_status_display()
-
-        def on_emergency_stop(e):
-            if self.is_active:
-                self.stop_event.set()
-                self.is_active = False
-                self.is_paused = False
-                if self.click_thread:
-                    self.click_thread.join(timeout=1.0)
-                logging.info("Emergency stop activated")
-                print(f"\n{Fore.RED}🚨 EMERGENCY STOP ACTIVATED! 🚨{Style.RESET_ALL}")
-                self.update_status_display()
-
-        # Register hotkeys with improved error handling
-        hotkey_configs = [
-            (self.config.start_stop_key, on_start_stop, "Start/Stop"),
-            (self.config.pause_key, on_pause, "Pause/Resume"),
-            (self.config.emergency_stop_key, on_emergency_stop, "Emergency Stop")
-        ]
+                    key(codes[index])
+                    keys += 1
+            except FailSafeError:
+                post(f"{Fore.YELLOW}🛑 Mouse failsafe activated - moved to screen corner")
+                logging.info("FailSafe triggered - mouse moved to corner")
+                self.stop_reason = "failsafe"
+                break
+            except Exception as e:
+                logging.error(f"Error in replay: {e}")
+                post(f"{Fore.RED}Error in replay: {e}")
+                self.stop_reason = "error"
+                break
+            index += 1
+            if index == count:
+                index = 0
+                loop += 1
+                if loops and loop >= loops:
+                    self.stop_reason = "complete"
+                    break
+                base += period * inv_speed
+        
+        total_time = clock() - self.start_time
+        paused_time = control.paused_time()
+        stats = metrics.snapshot(total_time)
+        stats.update(paused_time=paused_time, missed_ticks=0, wakeups=0, stop_reason=self.stop_reason,
+                     keys=keys, loops=loop, drift=None)
+        if self.stop_reason == "complete":
+            # The last event of the last loop is not followed by the loop gap
+            expected = (loop * period - (period - span)) * inv_speed
+            stats["drift"] = total_time - paused_time - expected
+        self.last_session = stats
+        if self.config.session_history:
+            try:
+                SessionHistory(self.config.history_file).record(time.time() - total_time, stats)
+            except sqlite3.Error as e:
+                logging.error(f"Could not save session history: {e}")
+        log_event("stop", reason=self.stop_reason, duration=round(total_time, 3), clicks=stats["clicks"],
+                  keys=keys, loops=loop, drift=stats["drift"], lateness_ms=stats["jitter_ms"])
+        self.replay_request = None
+        control.finish()
+        
+        timing = format_histogram(stats["jitter_ms"])
+        duration = f"{Fore.CYAN}Duration: {Fore.YELLOW}{total_time:.2f}s"
+        if stats["drift"] is not None:
+            duration += f" {Fore.CYAN}(expected {expected:.2f}s, drift {stats['drift'] * 1000:+.1f}ms)"
+        post("\n".join([
+            f"{Fore.GREEN}✅ Replay Complete!",
+            f"{Fore.CYAN}Events: {Fore.YELLOW}{stats['clicks']} clicks, {keys} keys {Fore.CYAN}over {loop} full loop(s)",
+            duration,
+            f"{Fore.CYAN}Event Lateness: {Fore.YELLOW}{timing}",
+        ]))
+        logging.info(f"Replay completed - Clicks: {stats['clicks']}, Keys: {keys}, Loops: {loop}, "
+                     f"Duration: {total_time:.2f}s, Drift: {stats['drift']}")
+        logging.info(f"Replay lateness - {timing}")
+        self.update_status_display()
+
+    def build_instances(self) -> List[InstanceSession]:
+        """Compile one InstanceSession per entry in config.instances"""
+        base = asdict(self.config)
+        base["instances"] = []
+        shared: Dict[str, InputBackend] = {}
+        sessions = []
+        for number, spec in enumerate(self.config.instances, 1):
+            if not isinstance(spec, dict):
+                raise ValueError(f"instance {number} must be an object of settings")
+            spec = dict(spec)
+            name = str(spec.pop("name", f"#{number}"))
+            config, problems = validate_config({**base, **spec})
+            if problems:
+                raise ValueError(f"instance {name}: {'; '.join(problems)}")
+            if config.input_backend == WindowBackend.name:
+                if self.window_manager is None:
+                    self.window_manager = create_window_manager()
+                target = WindowTarget(self.window_manager, config.game_window_title, config.game_process_name)
+                area = target.resolve()
+                if area is None:
+                    raise RuntimeError(f"instance {name}: game window '{config.game_window_title}' not found")
+                backend = WindowBackend(target)
+            else:
+                try:
+                    area = detect_client_area(config.game_window_title)
+                except Exception:
+                    area = None
+                backend = shared.get(config.input_backend)
+                if backend is None:
+                    backend = shared[config.input_backend] = create_input_backend(config.input_backend)
+            sessions.append(InstanceSession(name, plan_for_config(config, area), backend, config.auto_stop_time))
+        return sessions
+
+    def multi_click_loop(self):
+        """Drive every configured instance from this thread with one shared scheduler"""
+        config = self.config
+        control = self.control
+        post = self.renderer.post
+        clock = time.perf_counter
+        try:
+            sessions = self.build_instances()
+            engine = MultiClickEngine(sessions, config.missed_tick_policy, config.max_catch_up_ticks,
+                                      clock=clock, wait=control.wait_for_command)
+            cpu_started = time.process_time()
+            engine.start()
+        except (ValueError, RuntimeError, OSError) as e:
+            logging.error(f"Could not start instances: {e}")
+            post(f"{Fore.RED}Error: Could not start instances: {e}")
+            control.finish()
+            return
+        target_rate = sum(session.target_rate for session in sessions)
+        self.metrics = SessionMetrics(1 / target_rate)
+        self.multi_engine = engine
+        self.start_time = engine.start_time
+        self.stop_reason = "hotkey"
+        STARTUP.mark("click session start")
+        log_event("start", instances=len(sessions), target_rate=round(target_rate, 3))
+        post(f"{Fore.GREEN}🚀 Clicking started on {len(sessions)} instances "
+             f"{Fore.CYAN}({target_rate:.0f} clicks/second combined)\n"
+             f"{Fore.CYAN}Press {config.pause_key.upper()} to pause, {config.emergency_stop_key.upper()} for emergency stop")
+        
+        inbox = control.inbox
+        while True:
+            if inbox:
+                self.apply_commands()
+            if control.state != SessionState.RUNNING:
+                if control.state != SessionState.PAUSED:
+                    break
+                paused_at = clock()
+                if config.auto_stop_active_only:
+                    control.wait_for_command()
+                else:
+                    # Paused time counts towards auto-stop, so the wait ends at the next instance's limit
+                    if engine.expire(paused_at):
+                        control.wait_for_command(engine.next_stop - paused_at)
+                    if not engine.running:
+                        post(f"{Fore.YELLOW}⏰ All instances reached their auto-stop time")
+                        self.stop_reason = "auto_stop"
+                        break
+                engine.shift(clock() - paused_at, stop_times=config.auto_stop_active_only)
+                continue
+            try:
+                if engine.run():
+                    post(f"{Fore.YELLOW}⏰ All instances reached their auto-stop time")
+                    self.stop_reason = "auto_stop"
+                    break
+            except FailSafeError:
+                post(f"{Fore.YELLOW}🛑 Mouse failsafe activated - moved to screen corner")
+                logging.info("FailSafe triggered - mouse moved to corner")
+                self.stop_reason = "failsafe"
+                break
+            except Exception as e:
+                logging.error(f"Error in multi-instance loop: {e}")
+                post(f"{Fore.RED}Error in clicking: {e}")
+                self.stop_reason = "error"
+                break
+        
+        for backend in {id(session.backend): session.backend for session in sessions}.values():
+            backend.close()
+            if isinstance(backend, WindowBackend):
+                backend.target.close()
         
+        total_time = clock() - self.start_time
+        clicks = engine.clicks
+        stats = self.metrics.snapshot(total_time)
+        stats.update(clicks=clicks, achieved_rate=clicks / total_time if total_time > 0 else 0.0,
+                     target_rate=target_rate, jitter_ms=engine.lateness.summary(),
+                     paused_time=control.paused_time(), wakeups=engine.wakeups,
+                     missed_ticks=sum(session.missed_ticks for session in sessions),
+                     stop_reason=self.stop_reason)
+        stats.update(power_usage(time.process_time() - cpu_started, engine.wakeups, total_time))
+        stats["instances"] = [{"name": session.name, "clicks": session.clicks, "target_rate": session.target_rate,
+                               "missed_ticks": session.missed_ticks, "error": session.error}
+                              for session in sessions]
+        self.last_session = stats
+        if config.session_history:
+            try:
+                SessionHistory(config.history_file).record(time.time() - total_time, stats)
+            except sqlite3.Error as e:
+                logging.error(f"Could not save session history: {e}")
+        log_event("stop", reason=self.stop_reason, duration=round(total_time, 3), clicks=clicks,
+                  achieved_rate=round(stats["achieved_rate"], 3), target_rate=round(target_rate, 3),
+                  missed_ticks=stats["missed_ticks"], jitter_ms=stats["jitter_ms"], instances=stats["instances"],
+                  cpu_time=round(stats["cpu_time"], 4), wakeups=engine.wakeups)
+        control.finish()
+        
+        summary = [
+            f"{Fore.GREEN}✅ Session Complete!",
+            f"{Fore.CYAN}Total Clicks: {Fore.YELLOW}{clicks} {Fore.CYAN}across {len(sessions)} instances",
+            f"{Fore.CYAN}Duration: {Fore.YELLOW}{total_time:.1f}s" + (f" {Fore.CYAN}({stats['paused_time']:.1f}s paused)" if stats['paused_time'] else ""),
+            f"{Fore.CYAN}Tick Lateness: {Fore.YELLOW}{format_histogram(stats['jitter_ms'])}",
+            f"{Fore.CYAN}Power: {Fore.YELLOW}{format_power(stats)}",
+        ]
+        for session in sessions:
+            line = (f"{Fore.CYAN}  {session.name}: {Fore.YELLOW}{session.clicks} clicks "
+                    f"{Fore.CYAN}(target {session.target_rate:.1f}/s)")
+            if session.missed_ticks:
+                line += f" {Fore.CYAN}missed {session.missed_ticks}"
+            if session.error:
+                line += f" {Fore.RED}stopped: {session.error}"
+            summary.append(line)
+        post("\n".join(summary))
+        logging.info(f"Multi-instance session completed - Instances: {len(sessions)}, Clicks: {clicks}, "
+                     f"Duration: {total_time:.1f}s, Missed ticks: {stats['missed_ticks']}, Pauses: {stats['pauses']}")
+        logging.info(f"Tick lateness - {format_histogram(stats['jitter_ms'])}")
+        logging.info(f"Power - {format_power(stats)}")
+        self.update_status_display()
+
+    def apply_command(self, command: str):
+        """Apply one engine command; only called on the engine worker"""
+        control = self.control
+        if command in (EngineCommand.START_STOP, EngineCommand.START) and control.start():
+            logging.info("Script started")
+        elif command in (EngineCommand.START_STOP, EngineCommand.STOP) and control.stop():
+            logging.info("Script stopped by hotkey")
+        elif command == EngineCommand.EMERGENCY_STOP and control.stop():
+            self.stop_reason = "emergency"
+            logging.info("Emergency stop activated")
+            self.renderer.post(f"{Fore.RED}🚨 EMERGENCY STOP ACTIVATED! 🚨{Style.RESET_ALL}")
+        elif command in (EngineCommand.TOGGLE_PAUSE, EngineCommand.PAUSE) and control.pause():
+            self.metrics.pauses.increment()
+            self.renderer.post(f"{Fore.YELLOW}⏸️  Paused")
+            logging.info("Script paused")
+            log_event("pause", clicks=self.click_count)
+        elif command in (EngineCommand.TOGGLE_PAUSE, EngineCommand.RESUME) and control.resume():
+            self.renderer.post(f"{Fore.GREEN}▶️  Resumed")
+            logging.info("Script resumed")
+            log_event("resume", clicks=self.click_count)
+        elif command == EngineCommand.RELOAD_CONFIG and self.pending_config is not None:
+            config, self.pending_config = self.pending_config, None
+            self.apply_config(config)
+        elif command == EngineCommand.SHUTDOWN:
+            self.engine_running = False
+            if control.stop():
+                self.stop_reason = "shutdown"
+        self.update_status_display()
+
+    def on_config_change(self, config: Config):
+        """Watcher callback: queue a new config for the engine worker"""
+        for key, value in list(self.cli_overrides.items()):
+            self.saved_values[key] = getattr(config, key)
+            setattr(config, key, value)
+        self.pending_config = config
+        self.control.submit(EngineCommand.RELOAD_CONFIG)
+
+    def apply_config(self, config: Config):
+        """Swap in a new config; a running session picks it up at its next tick"""
+        changed = config_changes(self.config, config)
+        if not changed:
+            return
+        if "input_backend" in changed:
+            self.backend = None
+        self.position_cache.clear()
+        self.config = config
+        if self.hotkeys and set(HOTKEY_SETTINGS) & set(changed):
+            self.hotkeys.debounce = config.hotkey_debounce
+            for problem in self.hotkeys.rebind([(key, command) for key, command, _ in self.hotkey_bindings()]):
+                logging.error(f"Hotkey not bound: {problem}")
+                self.renderer.post(f"{Fore.RED}Hotkey not bound: {problem}")
+        later = [key for key in changed if key in RESTART_REQUIRED]
+        # Instance plans are compiled when a session starts and the running
+        # multi-instance engine never re-reads the config
+        next_start = []
+        if self.control.is_active:
+            if self.multi_engine is not None:
+                next_start = [key for key in changed if key not in RESTART_REQUIRED and key not in HOTKEY_SETTINGS]
+            elif "instances" in changed:
+                next_start = ["instances"]
+        logging.info(f"Config reloaded - Changed: {', '.join(changed)}")
+        message = f"{Fore.CYAN}🔄 Config reloaded ({len(changed)} setting{'s' if len(changed) != 1 else ''} changed)"
+        if next_start:
+            message += f"\n{Fore.YELLOW}Applies from the next start: {', '.join(next_start)}"
+            logging.info(f"Config changes applying from the next start: {', '.join(next_start)}")
+        if later:
+            message += f"\n{Fore.YELLOW}Restart to apply: {', '.join(later)}"
+            logging.info(f"Config changes needing a restart: {', '.join(later)}")
+        self.renderer.post(message)
+
+    def start_config_watcher(self):
+        """Watch the config file for edits while the engine runs"""
+        if self.config.hot_reload and self.config_watcher is None:
+            self.config_watcher = ConfigWatcher(CONFIG_FILE, self.on_config_change,
+                                                self.config.config_poll_interval)
+            self.config_watcher.start()
+
+    def stop_config_watcher(self):
+        if self.config_watcher:
+            self.config_watcher.stop()
+            self.config_watcher = None
+
+    def start_control_api(self):
+        """Serve the local control API if enabled"""
+        cfg = self.config
+        if not cfg.control_api or self.control_server is not None:
+            return
+        path = cfg.control_socket if os.name != 'nt' else ""
+        server = ControlServer(self.api_request, self.api_snapshot, cfg.control_host, cfg.control_port, path)
+        try:
+            server.start()
+        except OSError as e:
+            logging.error(f"Could not start control API: {e}")
+            print(f"{Fore.RED}❌ Could not start control API: {e}")
+            return
+        self.control_server = server
+        where = path or f"{server.address[0]}:{server.address[1]}"
+        logging.info(f"Control API listening on {where}")
+        print(f"{Fore.GREEN}✓ Control API listening on {where}")
+
+    def stop_control_api(self):
+        if self.control_server:
+            self.control_server.stop()
+            self.control_server = None
+
+    def api_request(self, request: Dict[str, object]) -> Dict[str, object]:
+        """Handle one control API request; runs on the control API thread"""
+        cmd = request.get("cmd")
+        if cmd in API_COMMANDS:
+            self.control.submit(API_COMMANDS[cmd])
+            return {"ok": True}
+        if cmd == "status":
+            return {"ok": True, **self.api_snapshot(), "last_session": self.last_session}
+        if cmd == "set":
+            problems = self.request_settings(request)
+            return {"ok": not problems, "error": "; ".join(problems)} if problems else {"ok": True}
+        return {"ok": False, "error": f"unknown command {cmd!r}"}
+
+    def request_settings(self, request: Dict[str, object]) -> List[str]:
+        """Queue interval/target/duration changes like a config reload, without saving them"""
+        changes: Dict[str, object] = {}
+        if "interval" in request:
+            changes["click_interval"] = request["interval"]
+        if "duration" in request:
+            changes["auto_stop_time"] = request["duration"]
+        if "target" in request:
+            target = request["target"]
+            if not (isinstance(target, list) and len(target) == 2):
+                return ["target must be [x, y] in pixels"]
+            changes.update(coordinate_mode="absolute", click_x=target[0], click_y=target[1], click_sequence=[])
+        if not changes:
+            return ["set needs interval, target or duration"]
+        checked, problems = validate_config(changes)
+        if problems:
+            return problems
+        config = Config(**asdict(self.pending_config or self.config))
+        for key in changes:
+            self.saved_values.setdefault(key, getattr(config, key))
+            setattr(config, key, getattr(checked, key))
+        # Like command-line values, these survive config file reloads and are not saved
+        self.cli_overrides.update((key, getattr(checked, key)) for key in changes)
+        self.pending_config = config
+        self.control.submit(EngineCommand.RELOAD_CONFIG)
+        return []
+
+    def api_snapshot(self) -> Dict[str, object]:
+        """Session counters for control API clients"""
+        control = self.control
+        active = control.is_active
+        clicks = self.click_count if active else 0
+        elapsed = time.perf_counter() - self.start_time if active and self.start_time else 0.0
+        snapshot = {
+            "state": control.state,
+            "clicks": clicks,
+            "elapsed": round(elapsed, 3),
+            "rate": round(clicks / elapsed, 2) if elapsed > 0 else 0.0,
+            "target_rate": round(1 / self.config.click_interval, 2),
+            "paused_time": round(control.paused_time(), 3),
+            "position": list(self.click_position),
+            "sessions": control.finished_sessions,
+        }
+        if active and self.dialogue_state:
+            snapshot["dialogue_state"] = self.dialogue_state
+        engine = self.multi_engine
+        if active and engine:
+            snapshot["instances"] = {session.name: session.clicks for session in engine.sessions}
+        return snapshot
+
+    def apply_commands(self):
+        """Apply every queued command in order"""
+        inbox = self.control.inbox
+        while inbox:
+            self.apply_command(inbox.popleft())
+
+    def engine_loop(self):
+        """Long-lived worker: waits for commands and runs click sessions"""
+        control = self.control
+        while self.engine_running:
+            command = control.next_command()
+            self.apply_command(command)
+            if control.state == SessionState.RUNNING:
+                profiler = self.profiler
+                if profiler:
+                    profiler.begin()
+                try:
+                    if self.replay_request:
+                        self.replay_loop(*self.replay_request)
+                    elif self.config.instances:
+                        self.multi_click_loop()
+                    else:
+                        self.click_loop()
+                except Exception as e:
+                    logging.exception(f"Click session failed: {e}")
+                    self.renderer.post(f"{Fore.RED}Error: Click session failed: {e}")
+                finally:
+                    # Sessions finish themselves; this releases one that raised
+                    control.finish()
+                if profiler:
+                    profiler.end()
+                    self.report_profile(profiler)
+
+    def enable_profiling(self, path: str, ticks: int):
+        """Attach a Profiler; must run before the hotkeys are set up"""
+        self.profiler = Profiler(path, ticks)
+        self.renderer.on_frame = self.profiler.spans["status render"].record
+
+    def report_profile(self, profiler: Profiler):
+        try:
+            trace_path, stats_path = profiler.write()
+        except OSError as e:
+            logging.error(f"Could not write profile: {e}")
+            self.renderer.post(f"{Fore.RED}Could not write profile: {e}")
+            return
+        slowest = ", ".join(f"{late * 1000:.2f}ms at {at:.2f}s" for at, late in profiler.slowest_ticks())
+        lines = [f"{Fore.CYAN}📈 Profile: {Fore.YELLOW}{len(profiler.ticks)} ticks {Fore.CYAN}written to "
+                 f"{Fore.YELLOW}{trace_path}{Fore.CYAN}, {Fore.YELLOW}{stats_path}"]
+        if slowest:
+            lines.append(f"{Fore.CYAN}Worst Lateness: {Fore.YELLOW}{slowest}")
+        self.renderer.post("\n".join(lines))
+        logging.info(f"Profile written - Ticks: {len(profiler.ticks)}, Trace: {trace_path}, Stats: {stats_path}, "
+                     f"Worst lateness: {slowest or 'none'}")
+
+    def start_engine(self):
+        """Start the engine worker once; later sessions reuse it"""
+        if self.worker and self.worker.is_alive():
+            return
+        self.engine_running = True
+        self.worker = threading.Thread(target=self.engine_loop, name="click-engine", daemon=True)
+        self.worker.start()
+
+    def stop_engine(self, timeout: float = 2.0):
+        """Stop any running session and shut the engine worker down"""
+        if self.worker and self.worker.is_alive():
+            self.control.submit(EngineCommand.SHUTDOWN)
+            self.worker.join(timeout=timeout)
+
+    def hotkey_bindings(self) -> List[Tuple[str, str, str]]:
+        return [
+            (self.config.start_stop_key, EngineCommand.START_STOP, "Start/Stop"),
+            (self.config.pause_key, EngineCommand.TOGGLE_PAUSE, "Pause/Resume"),
+            (self.config.emergency_stop_key, EngineCommand.EMERGENCY_STOP, "Emergency Stop"),
+        ]
+
+    def setup_hotkeys(self, source=None):
+        """Setup all hotkeys with error handling
+
+        One hook feeds a HotkeyDispatcher, whose callback only queues a
+        command for the engine worker.
+        """
+        if self.hotkeys is None:
+            self.hotkeys = HotkeyDispatcher(self.control.submit, self.config.hotkey_debounce)
+        bindings = self.hotkey_bindings()
         registered_count = 0
         failed_keys = []
         
-        for key, handler, description in hotkey_configs:
+        for key, command, description in bindings:
             try:
-                keyboard.on_press_key(key, handler)
+                self.hotkeys.bind(key, command)
                 registered_count += 1
-            except Exception as e:
+            except ValueError as e:
                 logging.error(f"Error registering {description} hotkey ({key}): {e}")
                 failed_keys.append(f"{description} ({key})")
         
-        if registered_count == len(hotkey_configs):
+        try:
+            self.hotkeys.install(source, self.profiler.spans["hotkey"].record if self.profiler else None)
+        except Exception as e:
+            logging.error(f"Error installing keyboard hook: {e}")
+            print(f"{Fore.RED}❌ Could not install keyboard hook: {e}")
+            return
+        
+        if registered_count == len(bindings):
             print(f"{Fore.GREEN}✓ All hotkeys registered successfully!")
         else:
-            print(f"{Fore.YELLOW}⚠️  {registered_count}/{len(hotkey_configs)} hotkeys registered")
+            print(f"{Fore.YELLOW}⚠️  {registered_count}/{len(bindings)} hotkeys registered")
             if failed_keys:
                 print(f"{Fore.RED}Failed: {', '.join(failed_keys)}")
 
+    def remove_hotkeys(self):
+        if self.hotkeys:
+            self.hotkeys.uninstall()
+            self.hotkeys = None
+
     def print_banner(self):
         """Print application banner with improved styling"""
         print(f"{Back.BLUE}{Fore.WHITE}")
@@ -490,14 +4805,32 @@ class DialogueSkipper:
         
         # Click settings
         print(f"\n{Fore.YELLOW}⚡ Performance:")
-        print(f"   Click Position: {Fore.GREEN}({self.config.click_x}, {self.config.click_y})")
+        if self.config.coordinate_mode == "relative":
+            try:
+                area = self.geometry_provider()
+                (x, y), (rel_x, rel_y) = self.resolve_click_position(area), self.click_fractions(area)
+            except Exception:
+                (x, y), (rel_x, rel_y) = (self.config.click_x, self.config.click_y), (self.config.click_rel_x, self.config.click_rel_y)
+            print(f"   Click Position: {Fore.GREEN}({x}, {y}) {Fore.CYAN}({rel_x:.1%}, {rel_y:.1%} of game area)")
+            if self.config.monitor_profiles:
+                print(f"   Saved Profiles: {Fore.GREEN}{', '.join(self.config.monitor_profiles)}")
+        else:
+            print(f"   Click Position: {Fore.GREEN}({self.config.click_x}, {self.config.click_y}) {Fore.CYAN}(fixed pixels)")
+        if self.config.click_sequence:
+            errors = validate_sequence(self.config.click_sequence)
+            print(f"   Click Sequence: {Fore.GREEN if not errors else Fore.RED}{len(self.config.click_sequence)} steps"
+                  f"{' (invalid: ' + errors[0] + ')' if errors else ''}")
         print(f"   Click Speed: {Fore.GREEN}{1/self.config.click_interval:.0f} clicks/second {Fore.CYAN}({self.config.click_interval}s interval)")
         print(f"   Auto-stop Timer: {Fore.GREEN}{self.config.auto_stop_time//60}m {self.config.auto_stop_time%60}s {Fore.CYAN}({self.config.auto_stop_time}s total)")
+        print(f"   Auto-stop Counts: {Fore.GREEN}{'Active time only' if self.config.auto_stop_active_only else 'Paused time too'}")
+        print(f"   Missed Ticks: {Fore.GREEN}{self.config.missed_tick_policy}")
+        print(f"   Input Backend: {Fore.GREEN}{self.config.input_backend}")
         
         # UI settings
         print(f"\n{Fore.YELLOW}🖥️  Display:")
         print(f"   Click Counter: {Fore.GREEN if self.config.show_click_counter else Fore.RED}{'ON' if self.config.show_click_counter else 'OFF'}")
         print(f"   Timer Display: {Fore.GREEN if self.config.show_elapsed_time else Fore.RED}{'ON' if self.config.show_elapsed_time else 'OFF'}")
+        print(f"   Status Refresh: {Fore.GREEN}{self.config.status_fps:g} FPS")
         
         # Screen info
         try:
@@ -549,6 +4882,86 @@ class DialogueSkipper:
                 print(f"{Fore.RED}❌ Invalid choice. Please select 1-5.")
                 time.sleep(1.5)
 
+    def apply_cli_overrides(self, args: argparse.Namespace) -> List[str]:
+        """Apply command-line settings for this run without saving them
+
+        Returns the problems found; nothing is applied if there are any.
+        """
+        overrides = {}
+        if args.x is not None and args.y is not None:
+            overrides.update(coordinate_mode="absolute", click_x=args.x, click_y=args.y, click_sequence=[])
+        if args.interval is not None:
+            overrides["click_interval"] = args.interval
+        if args.duration is not None:
+            overrides["auto_stop_time"] = args.duration
+        if args.backend is not None:
+            overrides["input_backend"] = args.backend
+        if args.api:
+            overrides["control_api"] = True
+        _, problems = validate_config(overrides)
+        if problems:
+            return problems
+        if "input_backend" in overrides:
+            self.backend = None
+        # Overrides also survive config file reloads
+        self.cli_overrides.update(overrides)
+        for key, value in overrides.items():
+            self.saved_values.setdefault(key, getattr(self.config, key))
+            setattr(self.config, key, value)
+        return []
+
+    def run_headless(self, use_hotkeys: bool = True) -> int:
+        """Run a single session from the command line, without menus or prompts"""
+        if os.name == 'nt' and not self.is_admin():
+            print(f"{Fore.YELLOW}⚠️  Not running as administrator; the game may ignore clicks")
+        print(f"{Fore.GREEN}🎮 Clicking at {1/self.config.click_interval:.0f} clicks/second for up to "
+              f"{self.config.auto_stop_time}s {Fore.CYAN}(CTRL+C to stop)")
+        return self.run_session(use_hotkeys)
+
+    def run_replay(self, path: str, speed: float = 1.0, loops: int = 1, use_hotkeys: bool = True) -> int:
+        """Replay a recorded macro trace from the command line"""
+        if speed <= 0:
+            print(f"{Fore.RED}--speed must be positive")
+            return 2
+        try:
+            trace = Trace(path)
+        except (OSError, ValueError) as e:
+            print(f"{Fore.RED}❌ Could not load macro trace: {e}")
+            return 1
+        self.replay_request = (trace, speed, loops)
+        try:
+            return self.run_session(use_hotkeys)
+        finally:
+            trace.close()
+
+    def run_session(self, use_hotkeys: bool = True) -> int:
+        """Start one engine session and block until it finishes or CTRL+C"""
+        self.start_engine()
+        self.start_config_watcher()
+        self.start_control_api()
+        if use_hotkeys:
+            self.setup_hotkeys()
+        self.renderer.start()
+        finished = self.control.finished_sessions
+        self.control.submit(EngineCommand.START)
+        try:
+            # Short timeouts keep the main thread responsive to CTRL+C on Windows
+            while not self.control.wait_for_finish(finished + 1, timeout=0.5):
+                if not self.worker.is_alive():
+                    logging.error("Engine worker exited before the session finished")
+                    print(f"{Fore.RED}❌ Click engine stopped unexpectedly, see the log for details")
+                    return 1
+        except KeyboardInterrupt:
+            logging.info("Headless session interrupted by KeyboardInterrupt")
+        finally:
+            self.remove_hotkeys()
+            self.stop_control_api()
+            self.stop_config_watcher()
+            self.stop_engine()
+            self.renderer.stop()
+            print()
+        return 0
+
     def run(self):
         """Main application entry point with enhanced error handling"""
         try:
@@ -574,17 +4987,22 @@ class DialogueSkipper:
             print(f"\n{Fore.RED}⚠️  Safety: Move mouse to screen corner for emergency stop")
             print(f"{Fore.MAGENTA}Ready! Press {self.config.start_stop_key.upper()} when in-game...")
             
+            self.start_engine()
+            self.start_config_watcher()
+            self.start_control_api()
             self.setup_hotkeys()
-            self.update_status_display()
+            self.renderer.start()
             
             # Keep the script running
             keyboard.wait()
             
         except KeyboardInterrupt:
-            self.stop_event.set()
-            if self.click_thread and self.click_thread.is_alive():
-                print(f"\n{Fore.YELLOW}Stopping click thread...")
-                self.click_thread.join(timeout=2.0)
+            if self.control.is_active:
+                self.renderer.post(f"{Fore.YELLOW}Stopping click thread...")
+            self.stop_control_api()
+            self.stop_config_watcher()
+            self.stop_engine()
+            self.renderer.stop()
             
             self.clear_console()
             print(f"\n{Fore.GREEN}✅ Dialogue Skipper closed safely")
@@ -597,15 +5015,291 @@ class DialogueSkipper:
             print(f"{Fore.YELLOW}Check 'dialogue_skipper.log' for detailed error information.")
             input(f"\n{Fore.CYAN}Press Enter to exit...")
 
+BENCH_INTERVALS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1)
+
+def run_benchmark(intervals=BENCH_INTERVALS, duration: float = 2.0, backend: str = "null",
+                  output: Optional[str] = "dialogue_skipper_bench.json",
+                  power_modes: Tuple[str, ...] = ("normal",), burst_size: int = 5) -> Dict[str, object]:
+    """Drive click_loop headlessly across a sweep of click intervals and power modes"""
+    import platform
+    
+    results = []
+    for interval in intervals:
+        for power_mode in power_modes:
+            config = Config(click_interval=interval, auto_stop_time=duration, input_backend=backend,
+                            session_history=False, power_mode=power_mode, burst_size=burst_size,
+                            log_file="")
+            skipper = DialogueSkipper(config)
+            skipper.control.start()
+            
+            wall_start = time.perf_counter()
+            skipper.click_loop(config.click_x, config.click_y)
+            wall = time.perf_counter() - wall_start
+            
+            stats = skipper.last_session
+            target = 1 / interval
+            results.append({
+                "interval": interval,
+                "power_mode": power_mode,
+                "burst_size": stats["burst_size"],
+                "target_rate": target,
+                "achieved_rate": stats["achieved_rate"],
+                "rate_error_pct": abs(stats["achieved_rate"] - target) / target * 100,
+                "clicks": stats["clicks"],
+                "missed_ticks": stats["missed_ticks"],
+                "jitter_ms": stats["jitter_ms"],
+                "click_latency_ms": stats["click_latency_ms"],
+                "cpu_time": stats["cpu_time"],
+                "cpu_pct": stats["cpu_time"] / wall * 100 if wall > 0 else 0.0,
+                "wakeups_per_sec": stats["wakeups"] / wall if wall > 0 else 0.0,
+            })
+    
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": backend,
+        "duration": duration,
+        "results": results,
+    }
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=4)
+        logging.info(f"Benchmark results written to {output}")
+    return report
+
+def print_benchmark(report: Dict[str, object]):
+    """Print a benchmark report as a table, plus power savings if both modes ran"""
+    print(f"\n{Fore.CYAN}═══ Click Engine Benchmark ═══")
+    print(f"{Fore.CYAN}Backend: {Fore.YELLOW}{report['backend']} {Fore.CYAN}Duration: {Fore.YELLOW}{report['duration']}s per interval\n")
+    print(f"{'interval':>9} {'mode':>9} {'target/s':>9} {'achieved/s':>11} {'err%':>6} "
+          f"{'jit p50':>8} {'jit p95':>8} {'jit p99':>8} {'cpu%':>6} {'wake/s':>8}")
+    for r in report["results"]:
+        jitter = r["jitter_ms"]
+        color = Fore.GREEN if r["rate_error_pct"] < 5 else Fore.RED
+        mode = "normal" if r["burst_size"] == 1 else f"burst {r['burst_size']}"
+        print(f"{color}{r['interval']:>9g} {mode:>9} {r['target_rate']:>9.1f} {r['achieved_rate']:>11.1f} {r['rate_error_pct']:>6.1f} "
+              f"{jitter['p50']:>8.3f} {jitter['p95']:>8.3f} {jitter['p99']:>8.3f} {r['cpu_pct']:>6.1f} {r['wakeups_per_sec']:>8.1f}")
+    
+    normal = {r["interval"]: r for r in report["results"] if r["power_mode"] == "normal"}
+    low = [r for r in report["results"] if r["power_mode"] == "low_power" and r["interval"] in normal]
+    if low:
+        print(f"\n{Fore.CYAN}Low power vs normal:")
+        print(f"{'interval':>9} {'clicks':>8} {'cpu':>8} {'wake-ups':>9}")
+        for r in low:
+            base = normal[r["interval"]]
+            clicks = r["clicks"] / base["clicks"] * 100 if base["clicks"] else 0.0
+            cpu = (1 - r["cpu_time"] / base["cpu_time"]) * 100 if base["cpu_time"] else 0.0
+            wakeups = (1 - r["wakeups_per_sec"] / base["wakeups_per_sec"]) * 100 if base["wakeups_per_sec"] else 0.0
+            print(f"{Fore.GREEN}{r['interval']:>9g} {clicks:>7.1f}% {-cpu:>+7.1f}% {-wakeups:>+8.1f}%")
+
+def run_input_benchmark(backends: List[str], x: int, y: int, clicks: int = 20000,
+                        burst: int = 10, config: Optional[Config] = None) -> List[Dict[str, object]]:
+    """Per-click cost of each backend's click() against its click_burst()"""
+    results = []
+    clock = time.perf_counter
+    for name in backends:
+        if name == WindowBackend.name:
+            backend = WindowBackend(config=config)
+        else:
+            backend = create_input_backend(name)
+        try:
+            backend.prepare(x, y)
+            started = clock()
+            for _ in range(clicks):
+                backend.click(x, y)
+            single = (clock() - started) / clicks
+            started = clock()
+            for _ in range(clicks // burst):
+                backend.click_burst(x, y, burst)
+            batched = (clock() - started) / (clicks // burst * burst)
+        finally:
+            backend.close()
+        results.append({"backend": name, "clicks": clicks, "burst": burst,
+                        "click_us": single * 1e6, "burst_us": batched * 1e6})
+    return results
+
+def print_input_benchmark(results: List[Dict[str, object]]):
+    print(f"\n{Fore.CYAN}═══ Input Backend Benchmark ═══")
+    print(f"{'backend':>10} {'clicks':>8} {'click us':>10} {'burst us':>10} {'speedup':>8}")
+    for r in results:
+        speedup = r["click_us"] / r["burst_us"] if r["burst_us"] else 0.0
+        print(f"{Fore.GREEN}{r['backend']:>10} {r['clicks']:>8} {r['click_us']:>10.2f} "
+              f"{r['burst_us']:>10.2f} {speedup:>7.1f}x {Fore.CYAN}(bursts of {r['burst']})")
+
+def print_history(summary: Dict[str, object], days: Optional[float] = None):
+    """Print session history aggregates"""
+    period = f"last {days:g} days" if days else "all time"
+    print(f"\n{Fore.CYAN}═══ Session History ({period}) ═══")
+    if not summary["sessions"]:
+        print(f"{Fore.YELLOW}No sessions recorded yet")
+        return
+    first = datetime.fromtimestamp(summary["first"]).strftime("%Y-%m-%d %H:%M")
+    last = datetime.fromtimestamp(summary["last"]).strftime("%Y-%m-%d %H:%M")
+    hours, rem = divmod(int(summary["duration"]), 3600)
+    print(f"{Fore.CYAN}Sessions: {Fore.YELLOW}{summary['sessions']} {Fore.CYAN}({first} → {last})")
+    print(f"{Fore.CYAN}Total Clicks: {Fore.YELLOW}{summary['clicks']:,}")
+    print(f"{Fore.CYAN}Total Time: {Fore.YELLOW}{hours}h {rem // 60}m {rem % 60}s")
+    print(f"{Fore.CYAN}Average Rate: {Fore.YELLOW}{summary['mean_rate']:.1f} clicks/second")
+    print(f"{Fore.CYAN}Interval Jitter: {Fore.YELLOW}mean p50 {summary['jitter_p50_ms']:.3f}ms, "
+          f"mean p99 {summary['jitter_p99_ms']:.3f}ms, worst p99 {summary['worst_jitter_p99_ms']:.3f}ms")
+    print(f"{Fore.CYAN}Pauses: {Fore.YELLOW}{summary['pauses']} {Fore.CYAN}Missed Ticks: {Fore.YELLOW}{summary['missed_ticks']}")
+    reasons = ", ".join(f"{reason} {count}" for reason, count in summary["stop_reasons"].items())
+    print(f"{Fore.CYAN}Stop Reasons: {Fore.YELLOW}{reasons}")
+    print(f"\n{'month':>8} {'sessions':>9} {'clicks':>10} {'hours':>7}")
+    for month in summary["months"]:
+        print(f"{month['month']:>8} {month['sessions']:>9} {month['clicks']:>10} {month['duration'] / 3600:>7.1f}")
+
+def classify_images(config: Config, paths: List[str], iterations: int = 1000) -> List[Dict[str, object]]:
+    """Classify screenshot files with the configured templates and time the match"""
+    region = (config.classifier_x, config.classifier_y, config.classifier_width, config.classifier_height)
+    index = TemplateIndex.load_or_build(config.classifier_templates, region, config.classifier_cache)
+    frames = [crop_region(load_image(path), *region) for path in paths]
+    classifier = DialogueClassifier(FixtureFrameSource(frames), index, config.classifier_width,
+                                    config.classifier_height, config.classifier_threshold)
+    results = []
+    clock = time.perf_counter
+    for path, frame in zip(paths, frames):
+        state, distance = classifier.match(frame)
+        histogram = LatencyHistogram()
+        for _ in range(iterations):
+            started = clock()
+            classifier.match(frame)
+            histogram.record(clock() - started)
+        results.append({"path": path, "state": state, "distance": distance, "match_ms": histogram.summary()})
+    return results
+
+def print_classification(results: List[Dict[str, object]]):
+    print(f"\n{Fore.CYAN}═══ Dialogue Classifier ═══")
+    for result in results:
+        print(f"{Fore.CYAN}{result['path']}: {Fore.YELLOW}{result['state']} "
+              f"{Fore.CYAN}(distance {result['distance']:.4f})")
+        print(f"  {Fore.CYAN}Match: {Fore.YELLOW}{format_histogram(result['match_ms'])}")
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Honkai Star Rail Dialogue Skipper")
+    parser.add_argument("--start", action="store_true",
+                        help="start clicking immediately without the interactive menu")
+    parser.add_argument("--x", type=int, help="click X coordinate in pixels (with --y)")
+    parser.add_argument("--y", type=int, help="click Y coordinate in pixels (with --x)")
+    parser.add_argument("--interval", type=float, help="seconds between clicks")
+    parser.add_argument("--duration", type=int, help="auto-stop after this many seconds")
+    parser.add_argument("--backend", choices=tuple(INPUT_BACKENDS), help="input backend to click with")
+    parser.add_argument("--api", action="store_true",
+                        help="serve the local control API (control_host/control_port or control_socket)")
+    parser.add_argument("--no-hotkeys", action="store_true",
+                        help="with --start, do not install the keyboard hotkeys")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print import and time-to-first-click timings on exit")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="print the compiled click timeline and exit")
+    parser.add_argument("--record", metavar="TRACE",
+                        help="record clicks and key presses into a macro trace file and exit")
+    parser.add_argument("--replay", metavar="TRACE",
+                        help="replay a recorded macro trace through the click engine")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="with --replay, playback speed factor (default: 1)")
+    parser.add_argument("--loop", type=int, default=1,
+                        help="with --replay, number of times to play the trace, 0 to repeat until stopped")
+    parser.add_argument("--classify", nargs="+", metavar="IMAGE",
+                        help="classify screenshots with the configured templates, time the match and exit")
+    parser.add_argument("--profile", nargs="?", const="dialogue_skipper_profile", metavar="PATH",
+                        help="after each session write PATH.trace.json (Chrome trace) and PATH.prof (cProfile)")
+    parser.add_argument("--profile-ticks", type=int, default=20000,
+                        help="with --profile, number of most recent ticks to keep (default: 20000)")
+    parser.add_argument("--stats", action="store_true",
+                        help="print aggregates from the session history and exit")
+    parser.add_argument("--stats-days", type=float,
+                        help="with --stats, only include sessions from the last N days")
+    parser.add_argument("--bench", action="store_true",
+                        help="run the headless click engine benchmark and exit")
+    parser.add_argument("--bench-duration", type=float, default=2.0,
+                        help="seconds to run each interval in the benchmark (default: 2)")
+    parser.add_argument("--bench-backend", choices=("null", "recording"), default="null",
+                        help="input backend used by the benchmark (default: null)")
+    parser.add_argument("--bench-power", action="store_true",
+                        help="with --bench, also run each interval in low_power mode and compare")
+    parser.add_argument("--bench-input", nargs="+", choices=tuple(INPUT_BACKENDS), metavar="BACKEND",
+                        help="time single clicks against bursts per input backend and exit; "
+                             "real backends really click at --x/--y (default: the saved position)")
+    parser.add_argument("--bench-output", default="dialogue_skipper_bench.json",
+                        help="where to write the JSON benchmark results")
+    return parser.parse_args(argv)
+
+def print_startup_report():
+    print(f"\n{Fore.CYAN}═══ Startup Report ═══")
+    for line in STARTUP.lines():
+        print(line)
+
 def main():
     """Application entry point with enhanced error handling"""
+    # Initialize colorama for colored console output
+    init(autoreset=True)
+    args = parse_args()
+    if args.startup_report:
+        atexit.register(print_startup_report)
+    STARTUP.mark("arguments parsed")
+    
+    if args.bench:
+        modes = POWER_MODES if args.bench_power else ("normal",)
+        report = run_benchmark(duration=args.bench_duration, backend=args.bench_backend,
+                               output=args.bench_output, power_modes=modes)
+        print_benchmark(report)
+        print(f"\n{Fore.GREEN}✓ Results saved to {args.bench_output}")
+        return
+    # The one-shot modes below only read the config: no config file is
+    # created and no log pipeline is started
+    if args.bench_input:
+        config = read_saved_config()
+        x = args.x if args.x is not None else config.click_x
+        y = args.y if args.y is not None else config.click_y
+        try:
+            results = run_input_benchmark(args.bench_input, x, y, burst=config.burst_size, config=config)
+            print_input_benchmark(results)
+        except (RuntimeError, OSError) as e:
+            print(f"{Fore.RED}Could not run input benchmark: {e}")
+            sys.exit(1)
+        return
+    if args.stats:
+        config = read_saved_config()
+        since = time.time() - args.stats_days * 86400 if args.stats_days else 0.0
+        print_history(SessionHistory(config.history_file).summary(since), args.stats_days)
+        return
+    if args.classify:
+        try:
+            print_classification(classify_images(read_saved_config(), args.classify))
+        except (RuntimeError, OSError, ValueError) as e:
+            print(f"{Fore.RED}Could not classify: {e}")
+            sys.exit(1)
+        return
+    if args.dry_run:
+        skipper = DialogueSkipper(replace(read_saved_config(), log_file="", event_log=False))
+        sys.exit(0 if skipper.dry_run() else 1)
+    if (args.x is None) != (args.y is None):
+        print(f"{Fore.RED}--x and --y must be given together")
+        sys.exit(2)
+    
     try:
         skipper = DialogueSkipper()
+        problems = skipper.apply_cli_overrides(args)
+        if problems:
+            for problem in problems:
+                print(f"{Fore.RED}Invalid option: {problem}")
+            sys.exit(2)
+        if args.profile:
+            skipper.enable_profiling(args.profile, max(1, args.profile_ticks))
+        if args.record:
+            sys.exit(skipper.record_macro(args.record))
+        if args.replay:
+            sys.exit(skipper.run_replay(args.replay, args.speed, args.loop, use_hotkeys=not args.no_hotkeys))
+        if args.start:
+            sys.exit(skipper.run_headless(use_hotkeys=not args.no_hotkeys))
         skipper.run()
     except Exception as e:
         print(f"{Fore.RED}Failed to initialize Dialogue Skipper: {e}")
         logging.error(f"Failed to initialize application: {e}")
-        input(f"{Fore.YELLOW}Press Enter to exit...")
+        if not (args.start or args.record or args.replay):
+            input(f"{Fore.YELLOW}Press Enter to exit...")
         sys.exit(1)
 
 if __name__ == "__main__":
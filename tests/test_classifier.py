@@ -0,0 +1,159 @@
+import os
+import threading
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from dialogue_skipper import (Config, DialogueClassifier, DialogueSkipper, EngineCommand, FixtureFrameSource,
+                              TemplateIndex, crop_region, parse_action)
+
+WIDTH, HEIGHT = 32, 24
+REGION = (0, 0, WIDTH, HEIGHT)
+
+
+def talking(offset: int = 0):
+    frame = np.full((HEIGHT, WIDTH, 3), 30, dtype=np.uint8)
+    frame[16:20] = 220  # subtitle line
+    return frame + np.uint8(offset)
+
+
+def choice():
+    frame = np.full((HEIGHT, WIDTH, 3), 30, dtype=np.uint8)
+    frame[4:20, 16:] = 180  # option boxes
+    return frame
+
+
+def loading():
+    return np.full((HEIGHT, WIDTH, 3), 200, dtype=np.uint8)
+
+
+@pytest.fixture
+def templates(tmp_path):
+    paths = {}
+    for label, frame in (("talking", talking()), ("choice", choice()), ("loading", loading())):
+        path = tmp_path / f"{label}.npy"
+        np.save(path, frame)
+        paths[label] = [str(path)]
+    return paths
+
+
+def make_classifier(templates, frames, threshold: float = 0.1):
+    index = TemplateIndex.build(templates, REGION)
+    return DialogueClassifier(FixtureFrameSource(frames), index, WIDTH, HEIGHT, threshold)
+
+
+def test_index_stacks_one_row_per_template(templates):
+    index = TemplateIndex.build(templates, REGION)
+    assert index.labels == ["talking", "choice", "loading"]
+    assert index.signatures.shape[0] == len(index) == 3
+
+
+def test_index_needs_templates():
+    with pytest.raises(ValueError):
+        TemplateIndex.build({}, REGION)
+
+
+def test_index_crops_full_screenshots(tmp_path):
+    screenshot = np.zeros((100, 200, 3), dtype=np.uint8)
+    screenshot[10:10 + HEIGHT, 20:20 + WIDTH] = loading()
+    assert np.array_equal(crop_region(screenshot, 20, 10, WIDTH, HEIGHT), loading())
+    with pytest.raises(ValueError):
+        crop_region(screenshot, 190, 90, WIDTH, HEIGHT)
+
+
+def test_index_cache_is_reused_until_a_template_changes(templates, tmp_path, monkeypatch):
+    cache = str(tmp_path / "index.npz")
+    built = TemplateIndex.load_or_build(templates, REGION, cache)
+    assert os.path.exists(cache)
+
+    def no_build(*args):
+        raise AssertionError("cache should have been used")
+
+    monkeypatch.setattr(TemplateIndex, "build", classmethod(no_build))
+    cached = TemplateIndex.load_or_build(templates, REGION, cache)
+    assert cached.labels == built.labels
+    assert np.array_equal(cached.signatures, built.signatures)
+    monkeypatch.undo()
+
+    path = templates["loading"][0]
+    np.save(path, loading() // 2)
+    os.utime(path, ns=(0, os.stat(cache).st_mtime_ns + 10**9))
+    rebuilt = TemplateIndex.load_or_build(templates, REGION, cache)
+    assert not np.array_equal(rebuilt.signatures, built.signatures)
+
+
+@pytest.mark.parametrize("frame, expected", [
+    (talking(), "talking"),
+    (choice(), "choice"),
+    (loading(), "loading"),
+])
+def test_classifies_each_template(templates, frame, expected):
+    state, distance = make_classifier(templates, [frame]).classify()
+    assert state == expected
+    assert distance == pytest.approx(0.0, abs=1e-6)
+
+
+@pytest.mark.parametrize("offset, expected", [
+    (25, "talking"),   # 25/255 = 0.098, just inside 0.1
+    (26, "unknown"),   # 26/255 = 0.102, just outside
+])
+def test_near_threshold(templates, offset, expected):
+    state, distance = make_classifier(templates, [talking(offset)]).classify()
+    assert state == expected
+    assert distance == pytest.approx(offset / 255, abs=1e-4)
+
+
+def test_unrelated_frame_is_unknown(templates):
+    frame = np.full((HEIGHT, WIDTH, 3), 110, dtype=np.uint8)
+    assert make_classifier(templates, [frame]).classify()[0] == DialogueClassifier.UNKNOWN
+
+
+def test_classifies_frame_sequence(templates):
+    classifier = make_classifier(templates, [talking(), loading(), choice(), talking(3)])
+    assert [classifier.classify()[0] for _ in range(4)] == ["talking", "loading", "choice", "talking"]
+
+
+@pytest.mark.parametrize("action, parsed", [
+    ("click", ("click", "")),
+    ("wait", ("wait", "")),
+    ("key:space", ("key", "space")),
+    ("choice:2", ("choice", "2")),
+])
+def test_parse_action(action, parsed):
+    assert parse_action(action) == parsed
+
+
+@pytest.mark.parametrize("action", ["skip", "key", "key:", "choice:0", "choice:x", 3])
+def test_parse_action_rejects(action):
+    with pytest.raises(ValueError):
+        parse_action(action)
+
+
+def run_classified_session(templates, tmp_path, frames):
+    config = Config(input_backend="recording", click_interval=0.01, coordinate_mode="absolute",
+                    classifier=True, classifier_templates=templates, classifier_width=WIDTH,
+                    classifier_height=HEIGHT, classifier_x=0, classifier_y=0, classifier_interval=0.01,
+                    classifier_cache=str(tmp_path / "index.npz"),
+                    classifier_actions={"talking": "click", "loading": "wait"},
+                    classifier_default_action="wait", session_history=False, log_file="")
+    skipper = DialogueSkipper(config)
+    skipper.frame_source = FixtureFrameSource(frames)
+    skipper.control.start()
+    worker = threading.Thread(target=skipper.click_loop)
+    worker.start()
+    time.sleep(0.2)
+    skipper.control.stop()
+    skipper.control.submit(EngineCommand.STOP)
+    worker.join(2.0)
+    return skipper
+
+
+def test_session_clicks_only_while_talking(templates, tmp_path):
+    talking_session = run_classified_session(templates, tmp_path, [talking()])
+    assert talking_session.last_session["clicks"] > 5
+    assert talking_session.dialogue_state == "talking"
+    loading_session = run_classified_session(templates, tmp_path, [loading()])
+    assert loading_session.last_session["clicks"] == 0
+    assert loading_session.last_session["gated_ticks"] > 5
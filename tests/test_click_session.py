@@ -0,0 +1,113 @@
+import pytest
+
+from dialogue_skipper import (ActionPicker, ClickCursor, ClickPlan, ClientArea, DialogueClassifier, GateCheck,
+                              GeometryWatch, RecordingBackend, SessionMetrics)
+
+
+class CallBackend(RecordingBackend):
+    def __init__(self):
+        super().__init__(clock=lambda: 0.0)
+        self.calls = []
+
+    def click(self, x, y):
+        self.calls.append((x, y, 1))
+
+    def click_burst(self, x, y, count):
+        self.calls.append((x, y, count))
+
+
+class ScriptedClassifier:
+    def __init__(self, states):
+        self.states = iter(states)
+        self.closed = False
+
+    def classify(self):
+        return next(self.states), 0.0
+
+    def close(self):
+        self.closed = True
+
+
+class ScriptedGate:
+    def __init__(self, results):
+        self.results = iter(results)
+
+    def matches(self):
+        return next(self.results)
+
+
+def test_cursor_fires_single_clicks_and_wraps():
+    cursor = ClickCursor(ClickPlan([(1, 1, 0.01), (2, 2, 0.01)]))
+    backend = CallBackend()
+    for _ in range(3):
+        cursor.fire(backend, 1)
+    assert backend.calls == [(1, 1, 1), (2, 2, 1), (1, 1, 1)]
+    assert cursor.position == (2, 2)
+
+
+def test_cursor_hands_runs_on_one_position_to_the_backend_as_bursts():
+    cursor = ClickCursor(ClickPlan([(1, 1, 0.01)] * 3 + [(2, 2, 0.01)]))
+    backend = CallBackend()
+    cursor.fire(backend, 6)
+    assert backend.calls == [(1, 1, 3), (2, 2, 1), (1, 1, 2)]
+    assert cursor.step == 2
+
+
+def test_cursor_load_keeps_the_position_within_the_cycle():
+    cursor = ClickCursor(ClickPlan([(1, 1, 0.01), (2, 2, 0.01), (3, 3, 0.01)]), burst=2)
+    cursor.fire(CallBackend(), 2)
+    cursor.load(ClickPlan([(5, 5, 0.02), (6, 6, 0.04)]))
+    assert cursor.position == (5, 5)
+    assert list(cursor.gaps) == pytest.approx([0.06, 0.06])
+
+
+def test_burst_clicks_stop_before_the_limit():
+    cursor = ClickCursor(ClickPlan([(1, 1, 0.05)]), burst=4)
+    assert cursor.burst_clicks(4, 1.0, 1.0) == 4
+    assert cursor.burst_clicks(4, 1.0, 0.1) == 2
+    assert cursor.burst_clicks(4, 2.0, 0.1) == 1
+
+
+def test_geometry_watch_only_reports_a_changed_plan_when_due():
+    areas = iter([ClientArea(0, 0, 1280, 720), None, ClientArea(0, 0, 1920, 1080)])
+    build = lambda area: ClickPlan.single(area.width // 2, area.height // 2, 0.1)
+    watch = GeometryWatch(lambda: next(areas), build, interval=1.0, now=0.0)
+    plan = ClickPlan.single(640, 360, 0.1)
+    assert watch.check(0.5, plan) is None
+    assert watch.check(1.0, plan) is None  # same area
+    assert watch.check(2.0, plan) is None  # window gone
+    moved = watch.check(3.0, plan)
+    assert moved is not None and list(moved[0].xs) == [960] and moved[1].width == 1920
+    assert watch.next_check == 4.0
+
+
+def test_gate_check_counts_held_back_ticks():
+    metrics = SessionMetrics(0.1)
+    gate = GateCheck(ScriptedGate([True, False]), metrics, clock=lambda: 1.5)
+    assert gate.open_at(1.0) == 1.5
+    assert gate.open_at(1.2) is None
+    assert metrics.gated_ticks.value == 1
+    assert metrics.gate_latency.count == 2
+
+
+def test_action_picker_classifies_on_its_interval_and_rate_limits_keys():
+    seen = []
+    actions = {DialogueClassifier.UNKNOWN: ("click", None), "dialogue": ("key", 57), "loading": ("wait", None)}
+    picker = ActionPicker(ScriptedClassifier(["dialogue", "loading", "unknown"]), actions, interval=1.0,
+                          cooldown=0.5, metrics=SessionMetrics(0.1), on_state=seen.append, clock=lambda: 0.0)
+    assert [picker.pick(now) for now in (0.0, 0.25, 0.5, 0.75)] == [
+        ("key", 57), ("cooldown", None), ("key", 57), ("cooldown", None)]
+    assert picker.pick(1.0) == ("wait", None)
+    assert picker.pick(2.0) == ("click", None)
+    assert seen == ["dialogue", "loading", "unknown"]
+    assert picker.state_counts == {"dialogue": 1, "loading": 1, "unknown": 1}
+
+
+def test_action_picker_retarget_classifies_on_the_next_tick():
+    actions = {DialogueClassifier.UNKNOWN: ("click", None), "choice": ("choice", (10, 20))}
+    picker = ActionPicker(ScriptedClassifier(["choice", "choice"]), actions, interval=10.0, cooldown=0.0,
+                          metrics=SessionMetrics(0.1), clock=lambda: 0.0)
+    assert picker.pick(0.0) == ("choice", (10, 20))
+    picker.retarget({DialogueClassifier.UNKNOWN: ("click", None), "choice": ("choice", (30, 40))})
+    assert picker.pick(1.0) == ("choice", (30, 40))
+    assert picker.state_counts == {"choice": 2}
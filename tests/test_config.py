@@ -0,0 +1,162 @@
+import json
+import logging
+
+import pytest
+
+import dialogue_skipper
+from dialogue_skipper import Config, DialogueSkipper, parse_args, read_saved_config, validate_config
+
+
+@pytest.mark.parametrize("interval, valid", [
+    (0.001, True),
+    (0.005, True),
+    (10, True),
+    (0.0005, False),
+    (0, False),
+    (-0.5, False),
+    (11, False),
+])
+def test_click_interval_range(interval, valid):
+    config, problems = validate_config({"click_interval": interval})
+    assert (not problems) is valid
+    assert config.click_interval == (interval if valid else Config.click_interval)
+
+
+@pytest.mark.parametrize("raw, problem", [
+    ({"monitor_profiles": {"1920x1080": "ab"}}, "monitor_profiles: '1920x1080' must be [rel_x, rel_y]"),
+    ({"monitor_profiles": {"1920x1080": [0.5]}}, "monitor_profiles: '1920x1080' must be [rel_x, rel_y]"),
+    ({"monitor_profiles": {"1920x1080": [0.5, 1.5]}}, "monitor_profiles: '1920x1080' must be [rel_x, rel_y]"),
+    ({"choice_positions": [[0.5, 0.7], "top"]}, "choice_positions: choice 2 must be [rel_x, rel_y]"),
+    ({"choice_positions": [[0.5, True]]}, "choice_positions: choice 1 must be [rel_x, rel_y]"),
+    ({"classifier_templates": {"dialogue": "a.png"}}, "classifier_templates: 'dialogue' must be a list"),
+    ({"classifier_templates": {"dialogue": [1]}}, "classifier_templates: 'dialogue' must be a list"),
+    ({"instances": ["left"]}, "instances: instance 1 must be an object"),
+    ({"instances": [{"name": "a", "click_interval": -1}]}, "instances: instance 1: click_interval must be positive"),
+    ({"instances": [{"instances": []}]}, "instances: instance 1 cannot have instances"),
+    ({"hotkey_debounce": -0.1}, "hotkey_debounce must not be negative"),
+    ({"adaptive_idle_interval": -1.0}, "adaptive_idle_interval must not be negative"),
+    ({"max_catch_up_ticks": -2}, "max_catch_up_ticks must not be negative"),
+    ({"click_rel_x": 1.2}, "click_rel_x must be between 0 and 1"),
+])
+def test_invalid_nested_values_are_rejected(raw, problem):
+    config, problems = validate_config(raw)
+    assert problems and problems[0].startswith(problem)
+    key = next(iter(raw))
+    assert getattr(config, key) == getattr(Config(), key)
+
+
+def test_valid_nested_values_are_kept():
+    raw = {
+        "monitor_profiles": {"1920x1080": [0.5, 0.8]},
+        "choice_positions": [[0.7, 0.6], [0.7, 0.66]],
+        "classifier_templates": {"dialogue": ["templates/dialogue.png"]},
+        "instances": [{"name": "left", "click_interval": 0.2}],
+        "adaptive_idle_interval": 0.0,
+    }
+    config, problems = validate_config(raw)
+    assert not problems
+    assert {key: getattr(config, key) for key in raw} == raw
+
+
+def make_skipper():
+    return DialogueSkipper(Config(log_file="", session_history=False))
+
+
+@pytest.mark.parametrize("argv, problem", [
+    (["--interval", "-0.5"], "click_interval must be positive"),
+    (["--interval", "0"], "click_interval must be positive"),
+    (["--interval", "0.0001"], "click_interval must be between"),
+    (["--duration", "0"], "auto_stop_time must be positive"),
+])
+def test_invalid_cli_overrides_are_rejected(argv, problem):
+    skipper = make_skipper()
+    problems = skipper.apply_cli_overrides(parse_args(["--start"] + argv))
+    assert len(problems) == 1 and problems[0].startswith(problem)
+    assert skipper.config == Config(log_file="", session_history=False)
+    assert not skipper.cli_overrides
+
+
+def test_cli_overrides_are_applied_and_kept():
+    skipper = make_skipper()
+    args = parse_args(["--start", "--x", "10", "--y", "20", "--interval", "0.02", "--duration", "5"])
+    assert skipper.apply_cli_overrides(args) == []
+    config = skipper.config
+    assert (config.click_x, config.click_y, config.coordinate_mode) == (10, 20, "absolute")
+    assert (config.click_interval, config.auto_stop_time) == (0.02, 5)
+    assert skipper.cli_overrides["click_interval"] == 0.02
+
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+    path = tmp_path / "config.json"
+    monkeypatch.setattr(dialogue_skipper, "CONFIG_FILE", str(path))
+    return path
+
+
+def saved(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def test_cli_overrides_are_not_saved(config_file):
+    skipper = make_skipper()
+    assert skipper.apply_cli_overrides(parse_args(["--interval", "0.005", "--x", "10", "--y", "20"])) == []
+    skipper.save_config(skipper.config)
+    data = saved(config_file)
+    assert data["click_interval"] == Config.click_interval
+    assert (data["click_x"], data["coordinate_mode"]) == (Config.click_x, Config.coordinate_mode)
+    assert skipper.config.click_interval == 0.005
+
+
+def test_menu_edit_of_an_overridden_setting_is_saved(config_file):
+    skipper = make_skipper()
+    skipper.apply_cli_overrides(parse_args(["--interval", "0.005", "--duration", "5"]))
+    skipper.config.click_interval = 0.02
+    skipper.save_config(skipper.config)
+    data = saved(config_file)
+    assert (data["click_interval"], data["auto_stop_time"]) == (0.02, Config.auto_stop_time)
+    assert "click_interval" not in skipper.cli_overrides
+
+
+def test_reloaded_file_value_is_kept_under_an_override(config_file):
+    skipper = make_skipper()
+    skipper.apply_cli_overrides(parse_args(["--interval", "0.005"]))
+    skipper.on_config_change(Config(click_interval=0.03, log_file="", session_history=False))
+    skipper.apply_commands()
+    assert skipper.config.click_interval == 0.005
+    skipper.save_config(skipper.config)
+    assert saved(config_file)["click_interval"] == 0.03
+
+
+def test_read_saved_config_falls_back_to_defaults(tmp_path):
+    assert read_saved_config(str(tmp_path / "missing.json")) == Config()
+    broken = tmp_path / "broken.json"
+    broken.write_text("{not json")
+    assert read_saved_config(str(broken)) == Config()
+    good = tmp_path / "good.json"
+    good.write_text(json.dumps({"click_interval": 0.02}))
+    assert read_saved_config(str(good)).click_interval == 0.02
+
+
+@pytest.fixture
+def fresh_logging(monkeypatch):
+    root = logging.getLogger()
+    monkeypatch.setattr(dialogue_skipper, "LOG_PIPELINE", None)
+    monkeypatch.setattr(root, "handlers", [])
+    return root
+
+
+def test_config_problems_are_logged_after_logging_is_set_up(config_file, fresh_logging, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config_file.write_text(json.dumps({"bogus": 1, "log_file": "", "event_log": False, "session_history": False}))
+    skipper = DialogueSkipper()
+    assert skipper.config_problems == ["Config: unknown setting 'bogus' ignored"]
+    assert not any(type(handler) is logging.StreamHandler for handler in fresh_logging.handlers)
+
+
+def test_missing_config_file_is_created_with_defaults(config_file, fresh_logging, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    skipper = DialogueSkipper()
+    assert skipper.config == Config()
+    assert saved(config_file)["click_interval"] == Config.click_interval
+    assert not skipper.config_problems
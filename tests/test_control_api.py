@@ -0,0 +1,118 @@
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+from dialogue_skipper import Config, DialogueSkipper
+
+
+class Client:
+    """Loopback JSON-lines client that skips pushed stats when awaiting a reply"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+
+    async def read(self):
+        return json.loads(await self.reader.readline())
+
+    async def send_line(self, line: bytes):
+        self.writer.write(line)
+        await self.writer.drain()
+
+    async def request(self, cmd: str, **fields):
+        self.next_id += 1
+        await self.send_line((json.dumps({"id": self.next_id, "cmd": cmd, **fields}) + "\n").encode())
+        while True:
+            message = await self.read()
+            if message.get("event") != "stats":
+                assert message.get("id") == self.next_id
+                return message
+
+
+@pytest.fixture(params=["tcp", "unix"])
+def skipper(request, tmp_path):
+    if request.param == "unix" and not hasattr(asyncio, "open_unix_connection"):
+        pytest.skip("Unix sockets are not available")
+    config = Config(input_backend="recording", click_interval=0.01, auto_stop_time=30,
+                    coordinate_mode="absolute", session_history=False, log_file="",
+                    control_api=True, control_port=0,
+                    control_socket=str(tmp_path / "api.sock") if request.param == "unix" else "")
+    skipper = DialogueSkipper(config)
+    skipper.start_engine()
+    skipper.start_control_api()
+    assert skipper.control_server is not None
+    yield skipper
+    skipper.stop_control_api()
+    skipper.stop_engine()
+    if config.control_socket:
+        assert not os.path.exists(config.control_socket)
+
+
+def run_client(skipper, scenario):
+    config = skipper.config
+
+    async def main():
+        if config.control_socket:
+            reader, writer = await asyncio.open_unix_connection(config.control_socket)
+        else:
+            reader, writer = await asyncio.open_connection(*skipper.control_server.address[:2])
+        try:
+            await scenario(Client(reader, writer))
+        finally:
+            writer.close()
+
+    asyncio.run(asyncio.wait_for(main(), 10))
+
+
+def test_status_and_errors(skipper):
+    async def scenario(client):
+        status = await client.request("status")
+        assert status["ok"] and status["state"] == "ready" and status["clicks"] == 0
+        reply = await client.request("bogus")
+        assert reply == {"ok": False, "error": "unknown command 'bogus'", "id": 2}
+        await client.send_line(b"not json\n")
+        reply = await client.read()
+        assert not reply["ok"] and reply["error"].startswith("bad request")
+        await client.send_line(b"[1, 2]\n")
+        assert not (await client.read())["ok"]
+        assert not (await client.request("set"))["ok"]
+        reply = await client.request("set", interval=-1)
+        assert not reply["ok"] and "click_interval" in reply["error"]
+
+    run_client(skipper, scenario)
+
+
+def test_session_lifecycle_with_pushed_stats(skipper):
+    async def scenario(client):
+        assert (await client.request("subscribe", rate=20))["ok"]
+        assert (await client.request("start"))["ok"]
+        started = time.perf_counter()
+        pushes = []
+        while time.perf_counter() - started < 0.3:
+            message = await client.read()
+            if message.get("event") == "stats":
+                pushes.append(message)
+        assert 3 <= len(pushes) <= 8
+        assert pushes[-1]["state"] == "running" and pushes[-1]["clicks"] > 0
+
+        assert (await client.request("set", interval=0.02, target=[100, 200]))["ok"]
+        await asyncio.sleep(0.1)
+        assert (await client.request("pause"))["ok"]
+        await asyncio.sleep(0.05)
+        assert (await client.request("unsubscribe"))["ok"]
+        status = await client.request("status")
+        assert status["state"] == "paused"
+        assert status["position"] == [100, 200]
+        assert status["target_rate"] == 50.0
+
+        assert (await client.request("stop"))["ok"]
+        await asyncio.sleep(0.2)
+        status = await client.request("status")
+        assert status["state"] == "ready"
+        assert status["last_session"]["clicks"] > 0
+
+    run_client(skipper, scenario)
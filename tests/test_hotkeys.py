@@ -0,0 +1,156 @@
+import time
+
+import pytest
+
+from dialogue_skipper import (Config, DialogueSkipper, EngineCommand, HotkeyDispatcher, SessionState,
+                              SyntheticKeySource, parse_hotkey)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def fired():
+    return []
+
+
+@pytest.fixture
+def keys(clock, fired):
+    dispatcher = HotkeyDispatcher(fired.append, debounce=0.25, clock=clock)
+    assert dispatcher.rebind([("f6", "start_stop"), ("ctrl+shift+f6", "other"), ("F7", "pause")]) == []
+    source = SyntheticKeySource(clock=clock)
+    dispatcher.install(source)
+    return source
+
+
+@pytest.mark.parametrize("text, chord", [
+    ("f6", ("f6", 0)),
+    ("Ctrl+Shift+F6", ("f6", 3)),
+    ("control+alt gr+x", ("x", 5)),
+    ("win + f9", ("f9", 8)),
+])
+def test_parse_hotkey(text, chord):
+    assert parse_hotkey(text) == chord
+
+
+@pytest.mark.parametrize("text", ["", "ctrl+", "hyper+f6", "ctrl+shift", "+f6"])
+def test_parse_hotkey_rejects(text):
+    with pytest.raises(ValueError):
+        parse_hotkey(text)
+
+
+def test_plain_key_fires_once(keys, fired):
+    keys.tap("f6")
+    keys.tap("a")
+    assert fired == ["start_stop"]
+
+
+def test_chords_need_exact_modifiers(keys, clock, fired):
+    keys.tap("ctrl+shift+f6")
+    clock.now += 1
+    keys.tap("shift+f6")  # no binding for shift alone
+    clock.now += 1
+    keys.tap("right ctrl+left shift+f6")
+    clock.now += 1
+    keys.tap("f6")
+    assert fired == ["other", "other", "start_stop"]
+
+
+def test_auto_repeat_fires_once(keys, fired):
+    keys.tap("f6", repeats=30)
+    assert fired == ["start_stop"]
+
+
+def test_held_key_counts_as_released_after_repeat_window(keys, clock, fired):
+    keys.press("f7")
+    clock.now += HotkeyDispatcher.REPEAT_WINDOW + 0.1
+    keys.press("f7")  # the up event was lost
+    assert fired == ["pause", "pause"]
+
+
+def test_debounce(keys, clock, fired):
+    keys.tap("f6")
+    clock.now += 0.1
+    keys.tap("f6")
+    assert fired == ["start_stop"]
+    clock.now += 0.2
+    keys.tap("f6")
+    assert fired == ["start_stop", "start_stop"]
+
+
+def test_debounce_is_per_command(keys, fired):
+    keys.tap("f6")
+    keys.tap("f7")
+    assert fired == ["start_stop", "pause"]
+
+
+def test_rebind_replaces_bindings_and_reports_problems(clock, fired):
+    dispatcher = HotkeyDispatcher(fired.append, clock=clock)
+    problems = dispatcher.rebind([("ctrl+f9", "start_stop"), ("ctrl+", "pause"), ("control+f9", "other")])
+    assert len(problems) == 2
+    assert dispatcher.bindings == {("f9", 1): "start_stop"}
+
+
+def test_bind_rejects_conflicts(clock, fired):
+    dispatcher = HotkeyDispatcher(fired.append, clock=clock)
+    dispatcher.bind("f6", "start_stop")
+    dispatcher.bind("F6", "start_stop")
+    with pytest.raises(ValueError):
+        dispatcher.bind("f6", "pause")
+
+
+def test_uninstall_unhooks(fired):
+    dispatcher = HotkeyDispatcher(fired.append)
+    source = SyntheticKeySource()
+    dispatcher.install(source)
+    dispatcher.uninstall()
+    assert source.callbacks == []
+
+
+def wait_for_state(control, state, timeout: float = 2.0) -> bool:
+    deadline = time.perf_counter() + timeout
+    while control.state != state:
+        if time.perf_counter() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def test_hotkeys_drive_the_engine():
+    config = Config(input_backend="recording", click_interval=0.01, auto_stop_time=30,
+                    coordinate_mode="absolute", session_history=False, log_file="", hotkey_debounce=0.05)
+    skipper = DialogueSkipper(config)
+    source = SyntheticKeySource()
+    skipper.start_engine()
+    skipper.setup_hotkeys(source)
+    control = skipper.control
+    try:
+        source.tap(config.start_stop_key, repeats=20)
+        assert wait_for_state(control, SessionState.RUNNING)
+        source.tap(config.pause_key, repeats=5)
+        assert wait_for_state(control, SessionState.PAUSED)
+        time.sleep(0.1)
+        source.tap(config.pause_key)
+        assert wait_for_state(control, SessionState.RUNNING)
+        time.sleep(0.1)
+        source.tap(config.start_stop_key)
+        assert control.wait_for_finish(1, 2.0)
+        assert control.finished_sessions == 1
+        assert control.pause_count == 1
+
+        skipper.apply_config(Config(**{**vars(config), "start_stop_key": "ctrl+f9"}))
+        assert skipper.hotkeys.bindings[("f9", 1)] == EngineCommand.START_STOP
+    finally:
+        skipper.stop_engine()
+        skipper.remove_hotkeys()
+    assert source.callbacks == []
@@ -0,0 +1,140 @@
+import threading
+import time
+
+import pytest
+
+from dialogue_skipper import ClickPlan, Config, DialogueSkipper, InstanceSession, MultiClickEngine, RecordingBackend
+
+
+class FakeClock:
+    """Clock that jumps to each requested wake-up instead of sleeping"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.interrupt_at = None
+
+    def __call__(self) -> float:
+        return self.now
+
+    def wait(self, timeout: float) -> bool:
+        if self.interrupt_at is not None and self.now + timeout >= self.interrupt_at:
+            self.now, self.interrupt_at = self.interrupt_at, None
+            return True
+        self.now += timeout
+        return False
+
+
+class FailingBackend(RecordingBackend):
+    def __init__(self, clock, fail_after: int):
+        super().__init__(clock)
+        self.fail_after = fail_after
+
+    def click(self, x, y):
+        if self.click_count == self.fail_after:
+            raise RuntimeError("window closed")
+        super().click(x, y)
+
+
+def make_engine(clock, specs):
+    """Engine over (name, x, interval, auto_stop) specs, all clicking into one backend"""
+    backend = RecordingBackend(clock)
+    sessions = [InstanceSession(name, ClickPlan.single(x, 0, interval), backend, auto_stop)
+                for name, x, interval, auto_stop in specs]
+    return MultiClickEngine(sessions, clock=clock, wait=clock.wait), backend
+
+
+def clicks_by_x(backend):
+    times, xs = backend.timestamps, backend.positions[::2]
+    return {x: [t for t, at in zip(times, xs) if at == x] for x in sorted(set(xs))}
+
+
+def assert_heap_ordered(heap):
+    for i in range(1, len(heap)):
+        assert heap[(i - 1) // 2] <= heap[i]
+
+
+def test_deadlines_interleave_across_intervals():
+    clock = FakeClock()
+    engine, backend = make_engine(clock, [("a", 1, 0.125, 1.0), ("b", 2, 0.25, 1.0)])
+    engine.start()
+    assert engine.run() is True
+    assert list(backend.timestamps) == sorted(backend.timestamps)
+    assert clicks_by_x(backend) == {1: [i * 0.125 for i in range(8)], 2: [0.0, 0.25, 0.5, 0.75]}
+    assert engine.clicks == 12
+    # One sleep per distinct deadline; the last one finds both sessions at their limit
+    assert engine.wakeups == 8
+
+
+def test_each_session_stops_at_its_own_limit():
+    clock = FakeClock()
+    engine, backend = make_engine(clock, [("short", 1, 0.125, 0.5), ("long", 2, 0.125, 1.0)])
+    engine.start()
+    assert [session.stop_at for session in engine.sessions] == [0.5, 1.0]
+    assert engine.run() is True
+    assert [session.clicks for session in engine.sessions] == [4, 8]
+    assert max(clicks_by_x(backend)[1]) == 0.375
+    assert all(session.done for session in engine.sessions)
+
+
+@pytest.mark.parametrize("stop_times, expected", [
+    (True, [0.0, 0.125, 0.25, 1.375, 1.5, 1.625, 1.75, 1.875]),
+    # Without moving the limits, the pause used up the rest of the budget
+    (False, [0.0, 0.125, 0.25]),
+])
+def test_shift_moves_every_deadline_and_keeps_the_heap_ordered(stop_times, expected):
+    clock = FakeClock()
+    engine, backend = make_engine(clock, [("a", 1, 0.125, 1.0), ("b", 2, 0.25, 1.0), ("c", 3, 0.5, 0.25)])
+    engine.start()
+    clock.interrupt_at = 0.3
+    assert engine.run() is False
+    before = sorted(engine.heap)
+    engine.shift(1.0, stop_times=stop_times)
+    assert_heap_ordered(engine.heap)
+    assert sorted(engine.heap) == [(deadline + 1.0, index) for deadline, index in before]
+    clock.now += 1.0
+    assert engine.run() is True
+    assert clicks_by_x(backend)[1] == expected
+
+
+def test_failing_backend_ends_only_its_own_session():
+    clock = FakeClock()
+    good = RecordingBackend(clock)
+    bad = FailingBackend(clock, fail_after=2)
+    sessions = [InstanceSession("good", ClickPlan.single(1, 0, 0.125), good, 1.0),
+                InstanceSession("bad", ClickPlan.single(2, 0, 0.125), bad, 1.0)]
+    engine = MultiClickEngine(sessions, clock=clock, wait=clock.wait)
+    engine.start()
+    assert engine.run() is True
+    assert (sessions[0].clicks, sessions[0].error) == (8, "")
+    assert (sessions[1].clicks, sessions[1].error) == (2, "window closed")
+    assert sessions[1].done
+
+
+def test_expire_ends_sessions_past_their_limit_while_paused():
+    clock = FakeClock()
+    engine, _ = make_engine(clock, [("a", 1, 0.125, 0.5), ("b", 2, 0.125, 2.0), ("c", 3, 0.125, 1.0)])
+    engine.start()
+    assert engine.next_stop == 0.5
+    assert engine.expire(0.75) is True
+    assert [session.done for session in engine.sessions] == [True, False, False]
+    assert_heap_ordered(engine.heap)
+    assert engine.next_stop == 1.0
+    assert engine.expire(2.0) is False
+    assert not engine.running
+
+
+def test_paused_instances_still_auto_stop():
+    config = Config(input_backend="null", coordinate_mode="absolute", auto_stop_time=1,
+                    instances=[{"name": "a"}, {"name": "b", "click_interval": 0.05}],
+                    session_history=False, log_file="")
+    skipper = DialogueSkipper(config)
+    skipper.control.start()
+    skipper.control.pause()
+    worker = threading.Thread(target=skipper.multi_click_loop, daemon=True)
+    started = time.perf_counter()
+    worker.start()
+    worker.join(3.0)
+    assert not worker.is_alive()
+    assert skipper.stop_reason == "auto_stop"
+    assert 0.9 < time.perf_counter() - started < 2.0
+    assert all(session.done for session in skipper.multi_engine.sessions)
@@ -0,0 +1,20 @@
+import pytest
+
+from dialogue_skipper import POWER_MODES, ClickPlan, run_benchmark
+
+
+def test_burst_delays_cover_the_whole_burst():
+    plan = ClickPlan([(1, 1, 0.01), (2, 2, 0.03), (3, 3, 0.01)])
+    assert list(plan.burst_delays(1)) == list(plan.delays)
+    assert list(plan.burst_delays(2)) == pytest.approx([0.04, 0.04, 0.02])
+    assert list(plan.burst_delays(3)) == pytest.approx([0.05] * 3)
+
+
+@pytest.mark.parametrize("interval, expected", [
+    (0.05, 4),  # normal mode fires at 0, 0.05, 0.1 and 0.15
+    (0.1, 2),
+])
+def test_low_power_bursts_stop_at_the_auto_stop_limit(interval, expected):
+    report = run_benchmark(intervals=(interval,), duration=0.2, output=None, power_modes=POWER_MODES)
+    clicks = {result["power_mode"]: result["clicks"] for result in report["results"]}
+    assert clicks == {"normal": expected, "low_power": expected}
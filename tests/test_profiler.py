@@ -0,0 +1,79 @@
+import json
+import threading
+
+import pytest
+
+from dialogue_skipper import Profiler, SpanRing, TickRing
+
+
+def tick(n):
+    """Synthetic tick n: deadline n, waited from n - 0.5, woke n + 0.01 * n, done 1ms later"""
+    return (float(n), n - 0.5, n + 0.01 * n, n + 0.01 * n + 0.001, 1, n % 4)
+
+
+def test_tick_ring_keeps_the_newest_records_oldest_first():
+    ring = TickRing(3)
+    for n in range(2):
+        ring.record(*tick(n))
+    assert len(ring) == 2
+    assert ring.records() == [tick(0), tick(1)]
+    for n in range(2, 5):
+        ring.record(*tick(n))
+    assert (len(ring), ring.count) == (3, 5)
+    assert ring.records() == [tick(2), tick(3), tick(4)]
+
+
+def test_span_ring_wraps_and_remembers_the_recording_thread():
+    ring = SpanRing(2)
+    assert ring.spans() == []
+    for n in range(3):
+        ring.record(n, n + 0.5)
+    assert ring.spans() == [(1, 1.5), (2, 2.5)]
+    assert ring.thread == threading.get_ident()
+
+
+def make_profiler(ticks):
+    profiler = Profiler(ticks=10)
+    profiler.origin = 0.0
+    profiler.engine_thread = 7
+    for n in ticks:
+        profiler.ticks.record(*tick(n))
+    return profiler
+
+
+def test_chrome_trace_events():
+    profiler = make_profiler([1, 2])
+    profiler.spans["hotkey"].record(1.25, 1.5)
+    trace = profiler.chrome_trace()
+    assert trace["displayTimeUnit"] == "ms"
+    events = trace["traceEvents"]
+    assert events[0] == {"name": "thread_name", "ph": "M", "pid": 1, "tid": 7, "args": {"name": "click-engine"}}
+    sleep, dispatch = events[3], events[4]
+    assert sleep == {"name": "sleep", "ph": "X", "pid": 1, "tid": 7, "ts": 1500000.0, "dur": 520000.0}
+    assert dispatch == {"name": "click dispatch", "ph": "X", "pid": 1, "tid": 7, "ts": 2020000.0, "dur": 1000.0,
+                        "args": {"late_ms": 20.0, "due": 1, "step": 2}}
+    assert events[-1] == {"name": "hotkey", "ph": "X", "pid": 1, "tid": threading.get_ident(),
+                          "ts": 1250000.0, "dur": 250000.0}
+    assert [event["name"] for event in events] == [
+        "thread_name", "sleep", "click dispatch", "sleep", "click dispatch", "hotkey"]
+
+
+def test_slowest_ticks_are_the_latest_wake_ups():
+    profiler = make_profiler([3, 9, 1, 5])
+    slowest = profiler.slowest_ticks(2)
+    assert slowest == [(pytest.approx(9.09), pytest.approx(0.09)), (pytest.approx(5.05), pytest.approx(0.05))]
+    assert len(profiler.slowest_ticks()) == 4
+
+
+def test_begin_clears_the_rings_and_write_dumps_both_files(tmp_path):
+    profiler = make_profiler([1, 2])
+    profiler.path = str(tmp_path / "profile")
+    profiler.spans["status render"].record(0.0, 1.0)
+    profiler.begin()
+    profiler.end()
+    assert len(profiler.ticks) == 0 and profiler.spans["status render"].spans() == []
+    assert profiler.engine_thread == threading.get_ident()
+    trace_path, stats_path = profiler.write()
+    with open(trace_path) as f:
+        assert [event["ph"] for event in json.load(f)["traceEvents"]] == ["M"]
+    assert (tmp_path / "profile.prof").exists() and stats_path.endswith(".prof")
@@ -0,0 +1,72 @@
+import pytest
+
+from dialogue_skipper import RateController
+
+
+def make_controller(changes, idle_interval=0.5):
+    """Controller whose probe reports the scripted changes, priming read first"""
+    script = iter([False] + list(changes))
+    controller = RateController(lambda: next(script), min_interval=0.01, base_interval=0.08,
+                                idle_interval=idle_interval, idle_after=0.5, ramp=2.0, check_interval=0.25)
+    controller.start(0.0)
+    return controller
+
+
+def run(controller, times):
+    steps = []
+    for now in times:
+        changed = controller.update(now)
+        steps.append((changed, controller.interval, controller.idle))
+    return steps
+
+
+def test_changes_ramp_down_to_the_minimum_and_back_up():
+    controller = make_controller([True, True, True, True, False])
+    steps = run(controller, [0.25, 0.5, 0.75, 1.0, 1.25])
+    assert [interval for _, interval, _ in steps] == pytest.approx([0.04, 0.02, 0.01, 0.01, 0.02])
+    assert [changed for changed, _, _ in steps] == [True, True, True, False, True]
+    assert controller.changes == 4
+
+
+def test_update_only_probes_when_a_check_is_due():
+    controller = make_controller([True])
+    assert controller.update(0.1) is False
+    assert controller.interval == 0.08
+    assert controller.update(0.25) is True
+    assert controller.next_check == 0.5
+
+
+def test_idle_after_no_change_then_back_to_the_last_active_interval():
+    controller = make_controller([True, True, False, False, False, True])
+    steps = run(controller, [0.25, 0.5, 0.75, 1.0, 1.25])
+    assert steps[2] == (True, pytest.approx(0.04), False)
+    # 0.5s since the last change at 0.5
+    assert steps[3] == (True, pytest.approx(0.04), True)
+    assert steps[4] == (False, pytest.approx(0.04), True)
+    assert controller.gap_scale(0.02) == pytest.approx(0.25 / 0.02)
+    assert run(controller, [1.5]) == [(True, pytest.approx(0.04), False)]
+    assert controller.gap_scale(0.02) == pytest.approx(2.0)
+    assert (controller.idle_time, controller.idle_periods) == (0.5, 1)
+
+
+def test_finish_counts_an_open_idle_period():
+    controller = make_controller([False, False])
+    run(controller, [0.25, 0.5])
+    assert controller.idle
+    controller.finish(2.0)
+    assert controller.idle_time == 1.5
+
+
+def test_idle_ticks_click_once_per_idle_interval():
+    controller = make_controller([False, False])
+    assert controller.allows_click(0.1)
+    run(controller, [0.25, 0.5])
+    assert [controller.allows_click(now) for now in (0.5, 0.75, 1.0, 1.25)] == [True, False, True, False]
+
+
+def test_zero_idle_interval_stops_clicking_while_idle():
+    controller = make_controller([False, False, True], idle_interval=0.0)
+    run(controller, [0.25, 0.5])
+    assert not any(controller.allows_click(now) for now in (0.5, 0.75, 10.0))
+    run(controller, [0.75])
+    assert controller.allows_click(0.75)
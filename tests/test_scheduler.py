@@ -0,0 +1,139 @@
+from typing import Dict
+
+import pytest
+
+from dialogue_skipper import ClickScheduler
+
+
+class FakeClock:
+    """Deterministic clock for driving ClickScheduler without real sleeps"""
+
+    def __init__(self, start: float = 0.0, sleep_overshoot: float = 0.0):
+        self.now = start
+        self.sleep_overshoot = sleep_overshoot
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += max(0.0, seconds) + self.sleep_overshoot
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+def check_scheduler_accuracy(interval: float, ticks: int = 1000, click_cost: float = 0.0,
+                             sleep_overshoot: float = 0.0, policy: str = "skip") -> Dict[str, float]:
+    """Run the scheduler against a FakeClock and report achieved vs. target rate"""
+    clock = FakeClock(sleep_overshoot=sleep_overshoot)
+    scheduler = ClickScheduler(interval, policy=policy, clock=clock, sleep=clock.sleep)
+    scheduler.start()
+    fired = 0
+    while fired < ticks:
+        for _ in range(scheduler.wait()):
+            clock.advance(click_cost)
+            fired += 1
+    achieved = scheduler.achieved_rate()
+    return {
+        "target_rate": scheduler.target_rate,
+        "achieved_rate": achieved,
+        "error_pct": abs(achieved - scheduler.target_rate) / scheduler.target_rate * 100,
+        "missed_ticks": scheduler.missed_ticks,
+    }
+
+
+def make_scheduler(interval: float = 0.125, **kwargs):
+    clock = FakeClock()
+    scheduler = ClickScheduler(interval, clock=clock, sleep=clock.sleep, **kwargs)
+    scheduler.start()
+    return clock, scheduler
+
+
+def test_click_cost_does_not_drift_the_grid():
+    clock, scheduler = make_scheduler()
+    fired_at = []
+    for _ in range(8):
+        assert scheduler.wait() == 1
+        fired_at.append(clock.now)
+        clock.advance(0.03125)
+    assert fired_at == [n * 0.125 for n in range(8)]
+    assert scheduler.missed_ticks == 0
+
+
+@pytest.mark.parametrize("click_cost, sleep_overshoot", [
+    (0.0, 0.0),
+    (0.004, 0.0),
+    (0.004, 0.0015),
+])
+def test_achieved_rate_matches_target(click_cost, sleep_overshoot):
+    result = check_scheduler_accuracy(0.01, click_cost=click_cost, sleep_overshoot=sleep_overshoot)
+    assert result["error_pct"] < 0.5
+    assert result["missed_ticks"] == 0
+
+
+def test_skip_drops_missed_ticks():
+    clock, scheduler = make_scheduler(policy="skip")
+    scheduler.wait()
+    clock.advance(0.4375)  # stalls past the deadlines at 0.125, 0.25 and 0.375
+    assert scheduler.wait() == 1
+    assert scheduler.missed_ticks == 2
+    assert scheduler.next_deadline == 0.5
+
+
+def test_catch_up_fires_missed_ticks():
+    clock, scheduler = make_scheduler(policy="catch_up")
+    scheduler.wait()
+    clock.advance(0.4375)
+    assert scheduler.wait() == 3
+    assert scheduler.missed_ticks == 0
+    assert scheduler.ticks == 4
+
+
+def test_catch_up_is_bounded():
+    clock, scheduler = make_scheduler(policy="catch_up", max_catch_up=1)
+    scheduler.wait()
+    clock.advance(0.4375)
+    assert scheduler.wait() == 2
+    assert scheduler.missed_ticks == 1
+
+
+@pytest.mark.parametrize("policy, expected_ticks, expected_missed", [
+    ("skip", 14, 3),
+    ("catch_up", 17, 0),
+])
+def test_single_stall_recovery(policy, expected_ticks, expected_missed):
+    clock, scheduler = make_scheduler(policy=policy)
+    while clock.now < 2.0:
+        scheduler.wait()
+        if scheduler.ticks == 4:
+            clock.advance(0.5625)  # one click stalls for 4.5 intervals
+    assert scheduler.ticks == expected_ticks
+    assert scheduler.missed_ticks == expected_missed
+
+
+def test_interval_override_moves_next_deadline():
+    clock, scheduler = make_scheduler()
+    scheduler.wait(0.5)
+    assert scheduler.next_deadline == 0.5
+    scheduler.wait()
+    assert clock.now == 0.5
+
+
+def test_rejects_bad_arguments():
+    with pytest.raises(ValueError):
+        ClickScheduler(0)
+    with pytest.raises(ValueError):
+        ClickScheduler(0.01, policy="sometimes")
+
+
+def test_interrupted_sleep_reports_no_ticks():
+    clock = FakeClock()
+    scheduler = ClickScheduler(0.5, clock=clock, sleep=lambda seconds: clock.advance(seconds / 2))
+    scheduler.start()
+    assert scheduler.wait() == 1
+    assert scheduler.wait() == 0  # woken at 0.25 by a command
+    assert scheduler.next_deadline == 0.5
+    assert scheduler.wait() == 0
+    clock.advance(0.125)
+    assert scheduler.wait() == 1
+    assert scheduler.ticks == 2
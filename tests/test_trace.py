@@ -0,0 +1,118 @@
+import time
+
+import pytest
+
+from dialogue_skipper import (TRACE_CLICK, TRACE_HEADER, TRACE_KEY, ClientArea, Config, DialogueSkipper, Trace,
+                              TraceRecorder)
+
+AREA = ClientArea(100, 50, 1280, 720)
+
+
+class StepClock:
+    def __init__(self):
+        self.now = 10.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def record(path, events, area=AREA):
+    """Save a trace of (offset, "click", x, y) / (offset, "key", code) events"""
+    clock = StepClock()
+    recorder = TraceRecorder(area, clock=clock)
+    recorder.start()
+    for offset, kind, *args in events:
+        clock.now = 10.0 + offset
+        getattr(recorder, kind)(*args)
+    recorder.save(str(path))
+    return recorder
+
+
+EVENTS = [(0.0, "click", 10, 20), (0.05, "key", 57), (0.1, "click", 30, 40)]
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = tmp_path / "macro.dskt"
+    recorder = record(path, EVENTS)
+    trace = Trace(str(path))
+    try:
+        assert (len(trace), trace.created, trace.area) == (3, recorder.created, AREA)
+        assert trace.duration == pytest.approx(0.1)
+        assert list(trace.times) == pytest.approx([0.0, 0.05, 0.1])
+        assert list(trace.xs) == [10, 0, 30]
+        assert list(trace.ys) == [20, 0, 40]
+        assert list(trace.codes) == [0, 57, 0]
+        assert list(trace.kinds) == [TRACE_CLICK, TRACE_KEY, TRACE_CLICK]
+    finally:
+        trace.close()
+
+
+def test_empty_trace_round_trip(tmp_path):
+    path = tmp_path / "empty.dskt"
+    record(path, [], area=None)
+    assert path.stat().st_size == TRACE_HEADER.size
+    trace = Trace(str(path))
+    try:
+        assert (len(trace), trace.duration, trace.area) == (0, 0.0, None)
+        assert len(trace.times) == len(trace.kinds) == 0
+    finally:
+        trace.close()
+
+
+def test_truncated_trace_is_rejected(tmp_path):
+    path = tmp_path / "macro.dskt"
+    record(path, EVENTS)
+    data = path.read_bytes()
+    path.write_bytes(data[:-1])
+    with pytest.raises(ValueError, match="truncated"):
+        Trace(str(path))
+    path.write_bytes(data[:TRACE_HEADER.size - 4])
+    with pytest.raises(ValueError, match="not a macro trace"):
+        Trace(str(path))
+
+
+def test_wrong_magic_is_rejected(tmp_path):
+    path = tmp_path / "macro.dskt"
+    record(path, EVENTS)
+    path.write_bytes(b"XXXX" + path.read_bytes()[4:])
+    with pytest.raises(ValueError, match="not a version 1 macro trace"):
+        Trace(str(path))
+
+
+def replay(path, speed, loops):
+    skipper = DialogueSkipper(Config(input_backend="recording", session_history=False, log_file=""))
+    trace = Trace(str(path))
+    skipper.control.start()
+    try:
+        skipper.replay_loop(trace, speed=speed, loops=loops)
+    finally:
+        trace.close()
+    return skipper
+
+
+@pytest.mark.parametrize("speed, loops, expected", [
+    (1.0, 1, [0.0, 0.1]),
+    # Loops follow each other after one average gap, 0.05s at 1x
+    (2.0, 2, [0.0, 0.05, 0.075, 0.125]),
+    (0.5, 1, [0.0, 0.2]),
+])
+def test_replay_follows_the_recorded_timing(tmp_path, speed, loops, expected):
+    path = tmp_path / "macro.dskt"
+    record(path, EVENTS)
+    skipper = replay(path, speed, loops)
+    backend = skipper.backend
+    offsets = [t - skipper.start_time for t in backend.timestamps]
+    assert offsets == pytest.approx(expected, abs=0.015)
+    assert list(backend.positions) == [10, 20, 30, 40] * loops
+    assert list(backend.keys) == [57] * loops
+    stats = skipper.last_session
+    assert (stats["stop_reason"], stats["loops"], stats["keys"]) == ("complete", loops, loops)
+    assert abs(stats["drift"]) < 0.015
+
+
+def test_replay_of_an_empty_trace_does_nothing(tmp_path):
+    path = tmp_path / "empty.dskt"
+    record(path, [])
+    skipper = replay(path, 1.0, 1)
+    assert skipper.backend is None
+    assert not skipper.control.is_active
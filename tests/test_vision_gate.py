@@ -0,0 +1,75 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from dialogue_skipper import FixtureFrameSource, RegionSignature, VisionGate
+
+WIDTH, HEIGHT = 32, 24
+
+
+def gray(value: int, width: int = WIDTH, height: int = HEIGHT):
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+def make_gate(frames, reference_value: int = 100, threshold: float = 0.08):
+    reference = VisionGate.reference_from_frame(gray(reference_value), WIDTH, HEIGHT)
+    return VisionGate(FixtureFrameSource(frames), reference, WIDTH, HEIGHT, threshold=threshold)
+
+
+def test_fixture_source_cycles_frames():
+    frames = [gray(0), gray(1), gray(2)]
+    source = FixtureFrameSource(frames)
+    assert [int(source.grab()[0, 0, 0]) for _ in range(5)] == [0, 1, 2, 0, 1]
+
+
+def test_fixture_source_loads_npy(tmp_path):
+    path = tmp_path / "frame.npy"
+    np.save(path, gray(42))
+    source = FixtureFrameSource([str(path), gray(7)])
+    assert source.grab().shape == (HEIGHT, WIDTH, 3)
+    assert int(source.grab()[0, 0, 0]) == 7
+    assert int(source.grab()[0, 0, 0]) == 42
+
+
+def test_signature_is_in_unit_range():
+    signature = RegionSignature(WIDTH, HEIGHT)
+    assert float(signature.compute(gray(0)).max()) == 0.0
+    assert float(signature.compute(gray(255)).min()) == pytest.approx(1.0)
+    assert float(signature.compute(gray(51)).mean()) == pytest.approx(0.2)
+
+
+def test_signature_accepts_grayscale_and_bgra():
+    signature = RegionSignature(WIDTH, HEIGHT)
+    rgb = signature.compute(gray(80)).copy()
+    assert np.allclose(signature.compute(np.full((HEIGHT, WIDTH), 80, dtype=np.uint8)), rgb)
+    assert np.allclose(signature.compute(np.full((HEIGHT, WIDTH, 4), 80, dtype=np.uint8)), rgb)
+
+
+def test_gate_matches_reference_frame():
+    gate = make_gate([gray(100)])
+    assert gate.difference() == 0.0
+    assert gate.matches()
+
+
+@pytest.mark.parametrize("value, expected", [
+    (120, True),   # 20/255 = 0.078, just inside 0.08
+    (121, False),  # 21/255 = 0.082, just outside
+    (80, True),
+    (79, False),
+])
+def test_gate_near_threshold(value, expected):
+    assert make_gate([gray(value)]).matches() is expected
+
+
+def test_gate_follows_frame_sequence():
+    gate = make_gate([gray(100), gray(200), gray(105)])
+    assert [gate.matches() for _ in range(3)] == [True, False, True]
+
+
+def test_gate_detects_local_change():
+    frame = gray(100)
+    frame[:, : WIDTH // 2] = 255  # half the region changes
+    gate = make_gate([frame])
+    assert gate.difference() == pytest.approx(155 / 255 / 2, abs=1e-3)
+    assert not gate.matches()
+    assert make_gate([frame], threshold=0.35).matches()
@@ -0,0 +1,155 @@
+import dataclasses
+import time
+
+import pytest
+
+import dialogue_skipper
+from dialogue_skipper import (ClientArea, Config, DialogueSkipper, EngineCommand, FakeWindowManager,
+                              SessionState, WindowBackend, WindowTarget)
+
+TITLE = Config.game_window_title
+AREA = ClientArea(100, 50, 1280, 720)
+MOVED = ClientArea(300, 200, 1920, 1080)
+
+
+@pytest.fixture
+def manager():
+    return FakeWindowManager()
+
+
+def test_resolve_caches_handle_and_area(manager):
+    handle = manager.open(TITLE, AREA)
+    target = WindowTarget(manager, TITLE)
+    assert target.resolve() == AREA
+    assert target.resolve() == AREA
+    assert target.handle == handle
+    assert manager.lookups == 1
+    assert list(manager.watchers) == [handle]
+
+
+def test_move_is_picked_up_without_a_new_lookup(manager):
+    handle = manager.open(TITLE, AREA)
+    target = WindowTarget(manager, TITLE)
+    target.resolve()
+    manager.move(handle, MOVED)
+    assert target.dirty
+    assert target.resolve() == MOVED
+    assert manager.lookups == 1
+
+
+def test_close_and_recreate_rebinds_the_watch(manager):
+    old = manager.open(TITLE, AREA)
+    target = WindowTarget(manager, TITLE)
+    target.resolve()
+    manager.destroy(old)
+    assert target.resolve() is None
+    assert old not in manager.watchers
+    new = manager.open(TITLE, MOVED)
+    assert target.resolve() == MOVED
+    assert target.handle == new
+    assert list(manager.watchers) == [new]
+
+
+def test_minimized_window_has_no_area_until_restored(manager):
+    handle = manager.open(TITLE, AREA)
+    target = WindowTarget(manager, TITLE)
+    target.resolve()
+    manager.minimize(handle)
+    assert target.resolve() is None
+    assert target.dirty
+    manager.move(handle, AREA)
+    assert target.resolve() == AREA
+    assert manager.lookups == 1
+
+
+def test_falls_back_to_process_name(manager):
+    handle = manager.open("Launcher", AREA, "StarRail.exe")
+    target = WindowTarget(manager, TITLE, "starrail.exe")
+    assert target.resolve() == AREA
+    assert target.handle == handle
+    assert WindowTarget(manager, TITLE).resolve() is None
+
+
+def test_backend_posts_client_coordinates(manager):
+    handle = manager.open(TITLE, AREA)
+    backend = WindowBackend(WindowTarget(manager, TITLE))
+    backend.prepare(AREA.left + 10, AREA.top + 20)
+    backend.click(AREA.left + 10, AREA.top + 20)
+    backend.click_burst(AREA.left + 30, AREA.top + 40, 2)
+    assert manager.clicks == [(handle, 10, 20), (handle, 30, 40), (handle, 30, 40)]
+
+
+def test_backend_prepare_raises_without_window(manager):
+    backend = WindowBackend(WindowTarget(manager, TITLE))
+    with pytest.raises(RuntimeError):
+        backend.prepare(0, 0)
+    handle = manager.open(TITLE, AREA)
+    manager.minimize(handle)
+    with pytest.raises(RuntimeError):
+        backend.prepare(0, 0)
+
+
+def test_default_target_uses_instance_config(monkeypatch, manager):
+    monkeypatch.setattr(dialogue_skipper, "create_window_manager", lambda: manager)
+    config = Config(game_window_title="Other Game", game_process_name="other.exe")
+    target = WindowBackend(config=config).target
+    assert (target.title, target.process_name) == ("Other Game", "other.exe")
+    assert WindowBackend().target.title == TITLE
+
+
+def make_session(manager, **settings):
+    config = Config(input_backend="window", click_interval=0.01, auto_stop_time=30,
+                    coordinate_mode="absolute", click_x=AREA.left + 10, click_y=AREA.top + 20,
+                    session_history=False, log_file="", **settings)
+    skipper = DialogueSkipper(config)
+    skipper.window_manager = manager
+    skipper.start_engine()
+    return skipper
+
+
+def wait_until(condition, timeout: float = 2.0) -> bool:
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def test_session_ends_when_window_is_not_open(manager):
+    skipper = make_session(manager)
+    try:
+        skipper.control.submit(EngineCommand.START)
+        assert skipper.control.wait_for_finish(1, 2.0)
+        assert skipper.worker.is_alive()
+        assert manager.clicks == []
+    finally:
+        skipper.stop_engine()
+
+
+def test_reload_while_minimized_keeps_the_session(manager):
+    handle = manager.open(TITLE, AREA)
+    skipper = make_session(manager)
+    control = skipper.control
+    try:
+        control.submit(EngineCommand.START)
+        assert wait_until(lambda: len(manager.clicks) >= 3)
+        control.submit(EngineCommand.PAUSE)
+        assert wait_until(lambda: control.state == SessionState.PAUSED)
+        manager.minimize(handle)
+        skipper.pending_config = dataclasses.replace(skipper.config, click_interval=0.02)
+        control.submit(EngineCommand.RELOAD_CONFIG)
+        assert wait_until(lambda: not control.inbox)
+        time.sleep(0.05)
+        assert skipper.worker.is_alive()
+        assert control.state == SessionState.PAUSED
+        assert skipper.config.click_interval == 0.01
+
+        manager.move(handle, AREA)
+        clicks = len(manager.clicks)
+        control.submit(EngineCommand.RESUME)
+        assert wait_until(lambda: len(manager.clicks) > clicks)
+        control.submit(EngineCommand.STOP)
+        assert control.wait_for_finish(1, 2.0)
+    finally:
+        skipper.stop_engine()